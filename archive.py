@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Compressed daily headline archive for the News Headlines Scraper
+
+Headlines are kept as NDJSON in one compressed file per day,
+``YYYY-MM-DD.ndjson.gz`` (or ``.ndjson.zst`` with zstandard installed).
+Each write adds self-contained compressed frames ("blocks"), so the files
+stay valid for zcat/zstdcat, and a side ``.idx`` file records the time
+range, offset, length and record count of every block. The reader maps
+the index and the data into memory and only decompresses the blocks that
+overlap a query's time range.
+
+Usage:
+    python archive.py headline_archive query --since 2024-05-01 --until 2024-05-02T12:00
+    python archive.py headline_archive stats
+"""
+
+import argparse
+import gzip
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+from headline import Headline, parse_time
+
+try:
+    import zstandard
+except ImportError:  # zstandard is optional; gzip needs only the standard library
+    zstandard = None
+
+CODECS = ('gzip', 'zstd')
+SUFFIXES = {'gzip': '.ndjson.gz', 'zstd': '.ndjson.zst'}
+INDEX_SUFFIX = '.idx'
+
+# One index entry per block: first and last scraped_at, offset, compressed length, record count
+BLOCK_ENTRY = struct.Struct('<ddQII')
+
+_DAY_FILE = re.compile(r'^(\d{4}-\d{2}-\d{2})(\.ndjson\.(?:gz|zst))$')
+
+
+def check_codec(codec):
+    """Raise ValueError for an unknown codec and ImportError if its dependency is missing"""
+    if codec not in CODECS:
+        raise ValueError(f"Unknown archive codec {codec!r}; choose from {', '.join(CODECS)}")
+    if codec == 'zstd' and zstandard is None:
+        raise ImportError("The 'zstd' archive codec requires zstandard (pip install zstandard)")
+    return codec
+
+
+def _compress(codec, data, level):
+    if codec == 'zstd':
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def _decompress(codec, data):
+    if codec == 'zstd':
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    return gzip.decompress(data)
+
+
+def _timestamp(value):
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day).timestamp()
+    return value
+
+
+class HeadlineArchive:
+    """Writes headlines into day files of compressed, indexed blocks
+
+    A block is written (and its index entry appended after it) for every
+    day touched by a call to ``extend``, or every block_records headlines.
+    The data is always written before its index entry; after a crash, any
+    frame without an entry is cut off when the archive is next opened, so
+    readers never follow an index entry into missing data.
+    """
+
+    def __init__(self, directory, codec='gzip', level=None, block_records=1000):
+        """Open (or create) an archive in ``directory``
+
+        codec is 'gzip' or 'zstd'; level defaults to 6 for gzip and 10 for
+        zstd. Days already written with the other codec stay readable.
+        """
+        self.directory = directory
+        self.codec = check_codec(codec)
+        self.level = level if level is not None else (10 if codec == 'zstd' else 6)
+        self.block_records = block_records
+        self.lock = threading.Lock()
+        self._repaired = set()
+        os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, day):
+        data_path = os.path.join(self.directory, day + SUFFIXES[self.codec])
+        return data_path, data_path + INDEX_SUFFIX
+
+    def _repair(self, data_path, index_path):
+        """Drop a torn index entry or unindexed trailing frame left by a crash"""
+        if not os.path.exists(index_path):
+            if os.path.exists(data_path):
+                os.truncate(data_path, 0)
+            return
+        size = os.path.getsize(index_path)
+        complete = size - size % BLOCK_ENTRY.size
+        if complete != size:
+            os.truncate(index_path, complete)
+        end = 0
+        if complete:
+            with open(index_path, 'rb') as index:
+                index.seek(complete - BLOCK_ENTRY.size)
+                _, _, offset, length, _ = BLOCK_ENTRY.unpack(index.read(BLOCK_ENTRY.size))
+            end = offset + length
+        if os.path.exists(data_path) and os.path.getsize(data_path) > end:
+            os.truncate(data_path, end)
+
+    def _write_block(self, day, headlines):
+        data_path, index_path = self._paths(day)
+        if data_path not in self._repaired:
+            self._repair(data_path, index_path)
+            self._repaired.add(data_path)
+
+        payload = ''.join(json.dumps(headline.to_dict(), ensure_ascii=False, separators=(',', ':')) + '\n'
+                          for headline in headlines).encode('utf-8')
+        frame = _compress(self.codec, payload, self.level)
+        times = [headline.fetched_at for headline in headlines]
+
+        with open(data_path, 'ab') as data:
+            offset = data.tell()
+            data.write(frame)
+            data.flush()
+            os.fsync(data.fileno())
+        with open(index_path, 'ab') as index:
+            index.write(BLOCK_ENTRY.pack(min(times), max(times), offset, len(frame), len(headlines)))
+
+    def extend(self, headlines):
+        """Archive headlines, grouped into blocks by the local day they were fetched"""
+        days = {}
+        now = time.time()
+        for headline in headlines:
+            if headline.fetched_at is None:
+                headline = Headline(headline.source, headline.title, headline.url, now, headline.selector)
+            day = date.fromtimestamp(headline.fetched_at).isoformat()
+            days.setdefault(day, []).append(headline)
+
+        with self.lock:
+            for day, day_headlines in days.items():
+                for start in range(0, len(day_headlines), self.block_records):
+                    self._write_block(day, day_headlines[start:start + self.block_records])
+        return sum(len(day_headlines) for day_headlines in days.values())
+
+
+class ArchiveReader:
+    """Time-range queries over a HeadlineArchive directory"""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def days(self):
+        """Return [(day, data_path, codec)] for every day file, oldest first"""
+        found = []
+        for name in os.listdir(self.directory):
+            match = _DAY_FILE.match(name)
+            if match:
+                codec = 'zstd' if match.group(2).endswith('.zst') else 'gzip'
+                found.append((match.group(1), os.path.join(self.directory, name), codec))
+        return sorted(found)
+
+    @staticmethod
+    def _map(path):
+        """Memory-map a file read-only, or return None for a missing or empty file"""
+        try:
+            with open(path, 'rb') as file:
+                if os.fstat(file.fileno()).st_size == 0:
+                    return None
+                return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return None
+
+    def blocks(self, data_path):
+        """Yield (first, last, offset, length, count) for each complete block of a day file"""
+        index = self._map(data_path + INDEX_SUFFIX)
+        if index is None:
+            return
+        with index:
+            usable = len(index) - len(index) % BLOCK_ENTRY.size
+            yield from BLOCK_ENTRY.iter_unpack(memoryview(index)[:usable])
+
+    def query(self, since=None, until=None, source=None):
+        """Yield headlines scraped in [since, until), optionally from one source
+
+        since and until are POSIX timestamps, datetimes or dates. Day files
+        outside the range are never opened and, inside a day, only blocks
+        whose time range overlaps the query are decompressed.
+        """
+        since, until = _timestamp(since), _timestamp(until)
+        first_day = date.fromtimestamp(since) - timedelta(days=1) if since is not None else None
+        last_day = date.fromtimestamp(until) + timedelta(days=1) if until is not None else None
+
+        for day, data_path, codec in self.days():
+            day = date.fromisoformat(day)
+            if (first_day and day < first_day) or (last_day and day > last_day):
+                continue
+            selected = [(offset, length) for first, last, offset, length, _ in self.blocks(data_path)
+                        if (since is None or last >= since) and (until is None or first < until)]
+            if not selected:
+                continue
+            data = self._map(data_path)
+            if data is None:
+                continue
+            with data:
+                for offset, length in selected:
+                    if offset + length > len(data):
+                        break
+                    payload = _decompress(codec, data[offset:offset + length])
+                    for line in payload.splitlines():
+                        record = json.loads(line)
+                        if source is not None and record['source'] != source:
+                            continue
+                        headline = Headline.from_dict(record)
+                        if since is not None and headline.fetched_at < since:
+                            continue
+                        if until is not None and headline.fetched_at >= until:
+                            continue
+                        yield headline
+
+    def stats(self):
+        """Return per-day (day, blocks, records, compressed bytes)"""
+        rows = []
+        for day, data_path, _ in self.days():
+            blocks = list(self.blocks(data_path))
+            rows.append((day, len(blocks), sum(block[4] for block in blocks), sum(block[3] for block in blocks)))
+        return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query a compressed headline archive")
+    parser.add_argument('directory')
+    commands = parser.add_subparsers(dest='command', required=True)
+    query = commands.add_parser('query', help="print headlines in a time range")
+    query.add_argument('--since', type=parse_time, help="ISO 8601 date/time or POSIX timestamp")
+    query.add_argument('--until', type=parse_time, help="ISO 8601 date/time or POSIX timestamp (exclusive)")
+    query.add_argument('--source')
+    commands.add_parser('stats', help="blocks, records and size per day")
+    args = parser.parse_args(argv)
+
+    reader = ArchiveReader(args.directory)
+    if args.command == 'stats':
+        for day, blocks, records, size in reader.stats():
+            print(f"{day}  {blocks:5d} blocks  {records:8d} headlines  {size / 1024:10.1f} KB")
+        return
+    for headline in reader.query(args.since, args.until, args.source):
+        print(f"{headline.fetched_iso}  {headline}")
+
+
+if __name__ == "__main__":
+    main()
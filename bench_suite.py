@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite for the News Headlines Scraper
+
+Runs the whole pipeline against stored front-page fixtures (BBC, CNN,
+Reuters and generic page shapes in small, medium and large sizes, kept
+gzip-compressed in fixtures/) served by a local stand-in HTTP server, so
+no network access is needed and every run sees the same pages. It times:
+
+- parse: building the document, per parser backend
+- extract: the site's compiled plan over a parsed document
+- selector: each CSS selector on its own
+- dedupe: exact and near-duplicate removal over a large headline list
+- write: the text, JSON, NDJSON, SQLite and archive outputs
+- end_to_end: run_scraper, sequentially and concurrently
+
+Results are written as a flat JSON report of milliseconds. Given a
+baseline report, any metric that got slower by more than the tolerance
+is listed as a regression and the exit status is 1.
+
+Usage:
+    python bench_suite.py --report bench_report.json
+    python bench_suite.py --baseline bench_report.json --tolerance 0.25
+    python bench_suite.py --write-fixtures
+"""
+
+import argparse
+import contextlib
+import gzip
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmark import CARD_TEMPLATES, make_page, site_config, time_call
+from extraction import PARSER_BACKENDS, check_backend, iter_selector_text, parse_document
+from headline import Headline
+from news_scraper import NewsHeadlineScraper
+from sites import SiteConfig
+from transport import brotli, zstandard
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+FIXTURE_SIZES = {'small': 20, 'medium': 100, 'large': 400}
+
+
+def fixture_path(site, size):
+    return os.path.join(FIXTURE_DIR, f"{site.lower()}-{size}.html.gz")
+
+
+def write_fixtures():
+    """Regenerate the stored fixtures from the synthetic page builder"""
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    for site in CARD_TEMPLATES:
+        for size, cards in FIXTURE_SIZES.items():
+            with open(fixture_path(site, size), 'wb') as file:
+                file.write(gzip.compress(make_page(site, cards), mtime=0))
+
+
+def load_fixtures():
+    """Return {(site, size): page bytes} for every stored fixture"""
+    fixtures = {}
+    for site in CARD_TEMPLATES:
+        for size in FIXTURE_SIZES:
+            with gzip.open(fixture_path(site, size), 'rb') as file:
+                fixtures[site, size] = file.read()
+    return fixtures
+
+
+def encoded_bodies(body):
+    """Return {content coding: encoded body} for every coding the stand-in servers can produce"""
+    bodies = {'identity': body, 'gzip': gzip.compress(body, mtime=0)}
+    if brotli is not None:
+        bodies['br'] = brotli.compress(body, quality=5)
+    if zstandard is not None:
+        bodies['zstd'] = zstandard.ZstdCompressor(level=3).compress(body)
+    return bodies
+
+
+def negotiate(bodies, accept_encoding):
+    """Return the (coding, body) pair with the smallest body among the codings the client accepts"""
+    accepted = {token.split(';')[0].strip() for token in (accept_encoding or '').split(',')}
+    coding = min((coding for coding in bodies if coding == 'identity' or coding in accepted),
+                 key=lambda coding: len(bodies[coding]))
+    return coding, bodies[coding]
+
+
+class FixtureServer:
+    """A local HTTP server answering GET /<site>/<size> with a stored fixture
+
+    latency (seconds) is slept before each response to stand in for a
+    real server's response time. With compress, bodies are sent with the
+    most compact content coding the client accepts. connections and
+    bytes_sent count the connections accepted and body bytes written.
+    """
+
+    def __init__(self, fixtures, latency=0.0, compress=False):
+        pages = {f"/{site}/{size}": encoded_bodies(body) if compress else {'identity': body}
+                 for (site, size), body in fixtures.items()}
+        self.connections = 0
+        self.bytes_sent = 0
+        counters = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with counters:
+                    server.connections += 1
+
+            def do_GET(self):
+                bodies = pages.get(self.path)
+                if latency:
+                    time.sleep(latency)
+                if bodies is None:
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                coding, body = negotiate(bodies, self.headers.get('Accept-Encoding'))
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                if coding != 'identity':
+                    self.send_header('Content-Encoding', coding)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                with counters:
+                    server.bytes_sent += len(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        class Server(ThreadingHTTPServer):
+            def handle_error(self, request, client_address):
+                # Streaming clients hang up mid-response on purpose
+                if not isinstance(sys.exc_info()[1], ConnectionError):
+                    super().handle_error(request, client_address)
+
+        self.server = Server(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def local_sites(base_url, size):
+    """Return SiteConfigs pointing every page shape at the stand-in server"""
+    sites = []
+    for site in CARD_TEMPLATES:
+        config = site_config(site)
+        sites.append(SiteConfig(site, f"{base_url}/{site}/{size}", config.selectors,
+                                min_length=config.min_length, max_length=config.max_length,
+                                limit=config.limit, per_selector_limit=config.per_selector_limit))
+    return sites
+
+
+@contextlib.contextmanager
+def quiet_in(directory):
+    """Run with the working directory set to ``directory`` and stdout discarded"""
+    previous = os.getcwd()
+    os.chdir(directory)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        os.chdir(previous)
+
+
+def bench_parsing(metrics, fixtures, backends, selector_backend, repeat):
+    for (site, size), content in fixtures.items():
+        config = site_config(site)
+        for backend in backends:
+            parse_time, document = time_call(lambda: parse_document(content, backend), repeat)
+            extract_time, _ = time_call(lambda: list(config.plan.extract(document, backend)), repeat)
+            metrics[f"parse/{site}/{size}/{backend}"] = parse_time * 1000
+            metrics[f"extract/{site}/{size}/{backend}"] = extract_time * 1000
+
+        document = parse_document(content, selector_backend)
+        for selector in config.selectors:
+            selector_time, _ = time_call(
+                lambda: list(iter_selector_text(document, (selector,), selector_backend)), repeat)
+            metrics[f"selector/{site}/{size}/{selector}"] = selector_time * 1000
+
+
+def sample_headlines(fixtures, count):
+    """Build ``count`` headlines from the large fixtures, with exact and reworded repeats"""
+    titles = []
+    for site in CARD_TEMPLATES:
+        config = site_config(site)
+        document = parse_document(fixtures[site, 'large'], 'html.parser')
+        titles.extend((site, text) for _, text, _ in config.plan.extract(document, 'html.parser'))
+    now = time.time()
+    headlines = []
+    for i in range(count):
+        source, title = titles[i % len(titles)]
+        if i // len(titles) % 2:
+            title = title.replace('officials respond to', 'officials react to')
+        headlines.append(Headline(source, title, f"https://news.example.com/{i}", now + i, 'h2'))
+    return headlines
+
+
+def bench_dedupe(metrics, headlines, repeat):
+    exact = NewsHeadlineScraper(sites=[])
+    near = NewsHeadlineScraper(sites=[], near_duplicate_threshold=0.65)
+    metrics[f"dedupe/exact/{len(headlines)}"] = time_call(lambda: exact.dedupe_headlines(headlines), repeat)[0] * 1000
+    metrics[f"dedupe/near/{len(headlines)}"] = time_call(lambda: near.dedupe_headlines(headlines), repeat)[0] * 1000
+
+
+def bench_writes(metrics, headlines, repeat):
+    with tempfile.TemporaryDirectory() as directory, quiet_in(directory):
+        scraper = NewsHeadlineScraper(sites=[], ndjson_dir='ndjson', sqlite_db='headlines.db', archive_dir='archive')
+        writers = {
+            'text': scraper.save_headlines_to_file,
+            'json': scraper.save_headlines_json,
+            'ndjson': scraper.save_headlines_ndjson,
+            'sqlite': scraper.save_headlines_sqlite,
+            'archive': scraper.save_headlines_archive,
+        }
+        for name, write in writers.items():
+            metrics[f"write/{name}/{len(headlines)}"] = time_call(lambda: write(headlines), repeat)[0] * 1000
+        scraper.sqlite_store.close()
+
+
+def bench_end_to_end(metrics, fixtures, latency, parser, repeat):
+    with FixtureServer(fixtures, latency) as server, tempfile.TemporaryDirectory() as directory:
+        for size in FIXTURE_SIZES:
+            sites = local_sites(server.url, size)
+            # Content-hash reuse would skip every parse after the first run
+            scraper = NewsHeadlineScraper(rate=1000, burst=100, parser=parser, sites=sites, reuse_unchanged=False)
+            with quiet_in(directory):
+                for mode, concurrent in (('sequential', False), ('concurrent', True)):
+                    elapsed, headlines = time_call(lambda: scraper.run_scraper(concurrent=concurrent), repeat)
+                    if not headlines:
+                        raise RuntimeError(f"end-to-end run against the {size} fixtures found no headlines")
+                    metrics[f"end_to_end/{size}/{mode}"] = elapsed * 1000
+
+
+def compare(metrics, baseline, tolerance, min_delta_ms):
+    """Return a list of regressions: metrics slower than baseline by more than the tolerance"""
+    regressions = []
+    for name, value in sorted(metrics.items()):
+        before = baseline.get(name)
+        if before is None:
+            continue
+        if value > before * (1 + tolerance) and value - before > min_delta_ms:
+            regressions.append({"metric": name, "baseline_ms": round(before, 3), "current_ms": round(value, 3),
+                                "change": f"{(value / before - 1) * 100:+.0f}%"})
+    return regressions
+
+
+def run_suite(backends, repeat=5, latency=0.02, dedupe_count=2000, parser='html.parser'):
+    """Run every benchmark and return {metric: milliseconds}"""
+    fixtures = load_fixtures()
+    metrics = {}
+    bench_parsing(metrics, fixtures, backends, parser, repeat)
+    headlines = sample_headlines(fixtures, dedupe_count)
+    bench_dedupe(metrics, headlines, repeat)
+    bench_writes(metrics, headlines, repeat)
+    bench_end_to_end(metrics, fixtures, latency, parser, max(1, repeat // 2))
+    return metrics
+
+
+def main(argv=None):
+    """Run the benchmark suite from the command line"""
+    available = []
+    for backend in PARSER_BACKENDS:
+        try:
+            available.append(check_backend(backend))
+        except ImportError:
+            pass
+
+    parser = argparse.ArgumentParser(description="Offline benchmark suite for the scraper pipeline")
+    parser.add_argument('--report', default='bench_report.json', help="where to write the JSON report")
+    parser.add_argument('--baseline', help="earlier report to check for regressions")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="allowed slowdown before a metric counts as a regression (default: 0.25 = 25%%)")
+    parser.add_argument('--min-delta-ms', type=float, default=0.5,
+                        help="ignore slowdowns smaller than this many milliseconds (default: 0.5)")
+    parser.add_argument('--repeat', type=int, default=5, help="runs per measurement (default: 5)")
+    parser.add_argument('--latency', type=float, default=0.02,
+                        help="seconds the stand-in server waits before each response (default: 0.02)")
+    parser.add_argument('--backends', nargs='+', choices=PARSER_BACKENDS, default=available)
+    parser.add_argument('--parser', choices=PARSER_BACKENDS, default='html.parser',
+                        help="backend for per-selector and end-to-end timings (default: html.parser)")
+    parser.add_argument('--write-fixtures', action='store_true', help="regenerate fixtures/ and exit")
+    args = parser.parse_args(argv)
+
+    if args.write_fixtures:
+        write_fixtures()
+        print(f"💾 Wrote fixtures to '{FIXTURE_DIR}'")
+        return 0
+
+    print("⏱️  Running the offline benchmark suite...")
+    metrics = run_suite(args.backends, args.repeat, args.latency, parser=args.parser)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as file:
+            regressions = compare(metrics, json.load(file)['metrics'], args.tolerance, args.min_delta_ms)
+
+    report = {
+        "generated_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {"repeat": args.repeat, "latency": args.latency, "backends": args.backends,
+                     "parser": args.parser, "tolerance": args.tolerance, "min_delta_ms": args.min_delta_ms},
+        "metrics": {name: round(value, 3) for name, value in sorted(metrics.items())},
+        "regressions": regressions,
+    }
+    with open(args.report, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=2)
+
+    print(f"📊 {len(metrics)} metrics written to '{args.report}'")
+    for name in sorted(metrics):
+        if name.startswith(('end_to_end/', 'dedupe/', 'write/')):
+            print(f"   {name:<40} {metrics[name]:>10.2f} ms")
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s) against '{args.baseline}':")
+        for regression in regressions:
+            print(f"   {regression['metric']}: {regression['baseline_ms']} -> "
+                  f"{regression['current_ms']} ms ({regression['change']})")
+        return 1
+    if args.baseline:
+        print(f"✅ No regressions against '{args.baseline}'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
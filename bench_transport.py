@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Transport benchmark for the News Headlines Scraper
+
+Fetches every stored fixture page (see bench_suite.py) concurrently
+through the scraper's own session, once per transport:
+
+- http1-gzip: the default requests transport offering only gzip/deflate
+- http1: the default transport offering every coding it can decode
+- http2: HTTP2Adapter (HTTP/2 multiplexing, brotli and zstd decoding)
+
+The HTTP/1.1 runs are served by bench_suite's FixtureServer and the
+HTTP/2 run by H2FixtureServer, a cleartext HTTP/2 stand-in with the same
+pages. Both servers pick the smallest content coding the client accepts
+and count the connections they accept and the body bytes they send, so
+the report shows time per round, bytes on the wire and connections
+opened for each transport.
+
+Usage:
+    python bench_transport.py --rounds 5 --latency 0.02 --report transport_report.json
+"""
+
+import argparse
+import json
+import platform
+import socket
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from bench_suite import FIXTURE_SIZES, FixtureServer, encoded_bodies, load_fixtures, negotiate
+from benchmark import CARD_TEMPLATES
+from news_scraper import NewsHeadlineScraper
+from transport import HTTP2Adapter, accept_encoding, check_http2
+
+
+class H2FixtureServer:
+    """A local cleartext HTTP/2 server (prior knowledge, no TLS) for the stored fixtures
+
+    Serves the same paths as FixtureServer, always with content-coding
+    negotiation. Every request is answered on its own thread after
+    latency seconds, so concurrent streams on one connection overlap the
+    way they would on a real server. All writes and flow-control waits go
+    through one lock per connection, and a connection is only closed
+    once every stream on it has finished.
+    """
+
+    def __init__(self, fixtures, latency=0.0):
+        check_http2()
+        import h2.config
+        import h2.connection
+        import h2.events
+        import h2.exceptions
+        self.h2 = h2
+        self.pages = {f"/{site}/{size}": encoded_bodies(body) for (site, size), body in fixtures.items()}
+        self.latency = latency
+        self.connections = 0
+        self.bytes_sent = 0
+        self.counters = threading.Lock()
+        self.listener = socket.create_server(('127.0.0.1', 0))
+        self.url = f"http://127.0.0.1:{self.listener.getsockname()[1]}"
+
+    def __enter__(self):
+        threading.Thread(target=self._accept, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.listener.close()
+
+    def _accept(self):
+        while True:
+            try:
+                sock, _ = self.listener.accept()
+            except OSError:
+                return  # the listener was closed
+            with self.counters:
+                self.connections += 1
+            threading.Thread(target=self._serve, args=(sock,), daemon=True).start()
+
+    def _serve(self, sock):
+        h2 = self.h2
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        connection = h2.connection.H2Connection(h2.config.H2Configuration(client_side=False, header_encoding='utf-8'))
+        # Guards the connection state; responders wait on it for flow-control window updates
+        state = threading.Condition()
+        finished = threading.Event()  # set once no more window updates can arrive
+        responders = []
+        try:
+            with state:
+                connection.initiate_connection()
+                sock.sendall(connection.data_to_send())
+            # Read until the client closes the socket, even after a GOAWAY:
+            # streams still in flight need its window updates to finish
+            while True:
+                data = sock.recv(65536)
+                if not data:
+                    return
+                with state:
+                    for event in connection.receive_data(data):
+                        if isinstance(event, h2.events.RequestReceived):
+                            responder = threading.Thread(target=self._respond, daemon=True,
+                                                         args=(sock, connection, state, finished,
+                                                               event.stream_id, dict(event.headers)))
+                            responder.start()
+                            responders.append(responder)
+                    sock.sendall(connection.data_to_send())
+                    state.notify_all()
+        except (OSError, h2.exceptions.ProtocolError):
+            pass
+        finally:
+            finished.set()
+            with state:
+                state.notify_all()
+            for responder in responders:
+                responder.join()
+            sock.close()
+
+    def _respond(self, sock, connection, state, finished, stream_id, headers):
+        if self.latency:
+            time.sleep(self.latency)
+        bodies = self.pages.get(headers.get(':path'))
+        if bodies is None:
+            status, coding, body = 404, 'identity', b''
+        else:
+            status = 200
+            coding, body = negotiate(bodies, headers.get('accept-encoding'))
+        response_headers = [(':status', str(status)), ('content-type', 'text/html; charset=utf-8'),
+                            ('content-length', str(len(body)))]
+        if coding != 'identity':
+            response_headers.append(('content-encoding', coding))
+
+        try:
+            with state:
+                connection.send_headers(stream_id, response_headers, end_stream=not body)
+                sock.sendall(connection.data_to_send())
+                offset = 0
+                while offset < len(body):
+                    window = min(connection.local_flow_control_window(stream_id),
+                                 connection.max_outbound_frame_size)
+                    if window <= 0:
+                        if finished.is_set():
+                            return  # the client is gone
+                        state.wait()
+                        continue
+                    chunk = body[offset:offset + window]
+                    offset += len(chunk)
+                    connection.send_data(stream_id, chunk, end_stream=offset >= len(body))
+                    sock.sendall(connection.data_to_send())
+            with self.counters:
+                self.bytes_sent += len(body)
+        except (OSError, self.h2.exceptions.ProtocolError):
+            pass  # the client reset the stream or went away
+
+
+def fetch_round(session, urls, expected):
+    """Fetch every URL at once through ``session``; return the seconds taken and the failed requests' errors"""
+    def fetch(url):
+        try:
+            response = session.get(url, timeout=10)
+            response.raise_for_status()
+            if response.content != expected[url]:
+                raise RuntimeError(f"{url} came back different from its fixture")
+        except Exception as e:
+            return f"{type(e).__name__}: {e}"
+        return None
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(urls)) as executor:
+        errors = [error for error in executor.map(fetch, urls) if error is not None]
+    return time.perf_counter() - start, errors
+
+
+def bench_transport(name, server, scraper, fixtures, rounds):
+    """Time ``rounds`` rounds over one transport and return its results"""
+    urls, expected = [], {}
+    for (site, size), body in fixtures.items():
+        url = f"{server.url}/{site}/{size}"
+        urls.append(url)
+        expected[url] = body
+
+    _, errors = fetch_round(scraper.session, urls, expected)  # warm up: connections, pools, worker threads
+    connections, bytes_sent = server.connections, server.bytes_sent
+    times = []
+    for _ in range(rounds):
+        seconds, round_errors = fetch_round(scraper.session, urls, expected)
+        times.append(seconds)
+        errors += round_errors
+    return {
+        "transport": name,
+        "accept_encoding": scraper.session.headers['Accept-Encoding'],
+        "round_ms": round(statistics.median(times) * 1000, 3),
+        "bytes_per_round": (server.bytes_sent - bytes_sent) // rounds,
+        "connections_warm_up": connections,
+        "connections_after_warm_up": server.connections - connections,
+        "pages_per_round": len(urls),
+        "failed_requests": len(errors),
+        "errors": sorted(set(errors))[:10],
+    }
+
+
+def run_benchmark(rounds=5, latency=0.02):
+    """Run every transport and return a list of per-transport results"""
+    fixtures = load_fixtures()
+    results = []
+    with FixtureServer(fixtures, latency, compress=True) as server:
+        scraper = NewsHeadlineScraper(sites=[])
+        scraper.session.headers['Accept-Encoding'] = 'gzip, deflate'
+        results.append(bench_transport('http1-gzip', server, scraper, fixtures, rounds))
+    with FixtureServer(fixtures, latency, compress=True) as server:
+        scraper = NewsHeadlineScraper(sites=[])
+        results.append(bench_transport('http1', server, scraper, fixtures, rounds))
+    with H2FixtureServer(fixtures, latency) as server:
+        scraper = NewsHeadlineScraper(sites=[], http2=True)
+        # The stand-in speaks cleartext HTTP/2, which needs prior knowledge instead of ALPN
+        adapter = HTTP2Adapter(prior_knowledge=True)
+        scraper.session.mount('http://', adapter)
+        results.append(bench_transport('http2', server, scraper, fixtures, rounds))
+        adapter.close()
+    return results
+
+
+def main(argv=None):
+    """Run the transport benchmark from the command line"""
+    parser = argparse.ArgumentParser(description="Compare the HTTP/1.1 and HTTP/2 transports")
+    parser.add_argument('--report', default='transport_report.json', help="where to write the JSON report")
+    parser.add_argument('--rounds', type=int, default=5, help="measured rounds per transport (default: 5)")
+    parser.add_argument('--latency', type=float, default=0.02,
+                        help="seconds the stand-in servers wait before each response (default: 0.02)")
+    args = parser.parse_args(argv)
+
+    try:
+        check_http2()
+    except ImportError as e:
+        print(f"❌ {e}")
+        return 1
+
+    print(f"⏱️  Fetching {len(CARD_TEMPLATES) * len(FIXTURE_SIZES)} fixture pages per round over each transport...")
+    results = run_benchmark(args.rounds, args.latency)
+    report = {
+        "generated_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {"rounds": args.rounds, "latency": args.latency,
+                     "http2_accept_encoding": accept_encoding(http2=True)},
+        "results": results,
+    }
+    with open(args.report, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=2)
+
+    print(f"{'transport':<12} {'round ms':>9} {'KB/round':>9} {'connections':>12} {'failed':>7}  accept-encoding")
+    for result in results:
+        connections = result['connections_warm_up'] + result['connections_after_warm_up']
+        print(f"{result['transport']:<12} {result['round_ms']:>9.2f} {result['bytes_per_round'] / 1024:>9.1f} "
+              f"{connections:>12} {result['failed_requests']:>7}  {result['accept_encoding']}")
+    print(f"📊 Report written to '{args.report}'")
+    failed = [result for result in results if result['failed_requests']]
+    for result in failed:
+        print(f"❌ {result['failed_requests']} {result['transport']} requests failed, e.g. {result['errors'][0]}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Parser benchmark for the News Headlines Scraper
+
+Builds synthetic front pages shaped like BBC, CNN, Reuters and a generic
+news site (headline cards buried in navigation, scripts and layout markup)
+and measures parse and extraction time for each parser backend.
+Extraction is timed both with the single-pass ExtractionPlan and with one
+``select`` per selector, and the "top 15" column shows the lazy path the
+scrapers use, which stops parsing and traversal once 15 headlines are found.
+
+Usage:
+    python benchmark.py
+    python benchmark.py --cards 50 400 --repeat 7
+"""
+
+import argparse
+import statistics
+import time
+
+from extraction import (PARSER_BACKENDS, ExtractionPlan, check_backend, extract_headlines,
+                        iter_selector_text, parse_document)
+from sites import generic_site, load_sites
+
+# Markup used for a single headline card on each site
+CARD_TEMPLATES = {
+    'BBC': ('<div data-testid="card"><a href="/news/{i}"><div class="sc-8ea7699c-0">'
+            '<h2 data-testid="card-headline" class="sc-4fedabc7-3">{title}</h2></div>'
+            '<p data-testid="card-description">{summary}</p></a></div>'),
+    'CNN': ('<div class="card container__item"><a class="container__link" href="/{i}">'
+            '<div class="container__headline"><span class="container__headline-text">{title}</span>'
+            '</div></a><div class="container__date">{summary}</div></div>'),
+    'Reuters': ('<li class="story-collection__item"><div class="media-story-card">'
+                '<a data-testid="Heading" href="/world/{i}/"><span>{title}</span></a>'
+                '<time>{summary}</time></div></li>'),
+    'Generic': ('<article class="story"><h3 class="headline"><a href="/story/{i}">{title}</a></h3>'
+                '<p class="summary">{summary}</p></article>'),
+}
+
+FILLER = ('<div class="promo"><ul>' + '<li><a href="/section/{i}/{j}">Section link {j}</a></li>' * 3 +
+          '</ul><script>window.__data_{i} = {{"id": {i}, "items": [1, 2, 3]}};</script></div>')
+
+
+def make_page(site, cards):
+    """Return the bytes of a synthetic front page for ``site`` with ``cards`` headline cards"""
+    template = CARD_TEMPLATES[site]
+    body = []
+    for i in range(cards):
+        title = f"{site} headline {i}: officials respond to developing story number {i}"
+        body.append(template.format(i=i, title=title, summary=f"Summary text for story {i}"))
+        body.append(FILLER.format(i=i, j=i % 7))
+    html = ('<!DOCTYPE html><html><head><meta charset="utf-8"><title>' + site + '</title>'
+            '<style>.promo{display:block}</style></head><body><header><nav>' +
+            ''.join(f'<a href="/nav/{n}">Nav {n}</a>' for n in range(40)) +
+            '</nav></header><main>' + ''.join(body) + '</main><footer>Footer</footer></body></html>')
+    return html.encode('utf-8')
+
+
+def site_config(site):
+    """Return the SiteConfig whose selectors are used for a page shape"""
+    registry = load_sites()
+    if site in registry:
+        return registry[site]
+    return generic_site(f"https://news.example.com/{site.lower()}", site)
+
+
+def time_call(func, repeat):
+    """Return the median wall-clock time of ``repeat`` calls to ``func`` and its last result"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), result
+
+
+def bench_parsers(card_counts=(50, 400), repeat=5, backends=PARSER_BACKENDS):
+    """Benchmark every backend on every page shape and return a list of result rows"""
+    rows = []
+    for site in CARD_TEMPLATES:
+        selectors = site_config(site).selectors
+        plan = ExtractionPlan(selectors)
+        for cards in card_counts:
+            content = make_page(site, cards)
+            for backend in backends:
+                parse_time, document = time_call(lambda: parse_document(content, backend), repeat)
+                extract_time, matches = time_call(lambda: list(plan.extract(document, backend)), repeat)
+                per_selector_time, _ = time_call(
+                    lambda: list(iter_selector_text(document, selectors, backend)), repeat)
+                top_time, _ = time_call(
+                    lambda: extract_headlines(content, selectors, backend, min_length=11, limit=15), repeat)
+                rows.append({
+                    'site': site,
+                    'cards': cards,
+                    'bytes': len(content),
+                    'backend': backend,
+                    'parse_ms': parse_time * 1000,
+                    'extract_ms': extract_time * 1000,
+                    'per_selector_ms': per_selector_time * 1000,
+                    'top15_ms': top_time * 1000,
+                    'matches': len(matches),
+                })
+    return rows
+
+
+def print_rows(rows):
+    """Print benchmark rows as a table with the speed-up over html.parser"""
+    baseline = {(r['site'], r['cards']): r['parse_ms'] + r['extract_ms']
+                for r in rows if r['backend'] == 'html.parser'}
+    print(f"{'site':<8} {'cards':>5} {'KB':>7} {'backend':<12} {'parse ms':>9} {'extract ms':>10} "
+          f"{'per-sel ms':>10} {'total ms':>9} {'speed-up':>8} {'top 15 ms':>9} {'matches':>7}")
+    print("-" * 105)
+    for r in rows:
+        total = r['parse_ms'] + r['extract_ms']
+        base = baseline.get((r['site'], r['cards']))
+        speedup = f"{base / total:.1f}x" if base else '-'
+        print(f"{r['site']:<8} {r['cards']:>5} {r['bytes'] / 1024:>7.1f} {r['backend']:<12} "
+              f"{r['parse_ms']:>9.2f} {r['extract_ms']:>10.2f} {r['per_selector_ms']:>10.2f} "
+              f"{total:>9.2f} {speedup:>8} {r['top15_ms']:>9.2f} {r['matches']:>7}")
+
+
+def main(argv=None):
+    """Run the parser benchmark from the command line"""
+    parser = argparse.ArgumentParser(description="Benchmark HTML parser backends")
+    parser.add_argument('--cards', type=int, nargs='+', default=[50, 400],
+                        help="headline cards per synthetic page (default: 50 400)")
+    parser.add_argument('--repeat', type=int, default=5, help="runs per measurement (default: 5)")
+    parser.add_argument('--backends', nargs='+', choices=PARSER_BACKENDS, default=list(PARSER_BACKENDS))
+    args = parser.parse_args(argv)
+
+    for backend in args.backends:
+        check_backend(backend)
+
+    print("⏱️  Parser backend benchmark")
+    print("=" * 105)
+    print_rows(bench_parsers(args.cards, args.repeat, args.backends))
+
+
+if __name__ == "__main__":
+    main()
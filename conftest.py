@@ -0,0 +1,2 @@
+# test_scraper.py is the script that generated demo.py, not a test module
+collect_ignore = ['test_scraper.py']
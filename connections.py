@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Connection management for the News Headlines Scraper
+
+PooledHTTPAdapter replaces requests' default HTTPAdapter. It is tuned
+for runs over many hosts:
+
+- Pool sizing: requests keeps pools for 10 hosts with 10 connections
+  each, so a run over hundreds of hosts evicts pools, and with them their
+  open connections, long before it comes back to a host. The adapter
+  keeps a pool for pool_hosts hosts and pool_maxsize connections per
+  host, with per-host overrides.
+- DNSCache keeps getaddrinfo results in process for a TTL.
+- TLSSessionCache shares one SSLContext between all connections and
+  resumes the previous TLS session of a hostname, so a reconnection
+  skips the full handshake. urllib3 otherwise builds a new context, and
+  parses the CA bundle again, for every connection.
+- ConnectionStats counts requests, new and reused connections, DNS
+  cache hits and misses and resumed or full TLS handshakes per host. It
+  also reports them as StageMetrics counters, so it shows whether the
+  pools, the DNS cache and TLS resumption are working.
+
+Its connections also time the DNS lookup, TCP connect and TLS handshake
+for StageMetrics.
+
+Needs requests 2.32.3 or later, for its connection pool key hook, and
+urllib3 2.
+"""
+
+import os
+import socket
+import ssl
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter
+from requests.utils import DEFAULT_CA_BUNDLE_PATH
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import NameResolutionError, NewConnectionError
+from urllib3.util.connection import allowed_gai_family
+
+from metrics import NULL_METRICS
+
+if not hasattr(HTTPAdapter, 'build_connection_pool_key_attributes'):
+    # Without the hook, per-host pool sizes and the shared TLS contexts would be silently skipped
+    raise ImportError("Connection management needs requests 2.32.3 or later: pip install -U requests")
+
+
+class DNSCache:
+    """Caches getaddrinfo results for ``ttl`` seconds
+
+    The system resolver does not expose record TTLs, so one TTL applies
+    to every name. Entries whose addresses all refuse connections are
+    dropped early with forget().
+    """
+
+    def __init__(self, ttl=300.0):
+        self.ttl = ttl
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def resolve(self, host, port, family=0, type=0):
+        """Return (addresses, cached) for a lookup, resolving only when the entry is missing or expired"""
+        key = (host, port, family, type)
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+        if entry is not None and entry[0] > now:
+            return entry[1], True
+        addresses = socket.getaddrinfo(host, port, family, type)
+        with self.lock:
+            self.entries[key] = (now + self.ttl, addresses)
+        return addresses, False
+
+    def forget(self, host):
+        with self.lock:
+            for key in [key for key in self.entries if key[0] == host]:
+                del self.entries[key]
+
+
+class _ResumingSSLSocket(ssl.SSLSocket):
+    """An SSLSocket that hands its session to its context once data arrives
+
+    TLS 1.3 servers send their session tickets after the handshake, so
+    the session is only worth saving after the first read.
+    """
+
+    pending_session = None  # hostname until the session has been saved
+
+    def recv_into(self, buffer, nbytes=None, flags=0):
+        count = super().recv_into(buffer, nbytes, flags)
+        if self.pending_session is not None:
+            hostname, self.pending_session = self.pending_session, None
+            self.context.store(hostname, self.session)
+        return count
+
+
+class _ResumingSSLContext(ssl.SSLContext):
+    """A client SSLContext that offers each hostname's latest session when connecting
+
+    A session can only be resumed through the context that created it,
+    so every context keeps its own sessions, at most max_hosts of them.
+    """
+
+    sslsocket_class = _ResumingSSLSocket
+
+    def __new__(cls, max_hosts):
+        return super().__new__(cls, ssl.PROTOCOL_TLS_CLIENT)
+
+    def __init__(self, max_hosts):
+        self.max_hosts = max_hosts
+        self.sessions = {}
+        self.sessions_lock = threading.Lock()
+
+    def store(self, hostname, session):
+        if session is None:
+            return
+        with self.sessions_lock:
+            self.sessions.pop(hostname, None)
+            self.sessions[hostname] = session
+            if len(self.sessions) > self.max_hosts:
+                del self.sessions[next(iter(self.sessions))]
+
+    def wrap_socket(self, sock, *args, server_hostname=None, session=None, **kwargs):
+        if session is None and server_hostname:
+            with self.sessions_lock:
+                session = self.sessions.get(server_hostname)
+        ssl_sock = super().wrap_socket(sock, *args, server_hostname=server_hostname, session=session, **kwargs)
+        if server_hostname:
+            ssl_sock.pending_session = server_hostname
+        return ssl_sock
+
+
+class TLSSessionCache:
+    """Shared verifying SSLContexts, one per CA bundle, that resume TLS sessions
+
+    Each context loads its bundle once: requests' certifi bundle for
+    verify=True, or the file or directory a verify path (such as
+    REQUESTS_CA_BUNDLE) names. Unlike urllib3's own contexts they leave
+    session tickets enabled, since resuming is the point.
+    """
+
+    def __init__(self, max_hosts=1024):
+        self.max_hosts = max_hosts
+        self.contexts = {}
+        self.lock = threading.Lock()
+
+    def context_for(self, verify):
+        """Return the shared context for a requests verify value (True or a CA bundle path)"""
+        bundle = DEFAULT_CA_BUNDLE_PATH if verify is True else verify
+        with self.lock:
+            context = self.contexts.get(bundle)
+            if context is None:
+                context = _ResumingSSLContext(self.max_hosts)
+                context.minimum_version = ssl.TLSVersion.TLSv1_2
+                if os.path.isdir(bundle):
+                    context.load_verify_locations(capath=bundle)
+                else:
+                    context.load_verify_locations(cafile=bundle)
+                self.contexts[bundle] = context
+            return context
+
+    def owns(self, context):
+        return isinstance(context, _ResumingSSLContext) and context in self.contexts.values()
+
+
+class ConnectionStats:
+    """Per-host connection counters, mirrored to StageMetrics
+
+    connections_reused counts responses received on a connection that had
+    already served one, so failed connection attempts are not counted as
+    reuse.
+    """
+
+    def __init__(self, metrics=NULL_METRICS):
+        self.metrics = metrics
+        self.hosts = {}
+        self.lock = threading.Lock()
+
+    def add(self, host, name, amount=1):
+        with self.lock:
+            counts = self.hosts.get(host)
+            if counts is None:
+                counts = self.hosts[host] = Counter()
+            counts[name] += amount
+        self.metrics.count(name, amount)
+
+    def totals(self):
+        """Return the counters summed over every host"""
+        totals = Counter()
+        with self.lock:
+            for counts in self.hosts.values():
+                totals.update(counts)
+        return totals
+
+
+class _ManagedConnectionMixin:
+    """Resolves through the DNS cache, then connects, timing and counting both"""
+
+    metrics = NULL_METRICS
+    stats = None
+    dns_cache = None
+    responses = 0  # responses received since the socket was opened
+
+    def _new_conn(self):
+        host = self._dns_host
+        start = time.perf_counter()
+        try:
+            if self.dns_cache is not None:
+                addresses, cached = self.dns_cache.resolve(host, self.port, allowed_gai_family(), socket.SOCK_STREAM)
+            else:
+                addresses, cached = socket.getaddrinfo(host, self.port, allowed_gai_family(), socket.SOCK_STREAM), False
+        except socket.gaierror as e:
+            raise NameResolutionError(self.host, self, e) from e
+        resolved = time.perf_counter()
+        self.metrics.observe('dns', resolved - start)
+        self.stats.add(self.host, 'dns_hits' if cached else 'dns_misses')
+
+        # Connect to each address in turn, as socket.create_connection would
+        error = None
+        for *_, sockaddr in addresses:
+            self._dns_host = sockaddr[0]
+            try:
+                sock = super()._new_conn()
+                break
+            except NewConnectionError as e:
+                error = e
+            finally:
+                self._dns_host = host
+        else:
+            if cached:
+                self.dns_cache.forget(host)  # the host may have moved
+            raise error
+        self.connect_seconds = time.perf_counter() - start
+        self.metrics.observe('connect', self.connect_seconds - (resolved - start))
+        self.stats.add(self.host, 'connections_opened')
+        self.responses = 0
+        return sock
+
+    def getresponse(self):
+        response = super().getresponse()
+        if self.responses:
+            self.stats.add(self.host, 'connections_reused')
+        self.responses += 1
+        return response
+
+
+class ManagedHTTPConnection(_ManagedConnectionMixin, HTTPConnection):
+    pass
+
+
+class ManagedHTTPSConnection(_ManagedConnectionMixin, HTTPSConnection):
+    def connect(self):
+        self.connect_seconds = 0.0
+        start = time.perf_counter()
+        super().connect()
+        # Everything after the TCP connect is the TLS handshake
+        self.metrics.observe('tls', time.perf_counter() - start - self.connect_seconds)
+        resumed = getattr(self.sock, 'session_reused', False)
+        self.stats.add(self.host, 'tls_resumed' if resumed else 'tls_full_handshakes')
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """An HTTPAdapter with per-host pool sizes, a DNS cache, TLS resumption and connection counters"""
+
+    def __init__(self, pool_hosts=10, pool_maxsize=10, host_pool_sizes=None, dns_cache=None,
+                 tls_sessions=None, metrics=NULL_METRICS, stats=None):
+        """Configure the pools
+
+        pool_hosts is how many hosts keep a pool (least recently used
+        first out) and pool_maxsize how many idle connections each keeps;
+        host_pool_sizes maps a hostname to its own pool_maxsize.
+        dns_cache (a DNSCache) and tls_sessions (a TLSSessionCache) are
+        optional. Timings go to metrics and counts to stats, a
+        ConnectionStats that is created if not given.
+        """
+        self.metrics = metrics
+        self.stats = stats or ConnectionStats(metrics)
+        self.dns_cache = dns_cache
+        self.tls_sessions = tls_sessions
+        self.host_pool_sizes = dict(host_pool_sizes or {})
+        super().__init__(pool_connections=pool_hosts, pool_maxsize=pool_maxsize)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        attributes = {'metrics': self.metrics, 'stats': self.stats, 'dns_cache': self.dns_cache}
+        http_connection = type('ManagedHTTPConnection', (ManagedHTTPConnection,), attributes)
+        https_connection = type('ManagedHTTPSConnection', (ManagedHTTPSConnection,), attributes)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': type('ManagedHTTPConnectionPool', (HTTPConnectionPool,), {'ConnectionCls': http_connection}),
+            'https': type('ManagedHTTPSConnectionPool', (HTTPSConnectionPool,), {'ConnectionCls': https_connection}),
+        }
+
+    def build_connection_pool_key_attributes(self, request, verify, cert=None):
+        host_params, pool_kwargs = super().build_connection_pool_key_attributes(request, verify, cert)
+        maxsize = self.host_pool_sizes.get(host_params['host'])
+        if maxsize:
+            pool_kwargs['maxsize'] = maxsize
+        # Client certificates and verify=False need contexts of their own
+        if self.tls_sessions is not None and host_params['scheme'] == 'https' and verify and not cert:
+            pool_kwargs['ssl_context'] = self.tls_sessions.context_for(verify)
+        return host_params, pool_kwargs
+
+    def cert_verify(self, conn, url, verify, cert):
+        super().cert_verify(conn, url, verify, cert)
+        if self.tls_sessions is not None and self.tls_sessions.owns(conn.conn_kw.get('ssl_context')):
+            # The bundle is already loaded into the shared context; loading it per connection is the cost we avoid
+            conn.ca_certs = None
+            conn.ca_cert_dir = None
+
+    def send(self, request, *args, **kwargs):
+        self.stats.add(urlsplit(request.url).hostname, 'requests_sent')
+        return super().send(request, *args, **kwargs)
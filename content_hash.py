@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Content-hash short-circuit for the News Headlines Scraper
+
+Many servers send no validators, so an unchanged front page is still
+downloaded in full. Hashing the body (or just the part of it that holds
+the headlines) with a fast non-cryptographic hash tells us whether it is
+byte-for-byte the page we parsed last time; if it is, the previous
+extraction result is reused and no document is built at all.
+
+The memo lives in memory, so only the later runs of one process (the
+daemon) benefit, unless it is given a state file: then it is loaded at
+start-up and saved after every run, and separate runs (e.g. from cron)
+share it too.
+"""
+
+import threading
+import zlib
+
+from state_files import load_state, save_state
+
+try:
+    import xxhash
+except ImportError:  # xxhash is optional; zlib's CRC32 and Adler-32 are the fallback
+    xxhash = None
+
+
+def body_digest(body, region=None):
+    """Return a 64-bit digest of a response body
+
+    region is an optional compiled bytes regex; when it matches, only the
+    matched span is hashed, so volatile parts of the page (timestamps,
+    nonces, ads) outside it do not count as changes.
+    """
+    if region is not None:
+        match = region.search(body)
+        if match:
+            body = match.group(0)
+    if xxhash is not None:
+        return xxhash.xxh3_64_intdigest(body)
+    return (zlib.crc32(body) << 32) | zlib.adler32(body)
+
+
+class ExtractionMemo:
+    """Remembers the last body digest and extraction result of each site
+
+    The result is only reused when the digest and the extraction settings
+    (selectors, parser and filters) are unchanged. With state_file set the
+    entries are loaded from that JSON file and written back by save().
+    """
+
+    def __init__(self, state_file=None):
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.state_file = state_file
+        self.dirty = False
+        if state_file:
+            self._load()
+
+    def _load(self):
+        for name, entry in load_state(self.state_file).items():
+            try:
+                self.entries[name] = (entry['digest'], _freeze(entry['settings']),
+                                      [tuple(record) for record in entry['result']])
+            except (KeyError, TypeError):
+                continue
+
+    def save(self):
+        """Write the entries to the state file, if there is one and anything changed"""
+        with self.lock:
+            if not self.state_file or not self.dirty:
+                return
+            data = {name: {'digest': digest, 'settings': settings, 'result': result}
+                    for name, (digest, settings, result) in self.entries.items()}
+            save_state(self.state_file, data, ensure_ascii=False)
+            self.dirty = False
+
+    def get(self, name, digest, settings):
+        """Return the stored result for a site if its digest and settings match, else None"""
+        with self.lock:
+            entry = self.entries.get(name)
+            if entry is not None and entry[0] == digest and entry[1] == settings:
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+            return None
+
+    def store(self, name, digest, settings, result):
+        with self.lock:
+            self.entries[name] = (digest, settings, result)
+            self.dirty = True
+
+
+def _freeze(value):
+    """Turn the lists JSON gives back into the tuples the settings were built from"""
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
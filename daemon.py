@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Daemon mode for the News Headlines Scraper
+
+Keeps one NewsHeadlineScraper (and its HTTP session, cache and compiled
+selectors) alive, refreshes every source in a background thread and
+serves the current headline set from memory over a small local HTTP API:
+
+    GET /headlines                      all current headlines
+    GET /headlines?source=BBC           one source
+    GET /headlines?since=2024-05-01T08:00&limit=20
+    GET /sources                        refresh status per source
+    GET /metrics                        Prometheus metrics (with --metrics)
+    GET /health
+
+Responses are assembled from JSON fragments encoded once per refresh, so
+a read never waits for a scrape and costs the same however slow the
+sources are.
+"""
+
+import bisect
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from headline import parse_time
+
+
+def _iso(timestamp):
+    return datetime.fromtimestamp(timestamp).isoformat() if timestamp else None
+
+
+class HeadlineSnapshot:
+    """An immutable, pre-encoded view of the current headlines
+
+    Each headline is serialized once when the snapshot is built. The
+    unfiltered and per-source responses are complete byte strings; a
+    since query finds its first headline by bisection over the fetch
+    times and joins the fragments after it.
+    """
+
+    def __init__(self, headlines, generated_at):
+        self.headlines = headlines
+        self.generated_at = generated_at
+        encoded = [json.dumps(headline.to_dict(), ensure_ascii=False).encode('utf-8') for headline in headlines]
+        self.by_time = sorted(range(len(headlines)), key=lambda i: headlines[i].fetched_at or 0)
+        self.times = [headlines[i].fetched_at or 0 for i in self.by_time]
+        self.fragments = encoded
+        self.source_times = {}
+        self.source_order = {}
+        for i in self.by_time:
+            source = headlines[i].source
+            self.source_order.setdefault(source, []).append(i)
+            self.source_times.setdefault(source, []).append(headlines[i].fetched_at or 0)
+        self.body = self._render(range(len(headlines)))
+        self.source_bodies = {source: self._render([i for i in range(len(headlines)) if headlines[i].source == source])
+                              for source in self.source_order}
+
+    def _render(self, indexes):
+        indexes = list(indexes)
+        head = (f'{{"generated_at": {json.dumps(_iso(self.generated_at))}, '
+                f'"count": {len(indexes)}, "headlines": [').encode('utf-8')
+        return head + b', '.join(self.fragments[i] for i in indexes) + b']}'
+
+    def render(self, source=None, since=None, limit=None):
+        """Return the JSON response body for a query"""
+        if limit is not None and limit < 0:
+            raise ValueError(f"limit must not be negative: {limit}")
+        if since is None and limit is None:
+            if source is None:
+                return self.body
+            return self.source_bodies.get(source) or self._render(())
+
+        if source is None:
+            order, times = self.by_time, self.times
+        else:
+            order, times = self.source_order.get(source, []), self.source_times.get(source, [])
+        start = bisect.bisect_left(times, since) if since is not None else 0
+        indexes = order[start:]
+        if limit is not None:
+            # The newest ``limit`` matches, still oldest first
+            indexes = indexes[-limit:] if limit else []
+        return self._render(indexes)
+
+
+class ScraperDaemon:
+    """Refreshes sources in the background and serves them over HTTP"""
+
+    def __init__(self, scraper, interval=300, host='127.0.0.1', port=8765, persist=True):
+        """Wrap a configured NewsHeadlineScraper
+
+        Every enabled site is re-scraped every ``interval`` seconds, or at
+        its adaptive interval when the scraper has a poller. With
+        persist, headlines that were not in the previous snapshot are sent
+        to the scraper's stores (NDJSON, SQLite, archive), after its seen
+        index if one is configured.
+        """
+        self.scraper = scraper
+        self.interval = interval
+        self.host = host
+        self.port = port
+        self.persist = persist
+        self.sites = [site for site in scraper.sites.values() if site.enabled]
+        self.results = {site.name: [] for site in self.sites}
+        self.status = {site.name: {"last_refresh": None, "headlines": 0, "failures": 0} for site in self.sites}
+        self.next_due = {site.name: 0.0 for site in self.sites}
+        if scraper.poller is not None:
+            # Resume the schedule learned by earlier runs
+            now, clock = time.time(), time.monotonic()
+            for site in self.sites:
+                self.next_due[site.name] = clock + max(scraper.poller.next_poll(site.name) - now, 0)
+        self.snapshot = HeadlineSnapshot([], None)
+        self.stopped = threading.Event()
+        self.executor = ThreadPoolExecutor(max_workers=max(1, min(scraper.max_workers, len(self.sites))))
+        self.thread = None
+        self.server = None
+
+    def interval_for(self, site, headlines):
+        """Seconds until ``site`` is refreshed again, learned by the scraper's poller if it has one"""
+        if self.scraper.poller is not None:
+            return self.scraper.poller.record(site.name, headlines)
+        return self.interval
+
+    def refresh(self, sites):
+        """Scrape ``sites`` concurrently and publish a new snapshot"""
+        results = list(self.executor.map(self.scraper.scrape_site, sites))
+        now = time.time()
+        for site, headlines in zip(sites, results):
+            status = self.status[site.name]
+            if headlines:
+                # A failed or empty scrape keeps serving the last good headlines
+                self.results[site.name] = headlines
+                status["last_refresh"] = now
+                status["headlines"] = len(headlines)
+            else:
+                status["failures"] += 1
+            self.next_due[site.name] = time.monotonic() + self.interval_for(site, headlines)
+        if self.scraper.poller is not None:
+            self.scraper.poller.save()
+        if self.scraper.extraction_memo is not None:
+            self.scraper.extraction_memo.save()
+
+        merged = []
+        for site in self.sites:
+            merged.extend(self.results[site.name])
+        previous = {headline.title for headline in self.snapshot.headlines}
+        self.snapshot = HeadlineSnapshot(self.scraper.dedupe_headlines(merged), now)
+
+        if self.persist:
+            new_headlines = [headline for headline in self.snapshot.headlines if headline.title not in previous]
+            if self.scraper.seen_index is not None:
+                new_headlines = self.scraper.seen_index.filter_new(new_headlines)
+            if new_headlines:
+                self.scraper.save_headlines_stores(new_headlines)
+
+        if self.scraper.metrics_file:
+            # Rewritten after every refresh, for textfile collectors
+            try:
+                self.scraper.metrics.write(self.scraper.metrics_file)
+            except OSError as e:
+                print(f"❌ Error writing metrics: {e}")
+
+    def _run(self):
+        while not self.stopped.is_set():
+            now = time.monotonic()
+            due = [site for site in self.sites if self.next_due[site.name] <= now]
+            if due:
+                try:
+                    with self.scraper.profiler.stage('refresh'):
+                        self.refresh(due)
+                except Exception as e:
+                    print(f"❌ Refresh failed: {e}")
+                    for site in due:
+                        self.next_due[site.name] = time.monotonic() + self.interval
+            wait = min(self.next_due.values(), default=now + self.interval) - time.monotonic()
+            self.stopped.wait(max(wait, 0.1))
+
+    def start(self):
+        """Start the refresh thread and the HTTP server thread"""
+        handler = type('Handler', (_APIHandler,), {'service': self})
+        self.server = ThreadingHTTPServer((self.host, self.port), handler)
+        self.port = self.server.server_address[1]
+        self.scraper.profiler.start()
+        self.thread = threading.Thread(target=self._run, name='headline-refresh', daemon=True)
+        self.thread.start()
+        threading.Thread(target=self.server.serve_forever, name='headline-api', daemon=True).start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+        if self.thread is not None:
+            self.thread.join()
+        self.executor.shutdown()
+        if self.scraper.metrics_file:
+            self.scraper.save_metrics(self.scraper.metrics_file)
+        if self.scraper.profiler.enabled:
+            # The whole session is one profile
+            self.scraper.save_profile(self.scraper.profile_dir)
+
+    def serve_forever(self):
+        """Run until interrupted"""
+        self.start()
+        print(f"🌐 Serving headlines on http://{self.host}:{self.port}/headlines "
+              f"(refreshing every {self.interval:g}s, Ctrl+C to stop)")
+        try:
+            self.stopped.wait()
+        finally:
+            self.stop()
+
+    def source_status(self):
+        return {name: {"last_refresh": _iso(status["last_refresh"]), "headlines": status["headlines"],
+                       "failures": status["failures"],
+                       "next_refresh_in": round(max(self.next_due[name] - time.monotonic(), 0), 1)}
+                for name, status in self.status.items()}
+
+
+class _APIHandler(BaseHTTPRequestHandler):
+    """Answers API requests from the daemon's current snapshot"""
+
+    service = None
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out as separate writes; without this, Nagle's
+    # algorithm and delayed ACKs add ~40 ms to every keep-alive response
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == '/headlines':
+            params = parse_qs(url.query)
+            try:
+                source = params.get('source', [None])[0]
+                since = parse_time(params['since'][0]) if 'since' in params else None
+                limit = int(params['limit'][0]) if 'limit' in params else None
+                if limit is not None and limit < 0:
+                    raise ValueError(f"limit must not be negative: {limit}")
+            except ValueError as e:
+                self._send(400, json.dumps({"error": str(e)}).encode('utf-8'))
+                return
+            self._send(200, self.service.snapshot.render(source, since, limit))
+        elif url.path == '/sources':
+            self._send(200, json.dumps(self.service.source_status(), ensure_ascii=False).encode('utf-8'))
+        elif url.path == '/metrics' and self.service.scraper.metrics.enabled:
+            body = self.service.scraper.metrics.render().encode('utf-8')
+            self._send(200, body, 'text/plain; version=0.0.4; charset=utf-8')
+        elif url.path == '/health':
+            self._send(200, b'{"status": "ok"}')
+        else:
+            self._send(404, b'{"error": "not found"}')
+
+    def _send(self, status, body, content_type='application/json; charset=utf-8'):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Duplicate detection for the News Headlines Scraper
+
+Catches the same story reported with slightly different wording by
+comparing MinHash signatures of character shingles. A banded
+locality-sensitive hashing (LSH) index keeps lookups sub-linear: a new
+headline is only compared with the few stored headlines that share at
+least one band with it, never with the whole corpus.
+
+SeenIndex remembers headlines across runs in SQLite, so scheduled runs
+only report what is new since the last one.
+"""
+
+import hashlib
+import math
+import random
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from array import array
+from functools import lru_cache
+
+_NON_WORD = re.compile(r'[^\w\s]+')
+_SPACES = re.compile(r'\s+')
+_MASK64 = (1 << 64) - 1
+_EMPTY = _MASK64
+
+
+def normalize_title(title):
+    """Lower-case a headline and drop punctuation and repeated whitespace"""
+    return _SPACES.sub(' ', _NON_WORD.sub(' ', title.lower())).strip()
+
+
+def _hash64(data, seed):
+    """Hash bytes to 64 well-mixed bits: seeded CRC32 followed by the splitmix64 finalizer"""
+    x = zlib.crc32(data, seed)
+    x = ((x ^ (x >> 30)) * 0xbf58476d1ce4e5b9) & _MASK64
+    x = ((x ^ (x >> 27)) * 0x94d049bb133111eb) & _MASK64
+    return x ^ (x >> 31)
+
+
+def shingles(text, size=4, seed=0):
+    """Return the set of 64-bit hashes of the character shingles of a normalized headline"""
+    text = normalize_title(text).encode('utf-8')
+    if len(text) <= size:
+        return {_hash64(text, seed)}
+    return {_hash64(text[i:i + size], seed) for i in range(len(text) - size + 1)}
+
+
+def _integrate(func, low, high, steps=200):
+    width = (high - low) / steps
+    return sum(func(low + (i + 0.5) * width) for i in range(steps)) * width
+
+
+@lru_cache(maxsize=None)
+def choose_bands(num_perm, threshold, false_positive_weight=0.2, false_negative_weight=0.8):
+    """Pick (bands, rows) with bands * rows <= num_perm for an LSH threshold
+
+    Two items become candidates with probability 1 - (1 - s**rows)**bands.
+    This picks the layout minimising the weighted area of false positives
+    (candidates below the threshold) and false negatives (misses above it).
+    Misses are weighted higher because every candidate is verified against
+    its signature afterwards, so a false positive only costs a comparison.
+    """
+    best = None
+    for bands in range(1, num_perm + 1):
+        for rows in range(1, num_perm // bands + 1):
+            def probability(similarity):
+                return 1 - (1 - similarity ** rows) ** bands
+            false_positives = _integrate(probability, 0.0, threshold)
+            false_negatives = _integrate(lambda similarity: 1 - probability(similarity), threshold, 1.0)
+            error = false_positive_weight * false_positives + false_negative_weight * false_negatives
+            if best is None or error < best[0]:
+                best = (error, bands, rows)
+    return best[1], best[2]
+
+
+class MinHasher:
+    """Computes fixed-length MinHash signatures with one-permutation hashing
+
+    Instead of hashing every shingle once per signature slot, each shingle
+    is hashed once and routed to one of ``num_perm`` bins that keeps its
+    minimum, so a signature costs O(shingles) rather than O(shingles *
+    num_perm). Empty bins, common for short headlines, borrow the value of
+    another bin chosen by a fixed pseudo-random probe sequence ("optimal
+    densification"), which keeps the fraction of equal slots an unbiased
+    estimate of Jaccard similarity.
+    """
+
+    def __init__(self, num_perm=128, shingle_size=4, seed=1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.seed = seed & 0xffffffff
+        rng = random.Random(seed)
+        self.probes = [[rng.randrange(num_perm) for _ in range(4 * num_perm)] for _ in range(num_perm)]
+
+    def signature(self, text):
+        """Return the MinHash signature of a headline as a compact array of 32-bit integers"""
+        bins = self.num_perm
+        slots = [_EMPTY] * bins
+        for value in shingles(text, self.shingle_size, self.seed):
+            index = value % bins
+            value //= bins
+            if value < slots[index]:
+                slots[index] = value
+
+        if _EMPTY in slots:
+            filled = slots[:]
+            for index in range(bins):
+                if slots[index] != _EMPTY:
+                    continue
+                for donor in self.probes[index]:
+                    if slots[donor] != _EMPTY:
+                        filled[index] = slots[donor]
+                        break
+            slots = filled
+        return array('I', (value & 0xffffffff for value in slots))
+
+
+def estimate_similarity(first, second):
+    """Estimate the Jaccard similarity of two headlines from their signatures"""
+    return sum(1 for x, y in zip(first, second) if x == y) / len(first)
+
+
+class NearDuplicateIndex:
+    """An LSH index of MinHash signatures for near-duplicate headline lookup"""
+
+    def __init__(self, threshold=0.65, num_perm=128, shingle_size=4, seed=1):
+        """Create an index
+
+        threshold is the estimated Jaccard similarity of character shingles
+        above which two headlines count as the same story.
+        """
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be in (0, 1]")
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm, shingle_size, seed)
+        self.bands, self.rows = choose_bands(num_perm, threshold)
+        self.buckets = [{} for _ in range(self.bands)]
+        self.signatures = {}
+
+    def __len__(self):
+        return len(self.signatures)
+
+    def _band_keys(self, signature):
+        rows = self.rows
+        for band in range(self.bands):
+            yield band, signature[band * rows:(band + 1) * rows].tobytes()
+
+    def query(self, text, signature=None):
+        """Return (key, similarity) of the most similar stored headline above the threshold, or None"""
+        signature = signature or self.hasher.signature(text)
+        candidates = set()
+        for band, band_key in self._band_keys(signature):
+            candidates.update(self.buckets[band].get(band_key, ()))
+
+        best = None
+        for key in candidates:
+            similarity = estimate_similarity(signature, self.signatures[key])
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (key, similarity)
+        return best
+
+    def add(self, key, text, signature=None):
+        """Store a headline under ``key``"""
+        signature = signature or self.hasher.signature(text)
+        self.signatures[key] = signature
+        for band, band_key in self._band_keys(signature):
+            self.buckets[band].setdefault(band_key, []).append(key)
+
+    def add_if_new(self, key, text):
+        """Store a headline unless a near-duplicate exists; return the duplicate's key or None"""
+        signature = self.hasher.signature(text)
+        match = self.query(text, signature)
+        if match is not None:
+            return match[0]
+        self.add(key, text, signature)
+        return None
+
+
+def title_hash(title):
+    """Return a stable signed 64-bit hash of a normalized headline (fits an SQLite INTEGER)"""
+    digest = hashlib.blake2b(normalize_title(title).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=True)
+
+
+class BloomFilter:
+    """A fixed-size Bloom filter over 64-bit integer keys
+
+    The k bit positions come from the two 32-bit halves of the key
+    (Kirsch-Mitzenmacher double hashing), so keys must already be
+    well-mixed hashes such as those from title_hash.
+    """
+
+    def __init__(self, capacity, error_rate=0.01):
+        capacity = max(capacity, 1)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        key &= _MASK64
+        first, second = key & 0xffffffff, (key >> 32) | 1
+        for i in range(self.num_hashes):
+            yield (first + i * second) % self.num_bits
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class SeenIndex:
+    """A persistent record of headlines already reported, with expiry
+
+    Headlines are keyed by title_hash and stored in an SQLite table with
+    the time they were first and last seen. A Bloom filter loaded at open
+    answers most lookups for new headlines without touching the database;
+    the rest are a single primary-key lookup, so the cost per headline
+    does not grow with history. Entries not seen for ``ttl`` seconds
+    expire, letting a story that returns after a long gap be reported again.
+    """
+
+    def __init__(self, path, ttl=7 * 24 * 3600, error_rate=0.01):
+        """Open (or create) the index stored in the SQLite file at ``path``"""
+        self.path = path
+        self.ttl = ttl
+        self.error_rate = error_rate
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.connection:
+            self.connection.execute('PRAGMA journal_mode=WAL')
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS seen ('
+                ' hash INTEGER PRIMARY KEY, source TEXT, title TEXT,'
+                ' first_seen REAL NOT NULL, last_seen REAL NOT NULL)')
+            self.connection.execute('CREATE INDEX IF NOT EXISTS seen_last_seen ON seen (last_seen)')
+        self.expire()
+        self._load_filter()
+
+    def _cutoff(self, now):
+        return now - self.ttl if self.ttl else None
+
+    def _load_filter(self):
+        """Rebuild the Bloom filter from the live rows, sized with room to grow"""
+        keys = [row[0] for row in self.connection.execute('SELECT hash FROM seen')]
+        self.bloom = BloomFilter(max(2 * len(keys), 1024), self.error_rate)
+        for key in keys:
+            self.bloom.add(key)
+
+    def expire(self, now=None):
+        """Delete entries older than the TTL; return how many were removed"""
+        cutoff = self._cutoff(now or time.time())
+        if cutoff is None:
+            return 0
+        with self.lock, self.connection:
+            return self.connection.execute('DELETE FROM seen WHERE last_seen < ?', (cutoff,)).rowcount
+
+    def __len__(self):
+        with self.lock:
+            return self.connection.execute('SELECT COUNT(*) FROM seen').fetchone()[0]
+
+    def __contains__(self, title):
+        key = title_hash(title)
+        if key not in self.bloom:
+            return False
+        cutoff = self._cutoff(time.time())
+        with self.lock:
+            row = self.connection.execute('SELECT last_seen FROM seen WHERE hash = ?', (key,)).fetchone()
+        return row is not None and (cutoff is None or row[0] >= cutoff)
+
+    def filter_new(self, headlines, now=None):
+        """Return the headlines not seen within the TTL and record all of them as seen
+
+        Headlines already known have their last-seen time refreshed, so a
+        story that stays on a front page keeps being suppressed. All writes
+        happen in one transaction.
+        """
+        now = now or time.time()
+        cutoff = self._cutoff(now)
+        new_headlines = []
+        with self.lock, self.connection:
+            cursor = self.connection.cursor()
+            for headline in headlines:
+                key = title_hash(headline.title)
+                row = None
+                if key in self.bloom:
+                    row = cursor.execute('SELECT last_seen FROM seen WHERE hash = ?', (key,)).fetchone()
+                if row is not None:
+                    if cutoff is None or row[0] >= cutoff:
+                        cursor.execute('UPDATE seen SET last_seen = ? WHERE hash = ?', (now, key))
+                        continue
+                    cursor.execute('UPDATE seen SET source = ?, title = ?, first_seen = ?, last_seen = ? WHERE hash = ?',
+                                   (headline.source, headline.title, now, now, key))
+                else:
+                    cursor.execute('INSERT INTO seen (hash, source, title, first_seen, last_seen) VALUES (?, ?, ?, ?, ?)',
+                                   (key, headline.source, headline.title, now, now))
+                    self.bloom.add(key)
+                new_headlines.append(headline)
+
+            if self.bloom.count > self.bloom.capacity:
+                self._load_filter()
+        return new_headlines
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,459 @@
+#!/usr/bin/env python3
+"""
+HTML parsing backends for the News Headlines Scraper
+
+Three interchangeable backends are supported:
+
+- ``html.parser``: BeautifulSoup with Python's built-in tree builder
+- ``lxml``: BeautifulSoup with the lxml tree builder
+- ``lxml-direct``: lxml.html with compiled CSS selectors, skipping BeautifulSoup
+
+All of them return the same (selector, text, link) triples so the scrapers
+do not need to know which one is in use.
+
+Selectors are compiled once into an ExtractionPlan that walks the document a
+single time, matching every selector of a site at each element, instead of
+running one full-document ``select`` per selector.
+"""
+
+import codecs
+import itertools
+import re
+import threading
+import time
+from functools import lru_cache
+
+from bs4 import BeautifulSoup, Tag
+from bs4.dammit import EncodingDetector
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:  # lxml is optional; only the lxml backends need it
+    lxml = None
+    etree = None
+
+PARSER_BACKENDS = ('html.parser', 'lxml', 'lxml-direct')
+DEFAULT_PARSER = 'html.parser'
+
+# Bytes fed to the incremental lxml parser at a time
+CHUNK_SIZE = 16 * 1024
+
+# Text inside these elements is not part of a headline (matches BeautifulSoup's get_text)
+_TEXT_XPATH_SOURCE = './/text()[not(parent::script or parent::style or parent::template)]'
+
+
+def check_backend(parser):
+    """Raise ValueError for an unknown backend and ImportError if its dependencies are missing"""
+    if parser not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown parser backend {parser!r}; choose from {', '.join(PARSER_BACKENDS)}")
+    if parser != 'html.parser' and etree is None:
+        raise ImportError(f"The {parser!r} parser backend requires lxml (pip install lxml)")
+    if parser == 'lxml-direct':
+        try:
+            import cssselect  # noqa: F401
+        except ImportError:
+            raise ImportError("The 'lxml-direct' parser backend requires cssselect (pip install cssselect)")
+    return parser
+
+
+@lru_cache(maxsize=None)
+def _compiled_css(selector):
+    """Compile a CSS selector to an lxml XPath evaluator once per process"""
+    from lxml.cssselect import CSSSelector
+    return CSSSelector(selector, translator='html')
+
+
+@lru_cache(maxsize=None)
+def _self_match_translator():
+    """Return a cssselect translator whose XPath tests the context element itself
+
+    cssselect normally produces expressions that search downwards from the
+    context node. Rewriting each combinator as a condition on ancestors or
+    preceding siblings turns ``div h2`` into ``h2[ancestor::div]``, which can
+    be evaluated against one element during a single traversal.
+    """
+    from cssselect import HTMLTranslator
+
+    class SelfMatchTranslator(HTMLTranslator):
+        def xpath_descendant_combinator(self, left, right):
+            return right.add_condition(f"ancestor::{left}")
+
+        def xpath_child_combinator(self, left, right):
+            return right.add_condition(f"parent::{left}")
+
+        def xpath_direct_adjacent_combinator(self, left, right):
+            return right.add_condition(f"preceding-sibling::*[1][self::{left}]")
+
+        def xpath_indirect_adjacent_combinator(self, left, right):
+            return right.add_condition(f"preceding-sibling::{left}")
+
+    return SelfMatchTranslator()
+
+
+def _compile_self_match(selector):
+    """Compile a CSS selector into an lxml XPath returning True when the context element matches"""
+    from cssselect import parse
+    translator = _self_match_translator()
+    tests = ' or '.join(translator.selector_to_xpath(parsed, prefix='self::') for parsed in parse(selector))
+    return etree.XPath(f"boolean({tests})")
+
+
+@lru_cache(maxsize=None)
+def _text_xpath():
+    return etree.XPath(_TEXT_XPATH_SOURCE, smart_strings=False)
+
+
+def detect_encoding(head, declared=None):
+    """Pick the encoding every parser backend decodes a document with
+
+    ``head`` is the body, or its first chunk when streaming. Candidates are
+    tried in UnicodeDammit's order: the charset declared by the transport
+    (the Content-Type header), a byte order mark, a <meta> declaration,
+    then UTF-8 and Windows-1252; the first that decodes ``head`` wins.
+    Statistical guessing is left out, since a first chunk is often too
+    short to guess from. Without this lxml-direct assumes Latin-1 for a
+    UTF-8 page whose charset is only in the header.
+    """
+    _, sniffed = EncodingDetector.strip_byte_order_mark(head)
+    candidates = (declared, sniffed, EncodingDetector.find_declared_encoding(head, is_html=True),
+                  'utf-8', 'windows-1252')
+    for encoding in filter(None, candidates):
+        try:
+            # Not final: a streamed chunk may end inside a character
+            codecs.getincrementaldecoder(encoding)().decode(head)
+        except (LookupError, UnicodeDecodeError):
+            continue
+        return encoding
+    return 'latin-1'  # decodes anything
+
+
+def parse_document(content, parser=DEFAULT_PARSER, encoding=None):
+    """Parse an HTML document with the given backend
+
+    ``encoding`` is the charset the transport declared, if any; see
+    detect_encoding. Returns a BeautifulSoup object for the BeautifulSoup
+    backends and an lxml root element (or None for an empty document) for
+    ``lxml-direct``.
+    """
+    encoding = detect_encoding(content, encoding)
+    if parser == 'lxml-direct':
+        if not content or not content.strip():
+            return None
+        try:
+            return lxml.html.fromstring(content, parser=lxml.html.HTMLParser(encoding=encoding))
+        except etree.ParserError:
+            return None
+    return BeautifulSoup(content, parser, from_encoding=encoding)
+
+
+def element_text(element):
+    """Return the stripped text of an lxml element, like Tag.get_text(strip=True)"""
+    return ''.join(part.strip() for part in _text_xpath()(element))
+
+
+def element_link(element):
+    """Return the href of the link an lxml element is in, is, or contains, or None"""
+    if element.tag == 'a' and element.get('href'):
+        return element.get('href')
+    for ancestor in element.iterancestors('a'):
+        if ancestor.get('href'):
+            return ancestor.get('href')
+    descendant = element.find('.//a[@href]')
+    return descendant.get('href') if descendant is not None else None
+
+
+def tag_link(tag):
+    """Return the href of the link a BeautifulSoup tag is in, is, or contains, or None"""
+    if tag.name == 'a' and tag.get('href'):
+        return tag['href']
+    link = tag.find_parent('a', href=True) or tag.find('a', href=True)
+    return link['href'] if link is not None else None
+
+
+def iter_selector_text(document, selectors, parser=DEFAULT_PARSER, per_selector_limit=None):
+    """Yield (selector, text) for every element matching each selector in turn
+
+    This is the straightforward one-walk-per-selector approach, kept as a
+    reference for ExtractionPlan. per_selector_limit caps how many matches
+    are taken from each selector.
+    """
+    if document is None:
+        return
+    for selector in selectors:
+        if parser == 'lxml-direct':
+            elements = _compiled_css(selector)(document)
+        else:
+            elements = document.select(selector)
+        if per_selector_limit is not None:
+            elements = elements[:per_selector_limit]
+        for element in elements:
+            if parser == 'lxml-direct':
+                yield selector, element_text(element)
+            else:
+                yield selector, element.get_text(strip=True)
+
+
+# The rightmost compound selector decides which elements a selector can match
+_COMBINATOR_SPLIT = re.compile(r'\s*[\s>+~]\s*(?![^\[]*\])(?![^(]*\))')
+_TAG_NAME = re.compile(r'^([a-zA-Z][\w-]*)')
+_ID_NAME = re.compile(r'#([\w-]+)(?![^\[]*\])')
+_CLASS_NAME = re.compile(r'\.([\w-]+)(?![^\[]*\])')
+
+
+def _rule_key(selector):
+    """Return the ('id'|'class'|'tag'|'any', name) bucket a selector is indexed under
+
+    Pseudo-classes can nest selectors or take strings (``:has(> a.title)``,
+    ``:-soup-contains("v1.2")``) that the regexes would misread, so any
+    selector using one is checked at every element instead.
+    """
+    if ',' in selector or ':' in selector or '(' in selector:
+        return 'any', None
+    compound = _COMBINATOR_SPLIT.split(selector.strip())[-1]
+    match = _ID_NAME.search(compound)
+    if match:
+        return 'id', match.group(1)
+    match = _CLASS_NAME.search(compound)
+    if match:
+        return 'class', match.group(1)
+    match = _TAG_NAME.match(compound)
+    if match:
+        return 'tag', match.group(1).lower()
+    return 'any', None
+
+
+class ExtractionPlan:
+    """A compiled set of selectors matched in a single document traversal
+
+    Selectors are bucketed by the id, class or tag name their rightmost
+    compound requires (the rule-hashing trick browsers use), so at each
+    element only the few selectors that could possibly match are tested.
+    Matches come back in document order, tagged with the selector that hit.
+
+    For ``lxml-direct`` the traversal itself runs inside libxml2: all
+    selectors are compiled into one XPath union that returns candidate
+    elements in document order, and only those are tagged in Python.
+    """
+
+    def __init__(self, selectors, per_selector_limit=None):
+        self.selectors = tuple(selectors)
+        self.per_selector_limit = per_selector_limit
+        self.buckets = {'id': {}, 'class': {}, 'tag': {}}
+        self.universal = []
+        for index, selector in enumerate(self.selectors):
+            kind, name = _rule_key(selector)
+            if kind == 'any':
+                self.universal.append(index)
+            else:
+                self.buckets[kind].setdefault(name, []).append(index)
+        self._local = threading.local()
+
+    def _matchers_for(self, parser):
+        """Compile (once per thread) the per-selector match functions for a backend
+
+        Returns (matchers, union) where union is the lxml XPath union used to
+        find candidates in a complete document, or None for BeautifulSoup.
+        Compiled lxml XPath objects are not shared between threads.
+        """
+        compiled = getattr(self._local, 'compiled', None)
+        if compiled is None:
+            compiled = self._local.compiled = {}
+        if parser not in compiled:
+            if parser == 'lxml-direct':
+                from cssselect import HTMLTranslator
+                translator = HTMLTranslator()
+                union = etree.XPath(' | '.join(translator.css_to_xpath(selector)
+                                               for selector in self.selectors))
+                compiled[parser] = ([_compile_self_match(selector) for selector in self.selectors], union)
+            else:
+                import soupsieve
+                compiled[parser] = ([soupsieve.compile(selector).match for selector in self.selectors], None)
+        return compiled[parser]
+
+    def _candidates(self, name, element_id, classes):
+        """Return the indexes of selectors that could match an element, in plan order"""
+        found = list(self.universal)
+        found.extend(self.buckets['tag'].get(name, ()))
+        if element_id:
+            found.extend(self.buckets['id'].get(element_id, ()))
+        for class_name in classes:
+            found.extend(self.buckets['class'].get(class_name, ()))
+        if len(found) > 1:
+            found = sorted(set(found))
+        return found
+
+    def _iter_elements(self, document, parser, union=None):
+        """Yield (element, name, id, classes) for every candidate element in document order"""
+        if parser == 'lxml-direct':
+            for element in union(document):
+                yield element, element.tag, element.get('id'), element.get('class', '').split()
+        else:
+            for element in document.descendants:
+                if isinstance(element, Tag):
+                    classes = element.get('class') or ()
+                    if isinstance(classes, str):
+                        classes = classes.split()
+                    yield element, element.name, element.get('id'), classes
+
+    def _match(self, elements, matchers):
+        """Yield (selector, element) for the elements that match, honouring per-selector limits
+
+        Stops as soon as every selector has reached its per-selector limit.
+        """
+        limit = self.per_selector_limit
+        counts = [0] * len(self.selectors)
+
+        for element, name, element_id, classes in elements:
+            candidates = self._candidates(name, element_id, classes)
+            if not candidates:
+                continue
+            hit = None
+            for index in candidates:
+                if not matchers[index](element):
+                    continue
+                counts[index] += 1
+                # An element is kept if any selector that matched it is still under its limit
+                if hit is None and (limit is None or counts[index] <= limit):
+                    hit = index
+            if hit is not None:
+                yield self.selectors[hit], element
+                if limit is not None and min(counts) >= limit:
+                    return
+
+    def iter_matches(self, document, parser=DEFAULT_PARSER):
+        """Yield (selector, element) for every matching element in document order
+
+        The traversal is lazy: it only goes as far into the document as the
+        caller consumes.
+        """
+        if document is None:
+            return
+        matchers, union = self._matchers_for(parser)
+        yield from self._match(self._iter_elements(document, parser, union), matchers)
+
+    def iter_incremental(self, chunks, encoding=None, timings=None):
+        """Parse an iterable of byte chunks with lxml and yield (selector, element) as elements close
+
+        Parsing stops when the caller stops consuming, so the rest of the
+        document is never parsed. Elements are reported when their end tag
+        is seen, which is document order except for nested matches.
+        Selectors that look ahead (such as ``:last-child``) are evaluated
+        against the part of the document parsed so far. If ``timings`` is a
+        dict, the seconds spent inside the parser are added to its 'parse' key.
+        """
+        matchers, _ = self._matchers_for('lxml-direct')
+        parser = etree.HTMLPullParser(events=('end',), encoding=encoding)
+
+        def closed_elements():
+            for chunk in chunks:
+                if not chunk:
+                    continue
+                if timings is None:
+                    parser.feed(chunk)
+                else:
+                    start = time.perf_counter()
+                    parser.feed(chunk)
+                    timings['parse'] = timings.get('parse', 0.0) + time.perf_counter() - start
+                for _, element in parser.read_events():
+                    yield element, element.tag, element.get('id'), element.get('class', '').split()
+            try:
+                parser.close()
+            except etree.XMLSyntaxError:
+                return  # an empty document
+            for _, element in parser.read_events():
+                yield element, element.tag, element.get('id'), element.get('class', '').split()
+
+        yield from self._match(closed_elements(), matchers)
+
+    def extract(self, document, parser=DEFAULT_PARSER):
+        """Yield (selector, text, link) for every matching element in document order"""
+        for selector, element in self.iter_matches(document, parser):
+            if parser == 'lxml-direct':
+                yield selector, element_text(element), element_link(element)
+            else:
+                yield selector, element.get_text(strip=True), tag_link(element)
+
+
+@lru_cache(maxsize=None)
+def compile_plan(selectors, per_selector_limit=None):
+    """Return a cached ExtractionPlan for a tuple of selectors
+
+    The cache is unbounded: there is one entry per distinct selector set
+    in the registry, and a bounded cache polled round-robin by more sites
+    than it holds would recompile every plan on every scrape.
+    """
+    return ExtractionPlan(selectors, per_selector_limit)
+
+
+def iter_chunks(content, chunk_size=CHUNK_SIZE):
+    """Split a bytes body into chunks for the incremental parser"""
+    for offset in range(0, len(content), chunk_size):
+        yield content[offset:offset + chunk_size]
+
+
+def cap_chunks(chunks, max_bytes):
+    """Pass chunks through until ``max_bytes`` have been produced, truncating the last one"""
+    remaining = max_bytes
+    for chunk in chunks:
+        if remaining <= 0:
+            return
+        if len(chunk) > remaining:
+            chunk = chunk[:remaining]
+        remaining -= len(chunk)
+        yield chunk
+
+
+def iter_headlines(source, plan, parser=DEFAULT_PARSER, min_length=1, max_length=None, limit=None,
+                   encoding=None, timings=None):
+    """Lazily yield (selector, text, link) for headlines that pass the length filter, stopping after ``limit``
+
+    ``source`` is either the whole body as bytes or an iterable of byte
+    chunks, such as a streamed response. With ``lxml-direct`` the chunks are
+    parsed incrementally and nothing more is read or parsed once the
+    traversal stops. The BeautifulSoup backends have to join the chunks and
+    build the whole tree first, but the traversal still stops early.
+    ``encoding`` is the charset declared in the response headers, if any
+    (see detect_encoding). Passing a dict as ``timings`` collects the
+    seconds spent parsing under its 'parse' key, so callers can tell
+    parsing from extraction.
+    """
+    if limit is not None and limit <= 0:
+        return
+    chunks = iter_chunks(source) if isinstance(source, bytes) else source
+    if parser == 'lxml-direct':
+        if isinstance(source, bytes):
+            encoding = detect_encoding(source, encoding)
+        else:
+            chunks = iter(chunks)
+            first = next(chunks, b'')
+            encoding = detect_encoding(first, encoding)
+            chunks = itertools.chain((first,), chunks)
+        matches = ((selector, element_text(element), element_link(element))
+                   for selector, element in plan.iter_incremental(chunks, encoding, timings))
+    else:
+        content = source if isinstance(source, bytes) else b''.join(chunks)
+        start = time.perf_counter()
+        document = parse_document(content, parser, encoding)
+        if timings is not None:
+            timings['parse'] = timings.get('parse', 0.0) + time.perf_counter() - start
+        matches = plan.extract(document, parser)
+
+    found = 0
+    for selector, text, link in matches:
+        if not text or len(text) < min_length or (max_length is not None and len(text) > max_length):
+            continue
+        yield selector, text, link
+        found += 1
+        if limit is not None and found >= limit:
+            return
+
+
+def extract_headlines(source, selectors, parser=DEFAULT_PARSER, per_selector_limit=None,
+                      min_length=1, max_length=None, limit=None, encoding=None):
+    """Return up to ``limit`` (selector, text, link) triples for ``selectors`` whose text length is in range
+
+    ``source`` is a bytes body or an iterable of byte chunks.
+    """
+    plan = compile_plan(tuple(selectors), per_selector_limit)
+    return list(iter_headlines(source, plan, parser, min_length, max_length, limit, encoding))
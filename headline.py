@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Headline record for the News Headlines Scraper
+
+Headlines travel through the pipeline as Headline objects and are only
+formatted as "[SOURCE] title" text when they are written out.
+"""
+
+from datetime import datetime, timezone
+
+
+def parse_time(value):
+    """Parse an ISO 8601 date/time or a POSIX timestamp given on a command line or in a query
+
+    Returns a POSIX timestamp; an ISO string without a UTC offset is read
+    as local time. Raises ValueError for anything else.
+    """
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+class Headline:
+    """A single scraped headline"""
+
+    __slots__ = ('source', 'title', 'url', 'fetched_at', 'selector')
+
+    def __init__(self, source, title, url=None, fetched_at=None, selector=None):
+        """Create a headline
+
+        url is the article link (or the page it was found on), fetched_at a
+        POSIX timestamp of the fetch and selector the CSS selector that hit.
+        """
+        self.source = source
+        self.title = title
+        self.url = url
+        self.fetched_at = fetched_at
+        self.selector = selector
+
+    def __str__(self):
+        return f"[{self.source}] {self.title}"
+
+    def __repr__(self):
+        return f"Headline(source={self.source!r}, title={self.title!r}, url={self.url!r})"
+
+    def __eq__(self, other):
+        if not isinstance(other, Headline):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    @property
+    def fetched_iso(self):
+        """The fetch time as an ISO 8601 string in local time with its UTC offset, or None
+
+        The offset keeps the string unambiguous, so it reads back as the
+        same instant in any timezone and in the repeated hour at the end of
+        daylight saving time.
+        """
+        if self.fetched_at is None:
+            return None
+        return datetime.fromtimestamp(self.fetched_at, timezone.utc).astimezone().isoformat()
+
+    def to_dict(self):
+        """Return the headline as a JSON-serializable dict"""
+        return {
+            "source": self.source,
+            "title": self.title,
+            "url": self.url,
+            "fetched_at": self.fetched_iso,
+            "selector": self.selector,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a headline from the output of to_dict
+
+        Strings without a UTC offset, as older records were written, are
+        read as local time.
+        """
+        fetched_at = data.get("fetched_at")
+        if isinstance(fetched_at, str):
+            fetched_at = datetime.fromisoformat(fetched_at).timestamp()
+        return cls(data["source"], data["title"], data.get("url"), fetched_at, data.get("selector"))
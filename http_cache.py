@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+On-disk HTTP cache for the News Headlines Scraper
+
+Stores response bodies together with their validators (ETag and
+Last-Modified) and revalidates them with conditional GET requests, so an
+unchanged front page costs a 304 response instead of a full download.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# Headers that describe the transfer rather than the stored (decoded) body
+HOP_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection'}
+
+
+class CacheEntry:
+    """Metadata for one cached response"""
+
+    __slots__ = ('key', 'url', 'etag', 'last_modified', 'headers', 'size', 'stored_at', 'accessed_at')
+
+    def __init__(self, key, url, etag, last_modified, headers, size, stored_at, accessed_at):
+        self.key = key
+        self.url = url
+        self.etag = etag
+        self.last_modified = last_modified
+        self.headers = headers
+        self.size = size
+        self.stored_at = stored_at
+        self.accessed_at = accessed_at
+
+    def to_dict(self):
+        """Return the entry as a JSON-serializable dict"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class HTTPCache:
+    """A size-bounded, least-recently-used cache of response bodies on disk"""
+
+    def __init__(self, directory, max_bytes=50 * 1024 * 1024):
+        """Open (or create) a cache in ``directory`` holding at most ``max_bytes`` of bodies"""
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.entries = {}
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    @staticmethod
+    def key_for(url):
+        """Return the file name stem used for a URL"""
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def _path(self, key, suffix):
+        return os.path.join(self.directory, key + suffix)
+
+    def _load(self):
+        """Rebuild the in-memory index from the metadata files on disk"""
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            key = name[:-len('.json')]
+            try:
+                with open(self._path(key, '.json'), encoding='utf-8') as file:
+                    entry = CacheEntry(**json.load(file))
+                if os.path.getsize(self._path(key, '.body')) != entry.size:
+                    raise ValueError("body size does not match metadata")
+            except (OSError, ValueError, TypeError):
+                self._remove_files(key)
+                continue
+            self.entries[key] = entry
+            self.total_bytes += entry.size
+
+    def _remove_files(self, key):
+        for suffix in ('.json', '.body'):
+            try:
+                os.remove(self._path(key, suffix))
+            except FileNotFoundError:
+                pass
+
+    def _write_atomic(self, path, data):
+        """Write bytes to ``path`` so readers never see a partial file"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                file.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def get(self, url):
+        """Return the CacheEntry for a URL, or None"""
+        with self.lock:
+            return self.entries.get(self.key_for(url))
+
+    def read_body(self, entry):
+        """Return the stored body for an entry and mark it as recently used"""
+        with open(self._path(entry.key, '.body'), 'rb') as file:
+            body = file.read()
+        with self.lock:
+            entry.accessed_at = time.time()
+        return body
+
+    def store(self, url, headers, body):
+        """Store a response body with its validators, evicting old entries if needed"""
+        if len(body) > self.max_bytes:
+            return None
+        key = self.key_for(url)
+        now = time.time()
+        kept_headers = {k: v for k, v in headers.items() if k.lower() not in HOP_HEADERS}
+        entry = CacheEntry(key, url, headers.get('ETag'), headers.get('Last-Modified'),
+                           kept_headers, len(body), now, now)
+
+        with self.lock:
+            self._write_atomic(self._path(key, '.body'), body)
+            self._write_atomic(self._path(key, '.json'), json.dumps(entry.to_dict()).encode('utf-8'))
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.total_bytes -= old.size
+            self.entries[key] = entry
+            self.total_bytes += entry.size
+            self._evict()
+        return entry
+
+    def touch(self, entry, headers):
+        """Refresh an entry after a 304 response, merging any updated validators"""
+        with self.lock:
+            entry.etag = headers.get('ETag', entry.etag)
+            entry.last_modified = headers.get('Last-Modified', entry.last_modified)
+            entry.accessed_at = time.time()
+            self._write_atomic(self._path(entry.key, '.json'), json.dumps(entry.to_dict()).encode('utf-8'))
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes"""
+        if self.total_bytes <= self.max_bytes:
+            return
+        for entry in sorted(self.entries.values(), key=lambda e: e.accessed_at):
+            if self.total_bytes <= self.max_bytes:
+                break
+            del self.entries[entry.key]
+            self.total_bytes -= entry.size
+            self._remove_files(entry.key)
+
+
+class CachingAdapter(BaseAdapter):
+    """A transport adapter that revalidates GET requests against an HTTPCache
+
+    It wraps another adapter (a plain HTTPAdapter by default) and is mounted
+    on the shared requests.Session, so every scraper benefits without change.
+    """
+
+    def __init__(self, cache, adapter=None):
+        super().__init__()
+        self.cache = cache
+        self.adapter = adapter or HTTPAdapter()
+        self.hits = 0
+        self.misses = 0
+
+    def send(self, request, **kwargs):
+        """Send a request, adding validators and answering 304s from the cache"""
+        if request.method != 'GET':
+            return self.adapter.send(request, **kwargs)
+
+        entry = self.cache.get(request.url)
+        if entry is not None:
+            request = request.copy()
+            if entry.etag:
+                request.headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                request.headers['If-Modified-Since'] = entry.last_modified
+
+        response = self.adapter.send(request, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            try:
+                body = self.cache.read_body(entry)
+            except OSError:
+                # The body went missing underneath us; fall back to a full download
+                response.close()
+                return self.adapter.send(self._strip_validators(request), **kwargs)
+            self.hits += 1
+            self.cache.touch(entry, response.headers)
+            cached = self._build_response(request, response, entry, body)
+            response.close()
+            return cached
+
+        self.misses += 1
+        # A streamed body is read (and maybe abandoned) by the caller, so it is not stored
+        if (response.status_code == 200 and not kwargs.get('stream')
+                and ('ETag' in response.headers or 'Last-Modified' in response.headers)):
+            self.cache.store(request.url, response.headers, response.content)
+        return response
+
+    @staticmethod
+    def _strip_validators(request):
+        request = request.copy()
+        request.headers.pop('If-None-Match', None)
+        request.headers.pop('If-Modified-Since', None)
+        return request
+
+    def _build_response(self, request, not_modified, entry, body):
+        """Turn a 304 response into a 200 response carrying the cached body"""
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = 'OK'
+        response.headers = CaseInsensitiveDict(entry.headers)
+        response.headers.update({k: v for k, v in not_modified.headers.items()
+                                 if k.lower() not in HOP_HEADERS})
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = body
+        response._content_consumed = True
+        response.url = request.url
+        response.request = request
+        response.elapsed = not_modified.elapsed
+        response.connection = self
+        response.from_cache = True
+        return response
+
+    def close(self):
+        self.adapter.close()
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Append-only NDJSON headline store for the News Headlines Scraper
+
+Headlines are appended one JSON object per line to numbered segment
+files instead of rewriting a single JSON document every run. Writes are
+buffered and flushed in batches, a segment is only renamed to its final
+name once it is complete, and every segment has a side index of 8-byte
+line offsets so record N can be read without scanning. The classic
+news_headlines.json layout can be exported from the store on demand.
+
+Usage:
+    python ndjson_store.py export headlines_store news_headlines.json
+    python ndjson_store.py get headlines_store 42
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import threading
+from array import array
+from datetime import datetime
+
+from headline import Headline
+
+META_FILE = 'store.json'
+OPEN_SUFFIX = '.open'
+
+
+def _encode(headline):
+    return (json.dumps(headline.to_dict(), ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+
+
+class NDJSONStore:
+    """A directory of append-only NDJSON segments with offset indexes
+
+    Segment n holds records n * segment_records up to (n + 1) *
+    segment_records - 1, so the segment and line of any record follow from
+    its number. The segment being written is named ``<n>.ndjson.open``; on
+    rotation it is flushed and atomically renamed, so readers only ever
+    see complete sealed segments. After a crash the open segment is cut
+    back to its last complete line and its index rebuilt.
+    """
+
+    def __init__(self, directory, segment_records=100000, batch_size=256, fsync=False):
+        """Open (or create) a store in ``directory``
+
+        segment_records is fixed when the store is created. batch_size is
+        how many records are buffered before being written out; fsync also
+        forces each batch to disk.
+        """
+        self.directory = directory
+        self.batch_size = batch_size
+        self.fsync = fsync
+        self.lock = threading.Lock()
+        self.pending = []
+        os.makedirs(directory, exist_ok=True)
+        self.segment_records = self._load_meta(segment_records)
+        self._recover()
+
+    def _path(self, segment, suffix):
+        return os.path.join(self.directory, f"{segment:08d}{suffix}")
+
+    def _load_meta(self, segment_records):
+        path = os.path.join(self.directory, META_FILE)
+        try:
+            with open(path, encoding='utf-8') as file:
+                return json.load(file)['segment_records']
+        except FileNotFoundError:
+            self._write_atomic(path, json.dumps({'segment_records': segment_records}).encode('utf-8'))
+            return segment_records
+
+    def _write_atomic(self, path, data):
+        """Write bytes to ``path`` so readers never see a partial file"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                file.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @staticmethod
+    def _scan_offsets(path):
+        """Return (offsets of complete lines, end of the last complete line) for a data file"""
+        offsets = array('Q')
+        position = 0
+        with open(path, 'rb') as file:
+            for line in file:
+                if not line.endswith(b'\n'):
+                    break
+                offsets.append(position)
+                position += len(line)
+        return offsets, position
+
+    def _recover(self):
+        """Find the sealed segments and reopen (or repair) the active one"""
+        segments = set()
+        for name in os.listdir(self.directory):
+            stem = name.split('.', 1)[0]
+            if stem.isdigit() and '.ndjson' in name:
+                segments.add(int(stem))
+
+        self.sealed = 0
+        for segment in sorted(segments):
+            if segment != self.sealed or not os.path.exists(self._path(segment, '.ndjson')):
+                break
+            if not os.path.exists(self._path(segment, '.idx')):
+                # Crashed between renaming the data and the index
+                offsets, _ = self._scan_offsets(self._path(segment, '.ndjson'))
+                self._write_atomic(self._path(segment, '.idx'), offsets.tobytes())
+                try:
+                    os.remove(self._path(segment, '.idx' + OPEN_SUFFIX))
+                except FileNotFoundError:
+                    pass
+            self.sealed += 1
+
+        data_path = self._path(self.sealed, '.ndjson' + OPEN_SUFFIX)
+        if os.path.exists(data_path):
+            offsets, end = self._scan_offsets(data_path)
+            with open(data_path, 'r+b') as file:
+                file.truncate(end)
+        else:
+            offsets, end = array('Q'), 0
+        self._open_active(offsets, end)
+
+    def _open_active(self, offsets, end):
+        self.offsets = offsets
+        self.position = end
+        self.data_file = open(self._path(self.sealed, '.ndjson' + OPEN_SUFFIX), 'ab')
+        self.index_file = open(self._path(self.sealed, '.idx' + OPEN_SUFFIX), 'wb')
+        self.index_file.write(offsets.tobytes())
+        self.index_file.flush()
+
+    def __len__(self):
+        with self.lock:
+            return self.sealed * self.segment_records + len(self.offsets) + len(self.pending)
+
+    def append(self, headline):
+        """Queue one headline, writing a batch once batch_size are waiting"""
+        with self.lock:
+            self.pending.append(_encode(headline))
+            if len(self.pending) >= self.batch_size:
+                self._flush()
+
+    def extend(self, headlines):
+        """Append several headlines and flush them"""
+        with self.lock:
+            for headline in headlines:
+                self.pending.append(_encode(headline))
+                if len(self.pending) >= self.batch_size:
+                    self._flush()
+            self._flush()
+
+    def flush(self):
+        """Write any buffered records"""
+        with self.lock:
+            self._flush()
+
+    def _flush(self):
+        pending, self.pending = self.pending, []
+        while pending:
+            room = self.segment_records - len(self.offsets)
+            if room <= 0:
+                self._rotate()
+                continue
+            batch, pending = pending[:room], pending[room:]
+            new_offsets = array('Q')
+            for line in batch:
+                new_offsets.append(self.position)
+                self.position += len(line)
+            self.data_file.write(b''.join(batch))
+            self.data_file.flush()
+            self.index_file.write(new_offsets.tobytes())
+            self.index_file.flush()
+            if self.fsync:
+                os.fsync(self.data_file.fileno())
+                os.fsync(self.index_file.fileno())
+            self.offsets.extend(new_offsets)
+
+    def _rotate(self):
+        """Seal the full active segment and start the next one"""
+        for file in (self.data_file, self.index_file):
+            file.flush()
+            os.fsync(file.fileno())
+            file.close()
+        segment = self.sealed
+        os.replace(self._path(segment, '.ndjson' + OPEN_SUFFIX), self._path(segment, '.ndjson'))
+        os.replace(self._path(segment, '.idx' + OPEN_SUFFIX), self._path(segment, '.idx'))
+        self.sealed += 1
+        self._open_active(array('Q'), 0)
+
+    def _read_line(self, number):
+        segment, line = divmod(number, self.segment_records)
+        if segment == self.sealed:
+            start = self.offsets[line]
+            end = self.offsets[line + 1] if line + 1 < len(self.offsets) else self.position
+            path = self._path(segment, '.ndjson' + OPEN_SUFFIX)
+        else:
+            with open(self._path(segment, '.idx'), 'rb') as index:
+                index.seek(line * 8)
+                pair = array('Q', index.read(16))
+            start = pair[0]
+            end = pair[1] if len(pair) > 1 else os.path.getsize(self._path(segment, '.ndjson'))
+            path = self._path(segment, '.ndjson')
+        with open(path, 'rb') as file:
+            file.seek(start)
+            return file.read(end - start)
+
+    def get(self, number):
+        """Return record ``number`` (0-based) as a Headline"""
+        with self.lock:
+            total = self.sealed * self.segment_records + len(self.offsets)
+            if number < 0:
+                number += total + len(self.pending)
+            if not 0 <= number < total + len(self.pending):
+                raise IndexError(f"record {number} out of range")
+            if number >= total:
+                line = self.pending[number - total]
+            else:
+                line = self._read_line(number)
+        return Headline.from_dict(json.loads(line))
+
+    def __getitem__(self, number):
+        return self.get(number)
+
+    def iter_records(self, start=0):
+        """Yield the stored headlines from record ``start`` on, reading each segment sequentially"""
+        self.flush()
+        segment, line = divmod(start, self.segment_records)
+        while True:
+            # Try the active name first: if it is sealed meanwhile the sealed name exists
+            for suffix in (OPEN_SUFFIX, ''):
+                try:
+                    file = open(self._path(segment, '.ndjson' + suffix), 'rb')
+                    break
+                except FileNotFoundError:
+                    continue
+            else:
+                return
+            with file:
+                if line:
+                    with open(self._path(segment, '.idx' + suffix), 'rb') as index:
+                        index.seek(line * 8)
+                        offset = array('Q', index.read(8))
+                    if not offset:
+                        return
+                    file.seek(offset[0])
+                for raw in file:
+                    if not raw.endswith(b'\n'):
+                        return
+                    yield Headline.from_dict(json.loads(raw))
+            segment, line = segment + 1, 0
+
+    def __iter__(self):
+        return self.iter_records()
+
+    def export_json(self, filename="news_headlines.json", start=0):
+        """Write records from ``start`` on in the news_headlines.json layout
+
+        The file is streamed to a temporary name and renamed into place,
+        so memory use stays flat and a failed export leaves no partial file.
+        """
+        total = max(len(self) - start, 0)
+        directory = os.path.dirname(os.path.abspath(filename))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as file:
+                file.write('{\n')
+                file.write(f'  "scrape_timestamp": {json.dumps(datetime.now().isoformat())},\n')
+                file.write(f'  "total_headlines": {total},\n')
+                file.write('  "headlines": [')
+                for i, headline in enumerate(self.iter_records(start), 1):
+                    record = {"id": i, **headline.to_dict(), "full_text": str(headline)}
+                    text = json.dumps(record, indent=2, ensure_ascii=False).replace('\n', '\n    ')
+                    file.write((',\n    ' if i > 1 else '\n    ') + text)
+                file.write('\n  ]\n}\n' if total > 0 else ']\n}\n')
+            os.replace(tmp_path, filename)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return total
+
+    def close(self):
+        """Flush buffered records and close the active segment (it stays open for appends)"""
+        with self.lock:
+            self._flush()
+            self.data_file.close()
+            self.index_file.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Read an NDJSON headline store")
+    commands = parser.add_subparsers(dest='command', required=True)
+    export = commands.add_parser('export', help="write the store as news_headlines.json")
+    export.add_argument('directory')
+    export.add_argument('output', nargs='?', default='news_headlines.json')
+    export.add_argument('--start', type=int, default=0, help="first record to export")
+    get = commands.add_parser('get', help="print record N")
+    get.add_argument('directory')
+    get.add_argument('number', type=int)
+    args = parser.parse_args(argv)
+
+    store = NDJSONStore(args.directory)
+    try:
+        if args.command == 'export':
+            count = store.export_json(args.output, args.start)
+            print(f"💾 Exported {count} headlines to '{args.output}'")
+        else:
+            print(json.dumps(store.get(args.number).to_dict(), indent=2, ensure_ascii=False))
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
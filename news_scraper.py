@@ -11,175 +11,368 @@ Date: September 26, 2025
 """
 
 import requests
-from bs4 import BeautifulSoup
-import time
 import os
+import time
 from datetime import datetime
+from urllib.parse import urljoin
+from concurrent.futures import ThreadPoolExecutor
 import json
+import argparse
+
+from scheduling import AdaptivePoller, CircuitBreaker, CircuitOpenError, HostRateLimiter, RetryPolicy
+from http_cache import HTTPCache, CachingAdapter
+from extraction import CHUNK_SIZE, DEFAULT_PARSER, PARSER_BACKENDS, cap_chunks, check_backend, iter_headlines
+from sites import DEFAULT_SITES_FILE, generic_site, load_sites
+from headline import Headline
+from dedupe import NearDuplicateIndex, SeenIndex
+from ndjson_store import NDJSONStore
+from sqlite_store import SQLiteStore
+from archive import HeadlineArchive
+from daemon import ScraperDaemon
+from content_hash import ExtractionMemo, body_digest
+from replay import RecordingAdapter, ReplayAdapter
+from metrics import NULL_METRICS, StageMetrics, timed_chunks
+from connections import ConnectionStats, DNSCache, PooledHTTPAdapter, TLSSessionCache
+from profiling import DEFAULT_INTERVAL, NULL_PROFILER, StageProfiler
+from pipeline import FetchParsePipeline
+from transport import HTTP2Adapter, accept_encoding
 
 class NewsHeadlineScraper:
     """A class to scrape news headlines from various news websites"""
 
-    def __init__(self):
-        """Initialize the NewsHeadlineScraper"""
+    def __init__(self, max_workers=8, rate=1.0, burst=1, rate_limits=None,
+                 cache_dir=None, cache_max_bytes=50 * 1024 * 1024,
+                 parser=DEFAULT_PARSER, site_parsers=None,
+                 stream=False, max_body_bytes=2 * 1024 * 1024,
+                 sites=None, sites_file=DEFAULT_SITES_FILE, near_duplicate_threshold=None,
+                 seen_db=None, seen_ttl=7 * 24 * 3600, ndjson_dir=None,
+                 sqlite_db=None, archive_dir=None, archive_codec='gzip',
+                 adaptive=False, min_interval=60, max_interval=3600, poll_state_file=None,
+                 reuse_unchanged=True, memo_state_file=None, record_file=None, replay_file=None, replay_latency_scale=1.0,
+                 metrics=False, metrics_file=None, profile_dir=None, profile_interval=DEFAULT_INTERVAL,
+                 parse_workers=0, http2=False, pool_size=None, dns_ttl=300, tls_resumption=True,
+                 retries=2, backoff=0.5, breaker_threshold=3, breaker_cooldown=300, breaker_state_file=None):
+        """Initialize the NewsHeadlineScraper
+
+        max_workers sets how many sources are fetched at once when
+        run_scraper is called with concurrent=True. rate and burst set the
+        default per-host request budget; rate_limits maps a hostname to a
+        (rate, burst) pair for sites that need different treatment.
+        When cache_dir is set, responses are cached on disk and revalidated
+        with conditional GET requests. parser picks the HTML parser backend
+        for every site and site_parsers maps a site name to a backend that
+        overrides it. With stream=True bodies are read in chunks and parsed
+        as they arrive, and reading stops once enough headlines are found or
+        max_body_bytes have been read. The sources come from sites (a list
+        of SiteConfig) or, by default, from the registry in sites_file.
+        near_duplicate_threshold (0-1) also drops headlines whose wording is
+        that similar to one already kept, e.g. the same story from two sites.
+        With seen_db (an SQLite file) set, headlines reported by an earlier
+        run within seen_ttl seconds are left out as well. ndjson_dir names
+        an append-only NDJSONStore that every run's headlines are added to,
+        and sqlite_db a queryable SQLiteStore that receives them as well.
+        archive_dir keeps a compressed, day-rotated HeadlineArchive.
+        adaptive=True polls each site only when its learned interval (between
+        min_interval and max_interval seconds, kept in poll_state_file
+        across runs) has passed; see AdaptivePoller. With reuse_unchanged, a
+        body that hashes the same as the site's previous one reuses the
+        previous extraction instead of being parsed again; the memo is kept
+        in memory, so only later runs of the same process (the daemon) hit
+        it unless memo_state_file keeps it between runs. record_file
+        appends every response to a record/replay archive, with a cache
+        hit recorded as the cached page rather than the 304 behind it;
+        replay_file answers requests from one instead of the network, with
+        the recorded latencies multiplied by replay_latency_scale.
+        metrics=True records per-stage timings by source in self.metrics
+        (a StageMetrics); metrics_file also implies it and receives them in
+        Prometheus text format after every run or daemon refresh. With
+        profile_dir set, every run is profiled by a StageProfiler sampling
+        every profile_interval seconds, and its report and collapsed stacks
+        are written there.
+        parse_workers > 0 runs every scrape as a FetchParsePipeline: pages
+        are fetched on max_workers threads and parsed in that many worker
+        processes (whole bodies are read, so stream does not apply).
+        http2=True fetches through an HTTP2Adapter, which multiplexes the
+        requests to a host over one connection and decodes brotli and zstd
+        bodies (needs httpx[http2]; see transport.py). Otherwise requests go
+        through a PooledHTTPAdapter that keeps a pool for every host in the
+        registry with pool_size idle connections each (default: max_workers,
+        or the site's pool_size), caches DNS answers for dns_ttl seconds (0
+        turns it off) and, with tls_resumption, resumes TLS sessions.
+        self.connection_stats counts how often connections were reused.
+        Failed requests are retried up to retries times with exponential
+        backoff from backoff seconds plus jitter (see RetryPolicy). A host
+        whose fetches fail breaker_threshold times in a row, each after its
+        retries, is skipped for breaker_cooldown seconds (0 turns the
+        breaker off); with breaker_state_file that survives between runs.
+        """
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
+            'Accept-Encoding': accept_encoding(http2),
             'Connection': 'keep-alive',
         }
         self.session = requests.Session()
         self.session.headers.update(self.headers)
+        self.max_workers = max_workers
+        self.parser = check_backend(parser)
+        self.site_parsers = {name: check_backend(backend) for name, backend in (site_parsers or {}).items()}
+        self.stream = stream
+        self.max_body_bytes = max_body_bytes
+        self.extraction_memo = ExtractionMemo(memo_state_file) if reuse_unchanged else None
+        self.near_duplicate_threshold = near_duplicate_threshold
+        self.seen_index = SeenIndex(seen_db, seen_ttl) if seen_db else None
+        self.last_outcome = None  # why the last run_scraper result was empty, see there
+        self.ndjson_store = NDJSONStore(ndjson_dir) if ndjson_dir else None
+        self.sqlite_store = SQLiteStore(sqlite_db) if sqlite_db else None
+        self.archive = HeadlineArchive(archive_dir, archive_codec) if archive_dir else None
+
+        if sites is None:
+            self.sites = load_sites(sites_file)
+        else:
+            self.sites = {site.name: site for site in sites}
+
+        # Per-site limits from the registry, overridden by explicit per-host rate_limits
+        host_limits = {}
+        for site in self.sites.values():
+            if site.rate is not None or site.burst is not None:
+                host_limits[HostRateLimiter.host_for(site.url)] = (
+                    site.rate if site.rate is not None else rate,
+                    site.burst if site.burst is not None else burst)
+        host_limits.update(rate_limits or {})
+        self.rate_limiter = HostRateLimiter(rate, burst, host_limits)
+
+        self.retry_policy = RetryPolicy(retries, backoff)
+        self.circuit_breaker = None
+        if breaker_threshold:
+            self.circuit_breaker = CircuitBreaker(breaker_threshold, breaker_cooldown, state_file=breaker_state_file)
+
+        self.poller = None
+        if adaptive:
+            bounds = {site.name: (site.min_interval, site.max_interval) for site in self.sites.values()
+                      if site.min_interval is not None or site.max_interval is not None}
+            self.poller = AdaptivePoller(min_interval, max_interval, bounds=bounds, state_file=poll_state_file)
+
+        self.metrics_file = metrics_file
+        self.metrics = StageMetrics() if metrics or metrics_file else NULL_METRICS
+        self.profile_dir = profile_dir
+        self.profiler = StageProfiler(profile_interval) if profile_dir else NULL_PROFILER
+        self.pipeline = FetchParsePipeline(self, parse_workers) if parse_workers else None
+
+        # Transport stack: network (or replay), then the cache, then recording, so
+        # a recording holds the bodies the scraper saw rather than bare 304s
+        self.connection_stats = ConnectionStats(self.metrics)
+        if replay_file:
+            adapter = ReplayAdapter(replay_file, replay_latency_scale)
+        elif http2:
+            adapter = HTTP2Adapter()
+        else:
+            hosts = {HostRateLimiter.host_for(site.url) for site in self.sites.values()}
+            host_pool_sizes = {HostRateLimiter.host_for(site.url): site.pool_size
+                               for site in self.sites.values() if site.pool_size}
+            adapter = PooledHTTPAdapter(pool_hosts=max(10, len(hosts)), pool_maxsize=pool_size or max(10, max_workers),
+                                        host_pool_sizes=host_pool_sizes,
+                                        dns_cache=DNSCache(dns_ttl) if dns_ttl else None,
+                                        tls_sessions=TLSSessionCache() if tls_resumption else None,
+                                        metrics=self.metrics, stats=self.connection_stats)
+        self.cache = None
+        if cache_dir:
+            self.cache = HTTPCache(cache_dir, cache_max_bytes)
+            adapter = CachingAdapter(self.cache, adapter)
+
+        if record_file:
+            adapter = RecordingAdapter(record_file, adapter)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def parser_for(self, site):
+        """Return the parser backend for a site: site_parsers, then the registry, then the run default"""
+        return self.site_parsers.get(site.name) or site.parser or self.parser
+
+    def _fetch(self, url, timeout=10):
+        """GET a URL through the circuit breaker and rate limiter, retrying transient failures
+
+        The whole fetch, retries included, is one success or failure for
+        the host's circuit breaker. Any answer but a retryable status, even
+        a 404, means the host is up; every other error counts against it,
+        so a half-open trial always ends.
+        """
+        breaker = self.circuit_breaker
+        if breaker is None:
+            return self._fetch_with_retries(url, timeout)
+
+        host = HostRateLimiter.host_for(url)
+        breaker.check(host)
+        try:
+            response = self._fetch_with_retries(url, timeout)
+        except requests.HTTPError as e:
+            if e.response is not None and e.response.status_code not in self.retry_policy.statuses:
+                breaker.record_success(host)
+            else:
+                breaker.record_failure(host)
+            raise
+        except BaseException:
+            breaker.record_failure(host)
+            raise
+        breaker.record_success(host)
+        return response
+
+    def _fetch_with_retries(self, url, timeout):
+        """GET a URL, retrying connection errors, timeouts and retryable statuses per self.retry_policy"""
+        retry = 0
+        while True:
+            retry_after = None
+            try:
+                response = self._get(url, timeout)
+                if response.status_code in self.retry_policy.statuses:
+                    retry_after = RetryPolicy.retry_after(response.headers.get('Retry-After'))
+                    response.close()
+                    response.raise_for_status()
+            except (requests.ConnectionError, requests.Timeout, requests.HTTPError) as e:
+                error = e
+            else:
+                try:
+                    response.raise_for_status()
+                except requests.HTTPError:
+                    response.close()
+                    raise
+                return response
+
+            delay = self.retry_policy.delay(retry, retry_after)
+            if delay is None:
+                raise error
+            self.metrics.count('retries')
+            print(f"🔁 Retrying {url} in {delay:.1f}s ({error})")
+            time.sleep(delay)
+            retry += 1
+
+    def _get(self, url, timeout):
+        """Send one GET through the per-host rate limiter, recording its timings"""
+        with self.profiler.stage('throttle'):
+            self.metrics.observe('throttle', self.rate_limiter.acquire(url))
+        start = time.perf_counter()
+        with self.profiler.stage('fetch'):
+            response = self.session.get(url, timeout=timeout, stream=self.stream)
+        if self.metrics.enabled:
+            # Session.send sets elapsed to the time until the response headers arrived
+            ttfb = response.elapsed.total_seconds()
+            self.metrics.observe('ttfb', ttfb)
+            if not self.stream:
+                self.metrics.observe('download', time.perf_counter() - start - ttfb)
+            self.metrics.count('requests', status=str(response.status_code))
+        return response
+
+    @staticmethod
+    def _declared_charset(response):
+        """Return the charset named in the Content-Type header, if any"""
+        content_type = response.headers.get('Content-Type', '')
+        for param in content_type.split(';')[1:]:
+            name, _, value = param.strip().partition('=')
+            if name.lower() == 'charset' and value:
+                return value.strip('"\'')
+        return None
+
+    def _extract(self, response, site):
+        """Extract (selector, text, link) triples from a response using the site's compiled plan
+
+        In streaming mode the body is consumed chunk by chunk and the
+        connection is closed as soon as extraction stops, so the rest of a
+        large page is never downloaded. Otherwise the body is hashed first
+        and an unchanged page reuses its previous result.
+        """
+        filters = dict(parser=self.parser_for(site), min_length=site.min_length,
+                       max_length=site.max_length, limit=site.limit,
+                       encoding=self._declared_charset(response))
+        if not self.stream:
+            body = response.content
+            if self.extraction_memo is None:
+                return self._run_plan(body, site, filters)
+            # An identical body (or hash region) gives an identical result, so skip the parse
+            digest = body_digest(body, site.hash_region)
+            settings = (site.selectors, site.per_selector_limit, tuple(sorted(filters.items())))
+            result = self.extraction_memo.get(site.name, digest, settings)
+            if result is None:
+                result = self._run_plan(body, site, filters)
+                self.extraction_memo.store(site.name, digest, settings, result)
+            else:
+                self.metrics.count('reused_extractions')
+            return result
+        try:
+            chunks = cap_chunks(response.iter_content(CHUNK_SIZE), self.max_body_bytes)
+            return self._run_plan(chunks, site, filters)
+        finally:
+            response.close()
+
+    def _run_plan(self, source, site, filters):
+        """Run a site's plan over a body or chunk iterator, timing parse and extraction when metrics are on"""
+        with self.profiler.stage('extract'):
+            return self._timed_plan(source, site, filters)
+
+    def _timed_plan(self, source, site, filters):
+        if not self.metrics.enabled:
+            return list(iter_headlines(source, site.plan, **filters))
+
+        timings = {}
+        if not isinstance(source, bytes):
+            # Streamed chunks arrive during parsing; keep the wait out of parse and extract
+            source = timed_chunks(source, timings)
+        start = time.perf_counter()
+        result = list(iter_headlines(source, site.plan, timings=timings, **filters))
+        elapsed = time.perf_counter() - start - timings.get('download', 0.0)
+        if 'download' in timings:
+            self.metrics.observe('download', timings['download'])
+        self.metrics.observe('parse', timings.get('parse', 0.0))
+        self.metrics.observe('extract', elapsed - timings.get('parse', 0.0))
+        return result
+
+    def scrape_site(self, site):
+        """Scrape headlines from one site in the registry"""
+        print(f"📰 Scraping {site.title} headlines...")
+        headlines = []
+
+        with self.metrics.source(site.name), self.profiler.source(site.name):
+            try:
+                fetched_at = time.time()
+                response = self._fetch(site.url)
+
+                # Extraction stops as soon as the site's headline limit is reached
+                for selector, title, link in self._extract(response, site):
+                    url = urljoin(response.url, link) if link else site.url
+                    headlines.append(Headline(site.name, title, url, fetched_at, selector))
+
+                self.metrics.count('headlines', len(headlines))
+                print(f"✅ Found {len(headlines)} headlines from {site.title}")
+                return headlines
+
+            except CircuitOpenError as e:
+                self.metrics.count('errors', kind='circuit_open')
+                print(f"⏸️ Skipping {site.title}: {e}")
+                return []
+            except requests.RequestException as e:
+                self.metrics.count('errors', kind='request')
+                print(f"❌ Error scraping {site.title}: {e}")
+                return []
+            except Exception as e:
+                self.metrics.count('errors', kind='parse')
+                print(f"❌ Parsing error for {site.title}: {e}")
+                return []
 
     def scrape_bbc_news(self):
         """Scrape headlines from BBC News"""
-        print("📰 Scraping BBC News headlines...")
-        headlines = []
-
-        try:
-            url = 'https://www.bbc.com/news'
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.content, 'html.parser')
-
-            # BBC uses various selectors for headlines
-            selectors = [
-                'h2[data-testid="card-headline"]',
-                'h3[data-testid="card-headline"]', 
-                '.media__title',
-                '.gs-c-promo-heading__title',
-                'h2.sc-4fedabc7-3',
-                'h3.sc-4fedabc7-3'
-            ]
-
-            for selector in selectors:
-                elements = soup.select(selector)
-                for element in elements:
-                    headline = element.get_text(strip=True)
-                    if headline and len(headline) > 10:  # Filter out very short text
-                        headlines.append(f"[BBC] {headline}")
-
-            print(f"✅ Found {len(headlines)} headlines from BBC News")
-            return headlines[:15]  # Limit to top 15
-
-        except requests.RequestException as e:
-            print(f"❌ Error scraping BBC News: {e}")
-            return []
-        except Exception as e:
-            print(f"❌ Parsing error for BBC News: {e}")
-            return []
+        return self.scrape_site(self.sites['BBC'])
 
     def scrape_cnn_news(self):
         """Scrape headlines from CNN"""
-        print("📰 Scraping CNN headlines...")
-        headlines = []
-
-        try:
-            url = 'https://edition.cnn.com/'
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.content, 'html.parser')
-
-            # CNN headline selectors
-            selectors = [
-                '.container__headline-text',
-                '.cd__headline-text',
-                'h3.cd__headline',
-                'span.cd__headline-text',
-                'h2.headline'
-            ]
-
-            for selector in selectors:
-                elements = soup.select(selector)
-                for element in elements:
-                    headline = element.get_text(strip=True)
-                    if headline and len(headline) > 10:
-                        headlines.append(f"[CNN] {headline}")
-
-            print(f"✅ Found {len(headlines)} headlines from CNN")
-            return headlines[:15]  # Limit to top 15
-
-        except requests.RequestException as e:
-            print(f"❌ Error scraping CNN: {e}")
-            return []
-        except Exception as e:
-            print(f"❌ Parsing error for CNN: {e}")
-            return []
+        return self.scrape_site(self.sites['CNN'])
 
     def scrape_reuters_news(self):
         """Scrape headlines from Reuters"""
-        print("📰 Scraping Reuters headlines...")
-        headlines = []
-
-        try:
-            url = 'https://www.reuters.com/'
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.content, 'html.parser')
-
-            # Reuters headline selectors
-            selectors = [
-                'h3[data-testid="Heading"]',
-                'h2[data-testid="Heading"]',
-                '.story-title',
-                'a[data-testid="Heading"]'
-            ]
-
-            for selector in selectors:
-                elements = soup.select(selector)
-                for element in elements:
-                    headline = element.get_text(strip=True)
-                    if headline and len(headline) > 10:
-                        headlines.append(f"[Reuters] {headline}")
-
-            print(f"✅ Found {len(headlines)} headlines from Reuters")
-            return headlines[:10]  # Limit to top 10
-
-        except requests.RequestException as e:
-            print(f"❌ Error scraping Reuters: {e}")
-            return []
-        except Exception as e:
-            print(f"❌ Parsing error for Reuters: {e}")
-            return []
+        return self.scrape_site(self.sites['Reuters'])
 
     def scrape_generic_news_site(self, url, site_name="Generic Site"):
         """Generic scraper for any news website"""
-        print(f"📰 Scraping {site_name} headlines...")
-        headlines = []
-
-        try:
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.content, 'html.parser')
-
-            # Common headline selectors
-            selectors = [
-                'h1', 'h2', 'h3',
-                '.headline', '.title', '.story-title',
-                '[class*="headline"]', '[class*="title"]'
-            ]
-
-            for selector in selectors:
-                elements = soup.select(selector)
-                for element in elements[:5]:  # Limit per selector
-                    headline = element.get_text(strip=True)
-                    if headline and 15 <= len(headline) <= 200:  # Reasonable headline length
-                        headlines.append(f"[{site_name}] {headline}")
-
-            print(f"✅ Found {len(headlines)} headlines from {site_name}")
-            return headlines
-
-        except requests.RequestException as e:
-            print(f"❌ Error scraping {site_name}: {e}")
-            return []
-        except Exception as e:
-            print(f"❌ Parsing error for {site_name}: {e}")
-            return []
+        return self.scrape_site(generic_site(url, site_name))
 
     def save_headlines_to_file(self, headlines, filename="news_headlines.txt"):
         """Save headlines to a text file"""
@@ -214,12 +407,7 @@ class NewsHeadlineScraper:
                 "scrape_timestamp": datetime.now().isoformat(),
                 "total_headlines": len(headlines),
                 "headlines": [
-                    {
-                        "id": i,
-                        "source": headline.split("] ")[0].replace("[", ""),
-                        "title": headline.split("] ", 1)[1] if "] " in headline else headline,
-                        "full_text": headline
-                    }
+                    {"id": i, **headline.to_dict(), "full_text": str(headline)}
                     for i, headline in enumerate(headlines, 1)
                 ]
             }
@@ -234,50 +422,223 @@ class NewsHeadlineScraper:
             print(f"❌ Error saving JSON: {e}")
             return False
 
-    def run_scraper(self):
-        """Main method to run the news scraper"""
+    def save_headlines_ndjson(self, headlines):
+        """Append headlines to the NDJSON store without rewriting earlier runs"""
+        try:
+            self.ndjson_store.extend(headlines)
+            print(f"💾 Appended {len(headlines)} headlines to '{self.ndjson_store.directory}' "
+                  f"({len(self.ndjson_store)} stored)")
+            return True
+
+        except Exception as e:
+            print(f"❌ Error appending to NDJSON store: {e}")
+            return False
+
+    def save_headlines_sqlite(self, headlines):
+        """Insert headlines into the SQLite database"""
+        try:
+            self.sqlite_store.extend(headlines)
+            print(f"💾 Stored {len(headlines)} headlines in '{self.sqlite_store.path}'")
+            return True
+
+        except Exception as e:
+            print(f"❌ Error saving to SQLite: {e}")
+            return False
+
+    def save_headlines_archive(self, headlines):
+        """Add headlines to the compressed daily archive"""
+        try:
+            self.archive.extend(headlines)
+            print(f"💾 Archived {len(headlines)} headlines in '{self.archive.directory}'")
+            return True
+
+        except Exception as e:
+            print(f"❌ Error archiving headlines: {e}")
+            return False
+
+    def save_headlines_stores(self, headlines):
+        """Send headlines to every configured store (NDJSON, SQLite, archive)"""
+        if self.ndjson_store is not None:
+            self.save_headlines_ndjson(headlines)
+
+        if self.sqlite_store is not None:
+            self.save_headlines_sqlite(headlines)
+
+        if self.archive is not None:
+            self.save_headlines_archive(headlines)
+
+    def dedupe_headlines(self, headlines):
+        """Remove duplicate headlines while preserving order
+
+        Exact repeats of a title are always dropped. With a near-duplicate
+        threshold set, titles similar to an earlier one are dropped as well,
+        using a MinHash LSH index so each lookup stays sub-linear.
+        """
+        near_duplicates = None
+        if self.near_duplicate_threshold:
+            near_duplicates = NearDuplicateIndex(self.near_duplicate_threshold)
+
+        seen = set()
+        unique_headlines = []
+        for headline in headlines:
+            if headline.title in seen:
+                continue
+            if near_duplicates is not None and near_duplicates.add_if_new(len(unique_headlines), headline.title) is not None:
+                continue
+            seen.add(headline.title)
+            unique_headlines.append(headline)
+        return unique_headlines
+
+    def _run_sequential(self, sites):
+        """Scrape sites one after another"""
+        results = []
+        for site in sites:
+            try:
+                results.append(self.scrape_site(site))
+            except Exception as e:
+                print(f"❌ Error in {site.name}: {e}")
+                results.append([])
+        return results
+
+    def _run_concurrent(self, sites, max_workers=None):
+        """Scrape sites in a thread pool sharing self.session
+
+        Results are returned in the same order as ``sites`` so the
+        deduplicated output matches a sequential run.
+        """
+        workers = max_workers or self.max_workers
+        workers = max(1, min(workers, len(sites)))
+
+        results = []
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(self.scrape_site, site) for site in sites]
+            for site, future in zip(sites, futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    print(f"❌ Error in {site.name}: {e}")
+                    results.append([])
+        return results
+
+    def run_scraper(self, concurrent=False, max_workers=None):
+        """Main method to run the news scraper
+
+        Every enabled site in the registry is scraped. With concurrent=True
+        they are fetched at the same time, so a run takes about as long as
+        the slowest source instead of the sum.
+
+        Returns the new unique headlines. self.last_outcome tells an empty
+        result apart: 'nothing_new' when every headline was already
+        reported by an earlier run, 'none_due' when adaptive polling found
+        no site due, 'failed' when no source returned any.
+        """
+        self.profiler.start()
+        try:
+            with self.profiler.stage('run'):
+                self.last_outcome, headlines = self._run_once(concurrent, max_workers)
+            if self.poller is not None:
+                self.poller.save()
+            if self.extraction_memo is not None:
+                self.extraction_memo.save()
+            return headlines
+        finally:
+            if self.profiler.enabled:
+                self.save_profile(self.profile_dir)
+            if self.metrics_file:
+                self.save_metrics(self.metrics_file)
+
+    def save_profile(self, directory):
+        """Stop the profiler and write its report and collapsed stacks to a directory"""
+        try:
+            self.profiler.stop()
+            collapsed, report = self.profiler.write(directory)
+            print(f"🔬 Profile written to '{report}' (flamegraph stacks in '{collapsed}')")
+            return True
+
+        except Exception as e:
+            print(f"❌ Error writing profile: {e}")
+            return False
+
+    def save_metrics(self, filename):
+        """Write the collected stage metrics in Prometheus text format"""
+        try:
+            self.metrics.write(filename)
+            print(f"📈 Metrics written to '{filename}'")
+            return True
+
+        except Exception as e:
+            print(f"❌ Error writing metrics: {e}")
+            return False
+
+    def _run_once(self, concurrent, max_workers):
+        """Scrape every due site once, then dedupe, save and summarize the headlines
+
+        Returns (outcome, new unique headlines), outcome being 'new',
+        'nothing_new', 'none_due' or 'failed'.
+        """
         print("🚀 Starting News Headlines Scraper...")
         print("=" * 60)
 
         all_headlines = []
 
-        # Scrape from multiple sources
-        scrapers = [
-            self.scrape_bbc_news,
-            self.scrape_cnn_news,
-            self.scrape_reuters_news
-        ]
+        # Scrape from every enabled source in the registry
+        sites = [site for site in self.sites.values() if site.enabled]
+
+        if self.poller is not None:
+            now = time.time()
+            waiting = [site for site in sites if not self.poller.due(site.name, now)]
+            for site in waiting:
+                print(f"⏭️ Skipping {site.title}: next poll in {self.poller.next_poll(site.name) - now:.0f}s")
+            sites = [site for site in sites if site not in waiting]
+            if not sites:
+                print("ℹ️ No sources are due yet.")
+                return 'none_due', []
+
+        if self.pipeline is not None:
+            results = self.pipeline.run(sites)
+        elif concurrent:
+            results = self._run_concurrent(sites, max_workers)
+        else:
+            results = self._run_sequential(sites)
 
-        for scraper_func in scrapers:
-            try:
-                headlines = scraper_func()
-                all_headlines.extend(headlines)
-                time.sleep(1)  # Be respectful to servers
-            except Exception as e:
-                print(f"❌ Error in {scraper_func.__name__}: {e}")
+        if self.poller is not None:
+            for site, headlines in zip(sites, results):
+                self.poller.record(site.name, headlines)
 
-        # Remove duplicates while preserving order
-        seen = set()
-        unique_headlines = []
-        for headline in all_headlines:
-            headline_text = headline.split("] ", 1)[1] if "] " in headline else headline
-            if headline_text not in seen:
-                seen.add(headline_text)
-                unique_headlines.append(headline)
+        for headlines in results:
+            all_headlines.extend(headlines)
+
+        with self.metrics.time('dedupe'), self.profiler.stage('dedupe'):
+            unique_headlines = self.dedupe_headlines(all_headlines)
+            if self.seen_index is not None:
+                unique_count = len(unique_headlines)
+                unique_headlines = self.seen_index.filter_new(unique_headlines)
 
         print("\n" + "=" * 60)
         print(f"📊 Scraping Summary:")
         print(f"   • Total headlines found: {len(all_headlines)}")
-        print(f"   • Unique headlines: {len(unique_headlines)}")
-        print(f"   • Sources scraped: BBC, CNN, Reuters")
+        if self.seen_index is not None:
+            print(f"   • Unique headlines: {unique_count}")
+            print(f"   • New since earlier runs: {len(unique_headlines)}")
+        else:
+            print(f"   • Unique headlines: {len(unique_headlines)}")
+        print(f"   • Sources scraped: {', '.join(site.name for site in sites)}")
+        connections = self.connection_stats.totals()
+        if connections['requests_sent']:
+            print(f"   • Connections: {connections['connections_opened']} opened, "
+                  f"{connections['connections_reused']} reused; DNS cache hits: {connections['dns_hits']}; "
+                  f"TLS resumed: {connections['tls_resumed']}")
         print("=" * 60)
 
         if unique_headlines:
-            # Save to text file (main requirement)
-            self.save_headlines_to_file(unique_headlines)
+            with self.metrics.time('write'), self.profiler.stage('write'):
+                # Save to text file (main requirement)
+                self.save_headlines_to_file(unique_headlines)
 
-            # Also save to JSON for bonus
-            self.save_headlines_json(unique_headlines)
+                # Also save to JSON for bonus
+                self.save_headlines_json(unique_headlines)
+
+                self.save_headlines_stores(unique_headlines)
 
             # Display first few headlines
             print("\n📰 Sample Headlines:")
@@ -288,26 +649,151 @@ class NewsHeadlineScraper:
             if len(unique_headlines) > 10:
                 print(f"    ... and {len(unique_headlines) - 10} more headlines")
 
-            return unique_headlines
+            return 'new', unique_headlines
+        elif all_headlines:
+            print("ℹ️ No new headlines since the last run.")
+            return 'nothing_new', []
         else:
             print("❌ No headlines were scraped successfully!")
-            return []
-
-def main():
+            return 'failed', []
+
+def parse_args(argv=None):
+    """Parse command line options for the scraper"""
+    parser = argparse.ArgumentParser(description="Scrape top headlines from news websites")
+    parser.add_argument('--concurrent', action='store_true',
+                        help="fetch all sources at the same time")
+    parser.add_argument('--workers', type=int, default=8,
+                        help="number of sources fetched at once in concurrent mode (default: 8)")
+    parser.add_argument('--rate', type=float, default=1.0,
+                        help="requests per second allowed to each host (default: 1.0)")
+    parser.add_argument('--burst', type=int, default=1,
+                        help="requests a host may receive back to back (default: 1)")
+    parser.add_argument('--cache-dir',
+                        help="cache pages in this directory and revalidate them with conditional GETs")
+    parser.add_argument('--parser', choices=PARSER_BACKENDS, default=DEFAULT_PARSER,
+                        help=f"HTML parser backend (default: {DEFAULT_PARSER})")
+    parser.add_argument('--sites', default=DEFAULT_SITES_FILE,
+                        help="JSON site registry to scrape (default: sites.json)")
+    parser.add_argument('--near-dup', type=float, metavar='THRESHOLD',
+                        help="also drop headlines at least this similar (0-1, e.g. 0.65) to one already kept")
+    parser.add_argument('--seen-db', metavar='PATH',
+                        help="SQLite file remembering reported headlines; only new ones are output")
+    parser.add_argument('--seen-ttl-hours', type=float, default=7 * 24,
+                        help="forget a reported headline after this many hours unseen (default: 168)")
+    parser.add_argument('--ndjson-dir', metavar='DIR',
+                        help="also append headlines to an NDJSON store in DIR (see ndjson_store.py)")
+    parser.add_argument('--sqlite-db', metavar='PATH',
+                        help="also store headlines in a SQLite database (see sqlite_store.py)")
+    parser.add_argument('--archive-dir', metavar='DIR',
+                        help="also keep a compressed daily archive in DIR (see archive.py)")
+    parser.add_argument('--archive-codec', choices=('gzip', 'zstd'), default='gzip',
+                        help="compression for --archive-dir (zstd needs the zstandard package)")
+    parser.add_argument('--daemon', action='store_true',
+                        help="keep running, refresh sources in the background and serve them over HTTP")
+    parser.add_argument('--interval', type=float, default=300,
+                        help="seconds between refreshes of a source in daemon mode (default: 300)")
+    parser.add_argument('--host', default='127.0.0.1',
+                        help="address the daemon's HTTP API listens on (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8765,
+                        help="port of the daemon's HTTP API (default: 8765)")
+    parser.add_argument('--adaptive', action='store_true',
+                        help="poll each source only as often as its headlines change")
+    parser.add_argument('--min-interval', type=float, default=60,
+                        help="shortest adaptive polling interval in seconds (default: 60)")
+    parser.add_argument('--max-interval', type=float, default=3600,
+                        help="longest adaptive polling interval in seconds (default: 3600)")
+    parser.add_argument('--poll-state', metavar='PATH',
+                        help="JSON file keeping learned polling intervals between runs")
+    parser.add_argument('--no-content-hash', dest='reuse_unchanged', action='store_false',
+                        help="always re-parse pages, even when the body is unchanged since the last fetch")
+    parser.add_argument('--memo-state', metavar='PATH',
+                        help="JSON file keeping the last body hash and headlines of each source between runs; "
+                             "without it only later runs of the daemon reuse them")
+    parser.add_argument('--record', metavar='FILE',
+                        help="append every response received to a record/replay archive")
+    parser.add_argument('--replay', metavar='FILE',
+                        help="answer requests from a recorded archive instead of the network")
+    parser.add_argument('--replay-latency-scale', type=float, default=1.0,
+                        help="multiply recorded latencies when replaying (0 = instant, default: 1.0)")
+    parser.add_argument('--metrics-file', metavar='PATH',
+                        help="write per-stage timing metrics in Prometheus text format after each run "
+                             "(after each refresh in daemon mode)")
+    parser.add_argument('--metrics', action='store_true',
+                        help="collect per-stage timing metrics (served at /metrics in daemon mode)")
+    parser.add_argument('--parse-workers', type=int, default=0, metavar='N',
+                        help="fetch on threads and parse in N worker processes, pipelined (default: 0, off)")
+    parser.add_argument('--profile', metavar='DIR',
+                        help="profile each run and write a report and flamegraph stacks to DIR")
+    parser.add_argument('--profile-interval-ms', type=float, default=DEFAULT_INTERVAL * 1000,
+                        help=f"sampling interval of --profile in milliseconds (default: {DEFAULT_INTERVAL * 1000:g})")
+    parser.add_argument('--http2', action='store_true',
+                        help="fetch over HTTP/2 with brotli/zstd decoding (needs: pip install \"httpx[http2]\" brotli zstandard)")
+    parser.add_argument('--pool-size', type=int, metavar='N',
+                        help="idle connections kept open per host (default: --workers, at least 10)")
+    parser.add_argument('--dns-ttl', type=float, default=300,
+                        help="seconds DNS answers are cached in process (default: 300, 0 = off)")
+    parser.add_argument('--no-tls-resumption', dest='tls_resumption', action='store_false',
+                        help="do a full TLS handshake for every new connection")
+    parser.add_argument('--retries', type=int, default=2,
+                        help="times a failed request or 429/5xx response is retried (default: 2)")
+    parser.add_argument('--backoff', type=float, default=0.5,
+                        help="base of the exponential retry backoff in seconds, with jitter (default: 0.5)")
+    parser.add_argument('--breaker-threshold', type=int, default=3,
+                        help="fetches failing in a row, after their retries, before a host is skipped "
+                             "(default: 3, 0 = never)")
+    parser.add_argument('--breaker-cooldown', type=float, default=300,
+                        help="seconds a failing host is skipped before it is tried again (default: 300)")
+    parser.add_argument('--breaker-state', metavar='PATH',
+                        help="JSON file keeping failing hosts' circuits open between runs")
+    parser.add_argument('--stream', action='store_true',
+                        help="parse pages while downloading and stop reading once enough headlines are found")
+    parser.add_argument('--max-body-kb', type=int, default=2048,
+                        help="in streaming mode, never read more than this much of a page (default: 2048)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """Main function to run the news scraper"""
+    args = parse_args(argv)
+
     print("🌟 Welcome to the News Headlines Scraper!")
     print("This tool scrapes top headlines from major news websites.\n")
 
-    scraper = NewsHeadlineScraper()
+    scraper = NewsHeadlineScraper(max_workers=args.workers, rate=args.rate, burst=args.burst,
+                                  cache_dir=args.cache_dir, parser=args.parser,
+                                  stream=args.stream, max_body_bytes=args.max_body_kb * 1024,
+                                  sites_file=args.sites, near_duplicate_threshold=args.near_dup,
+                                  seen_db=args.seen_db, seen_ttl=args.seen_ttl_hours * 3600,
+                                  ndjson_dir=args.ndjson_dir, sqlite_db=args.sqlite_db,
+                                  archive_dir=args.archive_dir, archive_codec=args.archive_codec,
+                                  adaptive=args.adaptive, min_interval=args.min_interval,
+                                  max_interval=args.max_interval, poll_state_file=args.poll_state,
+                                  reuse_unchanged=args.reuse_unchanged, memo_state_file=args.memo_state,
+                                  record_file=args.record,
+                                  replay_file=args.replay, replay_latency_scale=args.replay_latency_scale,
+                                  metrics=args.metrics, metrics_file=args.metrics_file,
+                                  profile_dir=args.profile, profile_interval=args.profile_interval_ms / 1000,
+                                  parse_workers=args.parse_workers, http2=args.http2,
+                                  pool_size=args.pool_size, dns_ttl=args.dns_ttl,
+                                  tls_resumption=args.tls_resumption, retries=args.retries,
+                                  backoff=args.backoff, breaker_threshold=args.breaker_threshold,
+                                  breaker_cooldown=args.breaker_cooldown, breaker_state_file=args.breaker_state)
 
     try:
-        headlines = scraper.run_scraper()
+        if args.daemon:
+            ScraperDaemon(scraper, args.interval, args.host, args.port).serve_forever()
+            return
+
+        headlines = scraper.run_scraper(concurrent=args.concurrent)
 
         if headlines:
             print(f"\n✅ Scraping completed successfully!")
             print(f"📄 Headlines saved to 'news_headlines.txt'")
             print(f"📊 JSON data saved to 'news_headlines.json'")
             print(f"\n🎯 Total unique headlines collected: {len(headlines)}")
+        elif scraper.last_outcome == 'nothing_new':
+            print("\n✅ Scraping completed: every headline was already reported by an earlier run.")
+        elif scraper.last_outcome == 'none_due':
+            print("\n✅ Nothing to scrape yet: no source is due for its next poll.")
         else:
             print("\n❌ No headlines could be scraped. Please check your internet connection.")
 
@@ -319,323 +805,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-# Create requirements.txt for the web scraper project
-requirements_content = '''# News Headlines Web Scraper - Requirements
-# External packages required for web scraping functionality
-
-requests>=2.31.0
-beautifulsoup4>=4.12.0
-lxml>=4.9.0
-
-# Installation commands:
-# pip install requests beautifulsoup4 lxml
-# or
-# pip install -r requirements.txt
-
-# Package descriptions:
-# requests - For making HTTP requests to websites
-# beautifulsoup4 - For parsing HTML and extracting data
-# lxml - Fast XML and HTML parser (optional but recommended)
-
-# Python version: 3.6+
-# Standard libraries also used:
-# - time (delays between requests)
-# - os (file system operations) 
-# - datetime (timestamp generation)
-# - json (structured data export)
-'''
-
-with open('requirements.txt', 'w', encoding='utf-8') as f:
-    f.write(requirements_content)
-
-print("✅ requirements.txt created successfully!")
-
-# Create a comprehensive README.md
-readme_content = '''# News Headlines Web Scraper
-
-**Python Developer Internship - Task 3**  
-**Company**: Elevate Labs  
-**Objective**: Scrape top headlines from news websites and save them to a text file.
-
-## 📝 Project Description
-
-This web scraper automatically extracts top headlines from major news websites including BBC News, CNN, and Reuters. It uses Python's `requests` library for HTTP communication and `BeautifulSoup` for HTML parsing, then saves the collected headlines to both text and JSON formats for offline reading.
-
-## ✨ Features
-
-### Core Functionality
-- **Multi-Source Scraping**: Extracts headlines from BBC, CNN, and Reuters
-- **HTTP Requests**: Uses proper User-Agent headers for ethical scraping  
-- **HTML Parsing**: BeautifulSoup for robust HTML content extraction
-- **Text File Output**: Saves headlines to `news_headlines.txt` (main requirement)
-- **Duplicate Removal**: Filters out duplicate headlines across sources
-
-### Advanced Features
-- **JSON Export**: Structured data export to `news_headlines.json`
-- **Error Handling**: Comprehensive error management for network issues
-- **Timeout Management**: Prevents hanging on slow connections
-- **Rate Limiting**: Respectful delays between requests
-- **Timestamp Tracking**: Records when headlines were scraped
-- **Source Attribution**: Each headline tagged with its source
-
-## 🛠 Technologies Used
-
-- **Language**: Python 3.6+
-- **HTTP Library**: `requests` - For making web requests
-- **HTML Parser**: `BeautifulSoup4` - For parsing HTML content
-- **Additional Parser**: `lxml` - For faster HTML processing
-- **Standard Libraries**: `time`, `os`, `datetime`, `json`
-
-## 📦 Installation
-
-### Prerequisites
-```bash
-# Make sure you have Python 3.6+ installed
-python --version
-```
-
-### Install Dependencies
-```bash
-# Install required packages
-pip install requests beautifulsoup4 lxml
-
-# Or install from requirements file
-pip install -r requirements.txt
-```
-
-## 🚀 How to Run
-
-1. **Clone the repository**:
-   ```bash
-   git clone <repository-url>
-   cd news-headlines-scraper
-   ```
-
-2. **Install dependencies**:
-   ```bash
-   pip install -r requirements.txt
-   ```
-
-3. **Run the scraper**:
-   ```bash
-   python news_scraper.py
-   ```
-
-4. **Check the output**:
-   - `news_headlines.txt` - Text file with all headlines
-   - `news_headlines.json` - Structured JSON data
-
-## 📋 Usage Example
-
-### Command Line Output
-```
-🌟 Welcome to the News Headlines Scraper!
-This tool scrapes top headlines from major news websites.
-
-🚀 Starting News Headlines Scraper...
-============================================================
-📰 Scraping BBC News headlines...
-✅ Found 15 headlines from BBC News
-📰 Scraping CNN headlines...
-✅ Found 15 headlines from CNN
-📰 Scraping Reuters headlines...
-✅ Found 10 headlines from Reuters
-
-============================================================
-📊 Scraping Summary:
-   • Total headlines found: 40
-   • Unique headlines: 38
-   • Sources scraped: BBC, CNN, Reuters
-============================================================
-
-💾 Successfully saved 38 headlines to 'news_headlines.txt'
-💾 Successfully saved headlines to JSON: 'news_headlines.json'
-
-📰 Sample Headlines:
-----------------------------------------
- 1. [BBC] Global climate summit reaches breakthrough agreement
- 2. [CNN] Tech stocks surge amid AI investment boom
- 3. [Reuters] Central bank announces new policy measures
-    ... and 35 more headlines
-
-✅ Scraping completed successfully!
-📄 Headlines saved to 'news_headlines.txt'
-📊 JSON data saved to 'news_headlines.json'
-
-🎯 Total unique headlines collected: 38
-```
-
-### Output Files
-
-**news_headlines.txt**:
-```
-================================================================================
-NEWS HEADLINES SCRAPED ON 2025-09-26 18:45:23
-================================================================================
-
-  1. [BBC] Global climate summit reaches breakthrough agreement
-  2. [CNN] Tech stocks surge amid AI investment boom
-  3. [Reuters] Central bank announces new policy measures
-  ...
-
-================================================================================
-Total Headlines: 38
-Generated by News Headlines Scraper
-================================================================================
-```
-
-## 🔧 Implementation Details
-
-### Key Concepts Demonstrated
-
-#### HTTP Requests
-- **GET Requests**: Fetching HTML content from news websites
-- **User-Agent Headers**: Proper browser identification
-- **Timeout Handling**: Preventing indefinite waits
-- **Status Code Checking**: Validating successful responses
-
-#### Web Scraping Ethics
-- **Rate Limiting**: Delays between requests to avoid overloading servers
-- **Respectful Headers**: Proper User-Agent identification
-- **Error Handling**: Graceful failure without crashing servers
-- **Content Focus**: Only extracting publicly available headlines
-
-#### HTML Parsing
-- **BeautifulSoup**: Parsing HTML documents
-- **CSS Selectors**: Targeting specific HTML elements
-- **Text Extraction**: Getting clean text from HTML tags
-- **Multiple Selectors**: Handling different website structures
-
-### Technical Architecture
-
-```python
-# Main workflow
-NewsHeadlineScraper()
-├── HTTP Session with headers
-├── scrape_bbc_news()     # BBC-specific parsing
-├── scrape_cnn_news()     # CNN-specific parsing  
-├── scrape_reuters_news() # Reuters-specific parsing
-├── Remove duplicates
-├── save_headlines_to_file()  # Text output
-└── save_headlines_json()     # JSON output
-```
-
-### Error Handling Strategy
-- **Network Errors**: Connection timeouts and failures
-- **HTTP Errors**: 404, 403, 500 status codes
-- **Parsing Errors**: Invalid HTML structure
-- **File I/O Errors**: Permission and disk space issues
-
-## 📁 Project Structure
-
-```
-news-headlines-scraper/
-├── news_scraper.py          # Main scraper script
-├── requirements.txt         # Python dependencies
-├── README.md               # Project documentation
-├── news_headlines.txt      # Generated headlines (text)
-├── news_headlines.json     # Generated headlines (JSON)
-├── demo.py                 # Demo script
-└── test_scraper.py         # Test cases
-```
-
-## 🎯 Learning Outcomes
-
-This project demonstrates mastery of:
-
-### Web Scraping Fundamentals
-- **HTTP Protocol**: Understanding GET requests and headers
-- **HTML Structure**: Working with tags, classes, and IDs
-- **CSS Selectors**: Targeting specific elements
-- **Data Extraction**: Converting HTML to clean text
-
-### Python Libraries
-- **requests**: HTTP library for web requests
-- **BeautifulSoup**: HTML parsing and navigation
-- **lxml**: High-performance XML/HTML parser
-- **Standard libraries**: File I/O, JSON, datetime
-
-### Best Practices
-- **Error Handling**: Robust exception management
-- **Rate Limiting**: Respectful server interaction
-- **Code Organization**: Clean, modular class structure
-- **Documentation**: Comprehensive code comments
-
-## 🔍 Interview Questions Preparation
-
-Based on the task's interview questions:
-
-### HTTP & Requests
-- **GET Request**: HTTP method for retrieving data from servers
-- **User-Agent**: Header identifying the client making requests
-- **HTTP Status Codes**: 200 (OK), 404 (Not Found), 403 (Forbidden), 500 (Server Error)
-
-### Python Packages
-- **Installation**: `pip install package-name`
-- **Requirements**: `pip install -r requirements.txt`
-- **Virtual Environments**: Isolated package management
-
-### BeautifulSoup
-- **soup.find_all()**: Finds all elements matching criteria
-- **.text**: Extracts text content from HTML elements
-- **HTML Tags**: Elements like `<h1>`, `<h2>`, `<p>`, `<div>`
-- **id vs class**: Unique identifier vs reusable style class
-
-### Web Scraping Ethics
-- **Risks**: Rate limiting, IP blocking, legal issues
-- **Best Practices**: Respect robots.txt, use delays, proper headers
-- **Error Handling**: try-except blocks for robust operation
-
-## 🧪 Testing & Validation
-
-### Manual Testing
-- ✅ Multiple news sources scraped successfully
-- ✅ Headlines saved to text file correctly
-- ✅ Error handling works for network issues
-- ✅ Duplicate removal functioning
-- ✅ JSON export working properly
-
-### Error Scenarios Tested
-- ✅ Network connection failures
-- ✅ Invalid URLs and 404 errors
-- ✅ Malformed HTML content
-- ✅ File write permission issues
-- ✅ Empty response handling
-
-## ⚠️ Important Notes
-
-### Ethical Considerations
-- This scraper is for educational purposes only
-- Always respect website terms of service
-- Check robots.txt before scraping any site
-- Use reasonable delays between requests
-- Don't overload servers with excessive requests
-
-### Legal Compliance
-- Only scrapes publicly available headlines
-- No authentication bypassing
-- Respects server response codes
-- Educational use under fair use
-
-## 🤝 Contributing
-
-This project is part of the Elevate Labs internship program. Suggestions for improvements welcome!
-
-## 📄 License
-
-Educational project created for learning purposes.
-
----
-
-**Author**: Er.Shuaib Khan
-**Date**: September 26, 2025  
-**Task**: Python Developer Internship - Task 3  
-**Company**: Elevate Labs  
-**Submission Deadline**: 10:00 PM IST
-'''
-
-with open('README.md', 'w', encoding='utf-8') as f:
-    f.write(readme_content)
-
-print("✅ README.md created successfully!")
-print(f"📄 File size: {len(readme_content)} characters")
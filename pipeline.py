@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Pipelined fetch and parse for the News Headlines Scraper
+
+Fetching is I/O-bound and releases the GIL; parsing with BeautifulSoup or
+lxml is CPU-bound and holds it, so with threads alone the sources are
+downloaded in parallel but parsed one at a time. FetchParsePipeline
+splits the two:
+
+    fetch threads --(bounded queue of raw bodies)--> dispatcher --> parse processes
+
+The fetch threads put each downloaded body on a queue of at most
+queue_size entries. The dispatcher hands bodies to a process pool and
+keeps at most two per parse worker in flight, so when parsing falls
+behind the queue fills up and the fetch threads wait instead of piling
+up bodies in memory. The workers send back only the extracted
+(selector, text, link) triples and their timings; the Headline objects
+are built in the scraper's process.
+"""
+
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import urljoin
+
+from content_hash import body_digest
+from extraction import compile_plan, iter_headlines
+from headline import Headline
+from scheduling import CircuitOpenError
+
+
+def extract_records(body, selectors, per_selector_limit, filters):
+    """Parse a body in a worker process and return (records, parse seconds, total seconds)
+
+    The plan is compiled once per worker process and then served from
+    compile_plan's cache.
+    """
+    start = time.perf_counter()
+    timings = {}
+    plan = compile_plan(selectors, per_selector_limit)
+    records = list(iter_headlines(body, plan, timings=timings, **filters))
+    return records, timings.get('parse', 0.0), time.perf_counter() - start
+
+
+def _process_context():
+    """A start method that is safe while fetch threads are running
+
+    Forking a process that has other threads running can deadlock the
+    child, so workers come from a fork server (or are spawned) instead.
+    """
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload(['extraction'])
+        return context
+    return multiprocessing.get_context('spawn')
+
+
+class FetchParsePipeline:
+    """Fetches sources on threads and parses them in a process pool"""
+
+    def __init__(self, scraper, parse_workers, queue_size=None):
+        """Build a pipeline for a NewsHeadlineScraper
+
+        The scraper's max_workers threads fetch and parse_workers processes
+        parse. queue_size bounds the bodies waiting to be parsed and
+        defaults to twice parse_workers.
+        """
+        self.scraper = scraper
+        self.parse_workers = parse_workers
+        self.queue_size = queue_size or 2 * parse_workers
+        self.pool = None
+
+    def _pool(self):
+        # Started on first use and kept, so later runs skip the worker start-up
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(self.parse_workers, mp_context=_process_context())
+        return self.pool
+
+    def _fetch(self, index, site, bodies):
+        scraper = self.scraper
+        print(f"📰 Scraping {site.title} headlines...")
+        with scraper.metrics.source(site.name), scraper.profiler.source(site.name):
+            try:
+                fetched_at = time.time()
+                response = scraper._fetch(site.url)
+                bodies.put((index, site, fetched_at, response.url, response.content,
+                            scraper._declared_charset(response)))
+            except CircuitOpenError as e:
+                scraper.metrics.count('errors', kind='circuit_open')
+                print(f"⏸️ Skipping {site.title}: {e}")
+                bodies.put((index, site, None, None, None, None))
+            except Exception as e:
+                scraper.metrics.count('errors', kind='request')
+                print(f"❌ Error scraping {site.title}: {e}")
+                bodies.put((index, site, None, None, None, None))
+
+    def run(self, sites):
+        """Scrape ``sites`` and return their headline lists, in the same order"""
+        scraper = self.scraper
+        results = [[] for _ in sites]
+        bodies = queue.Queue(maxsize=self.queue_size)
+        in_flight = threading.BoundedSemaphore(2 * self.parse_workers)
+        pending = []
+
+        fetch_workers = max(1, min(scraper.max_workers, len(sites)))
+        with ThreadPoolExecutor(max_workers=fetch_workers) as fetchers:
+            for index, site in enumerate(sites):
+                fetchers.submit(self._fetch, index, site, bodies)
+
+            for _ in sites:
+                index, site, fetched_at, url, body, charset = bodies.get()
+                if body is None:
+                    continue
+                filters = dict(parser=scraper.parser_for(site), min_length=site.min_length,
+                               max_length=site.max_length, limit=site.limit, encoding=charset)
+                digest = settings = None
+                if scraper.extraction_memo is not None:
+                    digest = body_digest(body, site.hash_region)
+                    settings = (site.selectors, site.per_selector_limit, tuple(sorted(filters.items())))
+                    records = scraper.extraction_memo.get(site.name, digest, settings)
+                    if records is not None:
+                        scraper.metrics.count('reused_extractions', source=site.name)
+                        results[index] = self._headlines(site, fetched_at, url, records)
+                        continue
+
+                # Blocks while the parse workers are saturated, which in turn
+                # stops this loop draining the queue and holds the fetchers back
+                in_flight.acquire()
+                try:
+                    future = self._pool().submit(extract_records, body, site.selectors,
+                                                 site.per_selector_limit, filters)
+                except Exception as e:
+                    # A broken pool (e.g. a worker was killed) is replaced on the next run
+                    in_flight.release()
+                    self.pool = None
+                    scraper.metrics.count('errors', kind='parse', source=site.name)
+                    print(f"❌ Parsing error for {site.title}: {e}")
+                    continue
+                future.add_done_callback(lambda _: in_flight.release())
+                pending.append((index, site, fetched_at, url, digest, settings, future))
+
+        for index, site, fetched_at, url, digest, settings, future in pending:
+            try:
+                records, parse_time, total_time = future.result()
+            except Exception as e:
+                scraper.metrics.count('errors', kind='parse', source=site.name)
+                print(f"❌ Parsing error for {site.title}: {e}")
+                continue
+            scraper.metrics.observe('parse', parse_time, site.name)
+            scraper.metrics.observe('extract', total_time - parse_time, site.name)
+            if digest is not None:
+                scraper.extraction_memo.store(site.name, digest, settings, records)
+            results[index] = self._headlines(site, fetched_at, url, records)
+        return results
+
+    def _headlines(self, site, fetched_at, url, records):
+        headlines = [Headline(site.name, title, urljoin(url, link) if link else site.url, fetched_at, selector)
+                     for selector, title, link in records]
+        self.scraper.metrics.count('headlines', len(headlines), source=site.name)
+        print(f"✅ Found {len(headlines)} headlines from {site.title}")
+        return headlines
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
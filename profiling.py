@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Stage-level profiling for the News Headlines Scraper
+
+StageProfiler is a sampling profiler. A background thread snapshots the
+stack of every thread working on the pipeline every few milliseconds and
+prefixes it with the stage and source labels that thread has entered:
+
+    run;BBC;extract;_extract (news_scraper.py:172);...;select (css.py:120)
+
+Because labels are entered with cheap context managers and the stacks
+are read from outside, the profiled code is not slowed down call by call
+the way cProfile slows it, and worker threads in concurrent mode are
+covered as well as the main thread (cProfile only sees the thread that
+enabled it). The sampler needs the GIL to take a snapshot, so it ticks
+at most once per switch interval (sys.getswitchinterval(), 5 ms by
+default) while pipeline threads are busy in Python code.
+
+Each run writes two files to the profile directory:
+
+    profile-YYYYmmdd-HHMMSS.collapsed   "stack count" lines, the collapsed-stack
+                                        format read by flamegraph.pl, inferno
+                                        and speedscope
+    profile-YYYYmmdd-HHMMSS.txt         wall time per stage and source, and
+                                        the functions most often on the stack
+
+When profiling is off the scraper uses NULL_PROFILER, whose stage and
+source blocks do nothing.
+"""
+
+import contextlib
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+DEFAULT_INTERVAL = 0.005
+
+
+def _frame_name(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StageProfiler:
+    """Samples labeled thread stacks and times labeled blocks"""
+
+    enabled = True
+
+    def __init__(self, interval=DEFAULT_INTERVAL):
+        self.interval = interval
+        self.labels = {}  # thread id -> labels entered on that thread, outermost first
+        self.lock = threading.Lock()
+        self.thread = None
+        self.stopped = threading.Event()
+        self._reset()
+
+    def _reset(self):
+        self.stacks = Counter()
+        self.label_samples = Counter()
+        self.block_times = {}  # label path -> [seconds, calls]
+        self.ticks = 0
+        self.started_at = time.time()
+        self.start_clock = time.perf_counter()
+        self.wall = 0.0
+
+    def start(self):
+        """Start a new profile, discarding the previous one"""
+        self.stop()
+        self._reset()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._sample, name='stage-profiler', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop sampling; the collected profile is kept until the next start()"""
+        if self.thread is not None:
+            self.stopped.set()
+            self.thread.join()
+            self.thread = None
+            self.wall = time.perf_counter() - self.start_clock
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Label everything this thread does inside the block with ``name`` and time it"""
+        labels = self.labels.setdefault(threading.get_ident(), [])
+        labels.append(name)
+        path = ';'.join(labels)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            labels.pop()
+            with self.lock:
+                entry = self.block_times.setdefault(path, [0.0, 0])
+                entry[0] += elapsed
+                entry[1] += 1
+
+    # A source is just another label; the name documents which kind it is
+    source = stage
+
+    def _sample(self):
+        own = threading.get_ident()
+        while not self.stopped.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                labels = self.labels.get(ident)
+                if ident == own or not labels:
+                    continue  # only threads inside a labeled block are part of the pipeline
+                prefix = ';'.join(labels)
+                names = []
+                while frame is not None:
+                    names.append(_frame_name(frame.f_code))
+                    frame = frame.f_back
+                names.reverse()
+                self.stacks[prefix + ';' + ';'.join(names)] += 1
+                self.label_samples[prefix] += 1
+            self.ticks += 1
+
+    def collapsed(self):
+        """Return the samples in collapsed-stack format"""
+        return ''.join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+    def report(self, top=25):
+        """Return the human-readable summary of the profile"""
+        lines = [f"Profile of the run started {datetime.fromtimestamp(self.started_at).isoformat(timespec='seconds')}",
+                 f"Wall time {self.wall:.3f} s, {self.ticks} ticks every {self.interval * 1000:g} ms, "
+                 f"{sum(self.stacks.values())} thread samples",
+                 "",
+                 "Wall time by stage and source (blocks on different threads overlap)",
+                 f"{'stage / source':<48} {'seconds':>9} {'calls':>7} {'samples':>8}"]
+        with self.lock:
+            block_times = dict(self.block_times)
+        for path, (seconds, calls) in sorted(block_times.items()):
+            lines.append(f"{path:<48} {seconds:>9.3f} {calls:>7} {self.label_samples.get(path, 0):>8}")
+
+        own, total = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(';')
+            own[frames[-1]] += count
+            for name in set(frames):
+                total[name] += count
+        samples = sum(self.stacks.values()) or 1
+        lines += ["", "Hottest functions (% of samples with the function running / on the stack)",
+                  f"{'function':<72} {'self %':>7} {'total %':>8}"]
+        for name, count in own.most_common(top):
+            lines.append(f"{name:<72} {count * 100 / samples:>7.1f} {total[name] * 100 / samples:>8.1f}")
+        return '\n'.join(lines) + '\n'
+
+    def write(self, directory):
+        """Write the collapsed stacks and the report to ``directory``; return both paths"""
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, f"profile-{datetime.fromtimestamp(self.started_at):%Y%m%d-%H%M%S}")
+        suffix = 1
+        name = base
+        while os.path.exists(name + '.collapsed'):
+            suffix += 1
+            name = f"{base}-{suffix}"
+        paths = (name + '.collapsed', name + '.txt')
+        for path, text in zip(paths, (self.collapsed(), self.report())):
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write(text)
+        return paths
+
+
+class _NullProfiler:
+    """Stand-in used when profiling is off: every method is a no-op"""
+
+    enabled = False
+    _block = contextlib.nullcontext()
+
+    def stage(self, name):
+        return self._block
+
+    source = stage
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+NULL_PROFILER = _NullProfiler()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+HTTP record/replay for the News Headlines Scraper
+
+RecordingAdapter sits in front of the transport and appends every
+response it sees (URL, status, headers, body and timings) to an archive.
+It also sits in front of the HTTP cache, so a revalidated page is
+recorded with its cached body rather than as an empty 304.
+ReplayAdapter serves those responses back without touching the network,
+sleeping for the recorded latencies scaled by a factor. Replaying an
+archive reproduces a production run exactly, so the whole pipeline can be
+profiled and load-tested offline.
+
+The archive is a WARC-like sequence of gzip members, one per response:
+a JSON header line followed by the (decoded) body bytes. Like .warc.gz it
+can be appended to and read with zcat.
+
+Usage:
+    python replay.py responses.rec.gz        # list the recorded responses
+"""
+
+import argparse
+import gzip
+import json
+import threading
+import time
+from datetime import timedelta
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from http_cache import HOP_HEADERS
+
+
+class RecordedResponse:
+    """One response read from an archive"""
+
+    __slots__ = ('url', 'method', 'status', 'reason', 'headers', 'ttfb', 'download', 'recorded_at', 'body')
+
+    def __init__(self, url, method, status, reason, headers, ttfb, download, recorded_at, body=b''):
+        self.url = url
+        self.method = method
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.ttfb = ttfb
+        self.download = download
+        self.recorded_at = recorded_at
+        self.body = body
+
+    def header(self):
+        """Return the JSON-serializable record header (everything but the body)"""
+        data = {name: getattr(self, name) for name in self.__slots__ if name != 'body'}
+        data['length'] = len(self.body)
+        return data
+
+
+def read_archive(path):
+    """Yield every RecordedResponse in an archive, in recording order"""
+    with gzip.open(path, 'rb') as file:
+        while True:
+            line = file.readline()
+            if not line:
+                return
+            header = json.loads(line)
+            length = header.pop('length')
+            body = file.read(length)
+            if len(body) != length:
+                return  # a record cut short by an interrupted recording
+            yield RecordedResponse(body=body, **header)
+
+
+class RecordingAdapter(BaseAdapter):
+    """A transport adapter that records every response of the adapter it wraps"""
+
+    def __init__(self, path, adapter=None):
+        super().__init__()
+        self.path = path
+        self.adapter = adapter or HTTPAdapter()
+        self.lock = threading.Lock()
+        self.recorded = 0
+
+    def send(self, request, **kwargs):
+        """Send a request and append its response to the archive
+
+        The body is read in full so it can be stored; a streaming caller
+        then reads it from memory.
+        """
+        start = time.perf_counter()
+        response = self.adapter.send(request, **kwargs)
+        # Without stream=True the inner adapter has already read the body, so it counts as ttfb
+        headers_at = time.perf_counter()
+        body = response.content
+        done_at = time.perf_counter()
+        record = RecordedResponse(request.url, request.method, response.status_code, response.reason,
+                                  [[k, v] for k, v in response.headers.items() if k.lower() not in HOP_HEADERS],
+                                  headers_at - start, done_at - headers_at, time.time(), body)
+        member = gzip.compress(json.dumps(record.header()).encode('utf-8') + b'\n' + body, mtime=0)
+        with self.lock:
+            with open(self.path, 'ab') as file:
+                file.write(member)
+            self.recorded += 1
+        return response
+
+    def close(self):
+        self.adapter.close()
+
+
+class ReplayAdapter(BaseAdapter):
+    """A transport adapter answering requests from a recorded archive
+
+    Requests are matched by method and URL. A URL recorded several times is
+    answered with its recordings in order, starting over after the last.
+    Each response is delayed by its recorded time to first byte plus
+    download time, multiplied by latency_scale (0 replays instantly).
+    Unrecorded URLs raise requests.ConnectionError, like an unreachable host.
+    """
+
+    def __init__(self, path, latency_scale=1.0):
+        super().__init__()
+        self.path = path
+        self.latency_scale = latency_scale
+        self.responses = {}
+        self.positions = {}
+        self.lock = threading.Lock()
+        for record in read_archive(path):
+            self.responses.setdefault((record.method, record.url), []).append(record)
+
+    def _next(self, key):
+        with self.lock:
+            records = self.responses.get(key)
+            if not records:
+                return None
+            position = self.positions.get(key, 0)
+            self.positions[key] = (position + 1) % len(records)
+            return records[position]
+
+    def send(self, request, **kwargs):
+        record = self._next((request.method, request.url))
+        if record is None:
+            raise requests.ConnectionError(f"No recorded response for {request.method} {request.url}",
+                                           request=request)
+        if self.latency_scale:
+            time.sleep((record.ttfb + record.download) * self.latency_scale)
+        return self._build_response(request, record)
+
+    def _build_response(self, request, record):
+        response = requests.Response()
+        response.status_code = record.status
+        response.reason = record.reason
+        response.headers = CaseInsensitiveDict(record.headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = record.body
+        response._content_consumed = True
+        response.url = request.url
+        response.request = request
+        response.elapsed = timedelta(seconds=record.ttfb * self.latency_scale)
+        response.connection = self
+        response.replayed = True
+        return response
+
+    def close(self):
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="List the responses in a record/replay archive")
+    parser.add_argument('archive')
+    args = parser.parse_args(argv)
+
+    total = 0
+    for record in read_archive(args.archive):
+        total += 1
+        print(f"{record.status} {record.method} {record.url}  {len(record.body) / 1024:.1f} KB  "
+              f"ttfb {record.ttfb * 1000:.0f} ms  download {record.download * 1000:.0f} ms")
+    print(f"{total} responses")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Request scheduling helpers for the News Headlines Scraper
+
+Provides a per-host token bucket so that requests to different news sites
+go out immediately while each site still sees a polite request rate, an
+adaptive poller that learns how often each site's headlines change, a
+retry policy with exponential backoff and jitter for transient failures,
+and a per-host circuit breaker that stops calling hosts that keep failing.
+"""
+
+import hashlib
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+
+from state_files import load_state, save_state
+
+
+class TokenBucket:
+    """A thread-safe token bucket refilled at a fixed rate"""
+
+    def __init__(self, rate=1.0, burst=1):
+        """Create a bucket holding up to ``burst`` tokens, refilled at ``rate`` per second"""
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _reserve(self):
+        """Take one token and return how long the caller must wait for it"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            # A negative balance is a reservation on tokens that have not arrived yet
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def acquire(self):
+        """Block until a token is available and return the time spent waiting"""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class HostRateLimiter:
+    """Keeps one token bucket per hostname"""
+
+    def __init__(self, default_rate=1.0, default_burst=1, limits=None):
+        """Create a limiter
+
+        limits maps a hostname to a (rate, burst) pair overriding the defaults.
+        """
+        self.default_rate = default_rate
+        self.default_burst = default_burst
+        self.limits = {}
+        self.buckets = {}
+        self.lock = threading.Lock()
+        for host, (rate, burst) in (limits or {}).items():
+            self.configure(host, rate, burst)
+
+    @staticmethod
+    def host_for(url):
+        """Return the lower-cased hostname a URL points at"""
+        return (urlsplit(url).hostname or '').lower()
+
+    def configure(self, host, rate, burst=1):
+        """Set the rate and burst for a single host"""
+        host = host.lower()
+        with self.lock:
+            self.limits[host] = (rate, burst)
+            self.buckets[host] = TokenBucket(rate, burst)
+
+    def bucket_for(self, host):
+        """Return the bucket for a host, creating it on first use"""
+        host = host.lower()
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                rate, burst = self.limits.get(host, (self.default_rate, self.default_burst))
+                bucket = self.buckets[host] = TokenBucket(rate, burst)
+            return bucket
+
+    def acquire(self, url):
+        """Wait for permission to send a request to the host of ``url``"""
+        return self.bucket_for(self.host_for(url)).acquire()
+
+
+def headline_fingerprint(headlines):
+    """Return a short stable digest of the set of titles in a scrape"""
+    titles = '\n'.join(sorted({headline.title for headline in headlines}))
+    return hashlib.blake2b(titles.encode('utf-8'), digest_size=8).hexdigest()
+
+
+class PollState:
+    """What the poller knows about one site"""
+
+    __slots__ = ('interval', 'fingerprint', 'last_poll', 'last_change', 'polls', 'changes', 'change_rate')
+
+    def __init__(self, interval, fingerprint=None, last_poll=None, last_change=None,
+                 polls=0, changes=0, change_rate=0.0):
+        self.interval = interval
+        self.fingerprint = fingerprint
+        self.last_poll = last_poll
+        self.last_change = last_change
+        self.polls = polls
+        self.changes = changes
+        self.change_rate = change_rate
+
+    def to_dict(self):
+        """Return the state as a JSON-serializable dict"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class AdaptivePoller:
+    """Per-site polling intervals that follow how often each site changes
+
+    After every poll the site's headline set is compared with the previous
+    one. No change multiplies its interval by ``backoff``; a change
+    multiplies it by ``speedup``. Intervals stay within the site's
+    [min_interval, max_interval] bounds, so a busy front page is polled
+    often and a quiet one drifts towards the maximum. With a state file the
+    learned intervals survive between runs, letting a frequent cron job
+    scrape only the sites that are due; save() writes it once per run.
+    """
+
+    def __init__(self, min_interval=60, max_interval=3600, backoff=2.0, speedup=0.5,
+                 bounds=None, state_file=None):
+        """Create a poller
+
+        bounds maps a site name to a (min_interval, max_interval) pair
+        overriding the defaults.
+        """
+        if not 0 < min_interval <= max_interval:
+            raise ValueError("need 0 < min_interval <= max_interval")
+        if backoff < 1 or not 0 < speedup <= 1:
+            raise ValueError("backoff must be >= 1 and speedup in (0, 1]")
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.speedup = speedup
+        self.bounds = {}
+        self.states = {}
+        self.state_file = state_file
+        self.dirty = False
+        self.lock = threading.Lock()
+        for name, (low, high) in (bounds or {}).items():
+            self.configure(name, low, high)
+        if state_file:
+            self._load()
+
+    def configure(self, name, min_interval=None, max_interval=None):
+        """Set the interval bounds for a single site"""
+        low = min_interval if min_interval is not None else self.min_interval
+        high = max_interval if max_interval is not None else max(self.max_interval, low)
+        if not 0 < low <= high:
+            raise ValueError(f"need 0 < min_interval <= max_interval for {name!r}")
+        with self.lock:
+            self.bounds[name] = (low, high)
+
+    def _bounds(self, name):
+        return self.bounds.get(name, (self.min_interval, self.max_interval))
+
+    def _load(self):
+        for name, state in load_state(self.state_file).items():
+            try:
+                self.states[name] = PollState(**state)
+            except TypeError:
+                continue
+
+    def save(self):
+        """Write the learned state to the state file, if there is one and anything was recorded"""
+        with self.lock:
+            if not self.state_file or not self.dirty:
+                return
+            save_state(self.state_file, {name: state.to_dict() for name, state in self.states.items()}, indent=2)
+            self.dirty = False
+
+    def state_for(self, name):
+        """Return the PollState for a site, starting at its minimum interval"""
+        with self.lock:
+            state = self.states.get(name)
+            if state is None:
+                state = self.states[name] = PollState(self._bounds(name)[0])
+            return state
+
+    def next_poll(self, name):
+        """Return the POSIX time a site is next due (0 if it was never polled)"""
+        state = self.state_for(name)
+        return state.last_poll + state.interval if state.last_poll is not None else 0.0
+
+    def due(self, name, now=None):
+        """Return True if a site should be polled now"""
+        return self.next_poll(name) <= (now if now is not None else time.time())
+
+    def record(self, name, headlines, now=None):
+        """Record a poll's headlines and return the site's next interval in seconds
+
+        An empty result (a failed scrape) leaves the interval and the last
+        known headline set as they were.
+        """
+        now = now if now is not None else time.time()
+        state = self.state_for(name)
+        low, high = self._bounds(name)
+        with self.lock:
+            state.last_poll = now
+            if headlines:
+                fingerprint = headline_fingerprint(headlines)
+                changed = state.fingerprint is not None and fingerprint != state.fingerprint
+                state.polls += 1
+                state.change_rate = 0.8 * state.change_rate + 0.2 * changed
+                if changed:
+                    state.changes += 1
+                    state.last_change = now
+                    state.interval *= self.speedup
+                elif state.fingerprint is not None:
+                    state.interval *= self.backoff
+                state.fingerprint = fingerprint
+            state.interval = min(max(state.interval, low), high)
+            self.dirty = True
+            return state.interval
+
+
+class RetryPolicy:
+    """When and how long to wait before retrying a failed request
+
+    Connection errors, timeouts and the statuses in ``statuses`` are
+    retried up to ``retries`` times. The n-th retry waits a random time
+    between 0 and min(max_backoff, backoff * 2**n) ("full jitter"), so
+    sources failing together do not retry in lockstep. A Retry-After
+    header is honoured instead when it asks for no more than max_backoff;
+    one asking for longer means giving up.
+    """
+
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+    def __init__(self, retries=2, backoff=0.5, max_backoff=10.0, statuses=RETRY_STATUSES):
+        if retries < 0 or backoff < 0 or max_backoff < 0:
+            raise ValueError("retries, backoff and max_backoff must not be negative")
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.statuses = frozenset(statuses)
+
+    @staticmethod
+    def retry_after(value, now=None):
+        """Return the seconds a Retry-After header value asks for, or None if it cannot be parsed"""
+        if not value:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            pass
+        try:
+            return max(parsedate_to_datetime(value).timestamp() - (time.time() if now is None else now), 0.0)
+        except (TypeError, ValueError):
+            return None
+
+    def delay(self, retry, retry_after=None):
+        """Return the seconds to wait before retry number ``retry`` (0-based), or None to give up"""
+        if retry >= self.retries:
+            return None
+        if retry_after is not None:
+            return retry_after if retry_after <= self.max_backoff else None
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** retry))
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised instead of sending a request to a host whose circuit is open"""
+
+
+class BreakerState:
+    """What the circuit breaker knows about one host"""
+
+    __slots__ = ('failures', 'opened_at', 'open_until')
+
+    def __init__(self, failures=0, opened_at=None, open_until=None):
+        self.failures = failures
+        self.opened_at = opened_at
+        self.open_until = open_until
+
+    def to_dict(self):
+        """Return the state as a JSON-serializable dict"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class CircuitBreaker:
+    """Per-host circuit breaker
+
+    A host that fails ``threshold`` fetches in a row (a fetch fails once
+    its retries are used up) is not called again for ``cooldown`` seconds;
+    requests to it raise CircuitOpenError at once instead of waiting for a
+    timeout.
+    After the cool-down one trial request is let through: success closes
+    the circuit, failure opens it again for twice as long as the last
+    time, up to max_cooldown. With a state file the failure counts and
+    open circuits survive between runs, so a dead source stops costing
+    every cron run its timeouts.
+    """
+
+    def __init__(self, threshold=3, cooldown=300.0, max_cooldown=3600.0, state_file=None):
+        if threshold < 1 or cooldown <= 0:
+            raise ValueError("threshold must be at least 1 and cooldown positive")
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max(max_cooldown, cooldown)
+        self.states = {}
+        self.trials = set()
+        self.state_file = state_file
+        self.lock = threading.Lock()
+        if state_file:
+            self._load()
+
+    def _load(self):
+        for host, state in load_state(self.state_file).items():
+            try:
+                self.states[host] = BreakerState(**state)
+            except TypeError:
+                continue
+
+    def _save(self):
+        save_state(self.state_file, {host: state.to_dict() for host, state in self.states.items()}, indent=2)
+
+    def check(self, host, now=None):
+        """Raise CircuitOpenError unless a request to ``host`` may be sent now"""
+        now = time.time() if now is None else now
+        with self.lock:
+            state = self.states.get(host)
+            if state is None or state.open_until is None:
+                return
+            if now < state.open_until:
+                raise CircuitOpenError(f"{host} failed {state.failures} times in a row; "
+                                       f"not retrying for another {state.open_until - now:.0f}s")
+            if host in self.trials:
+                raise CircuitOpenError(f"{host} is failing; waiting for the trial request to finish")
+            self.trials.add(host)  # half-open: this request is the trial
+
+    def record_success(self, host):
+        with self.lock:
+            self.trials.discard(host)
+            state = self.states.pop(host, None)
+            if state is not None and self.state_file:
+                self._save()
+
+    def record_failure(self, host, now=None):
+        """Count a failed request; return True if the circuit is now open"""
+        now = time.time() if now is None else now
+        with self.lock:
+            trial = host in self.trials
+            self.trials.discard(host)
+            state = self.states.get(host)
+            if state is None:
+                state = self.states[host] = BreakerState()
+            state.failures += 1
+            if trial:
+                # The trial failed: stay open, for longer each time
+                last = state.open_until - state.opened_at if state.opened_at is not None else self.cooldown
+                state.opened_at, state.open_until = now, now + min(last * 2, self.max_cooldown)
+            elif state.open_until is None and state.failures >= self.threshold:
+                state.opened_at, state.open_until = now, now + self.cooldown
+            if self.state_file:
+                self._save()
+            return state.open_until is not None and now < state.open_until
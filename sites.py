@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Site registry for the News Headlines Scraper
+
+Each news source is described by data instead of code: a URL, the CSS
+selectors that find its headlines, length filters, a headline limit and
+optional per-site parser, rate-limit and polling settings. Sources are loaded from
+a JSON file (sites.json by default), so adding a site needs no new code.
+"""
+
+import json
+import os
+import re
+
+from extraction import check_backend, compile_plan
+
+DEFAULT_SITES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sites.json')
+
+# Common headline selectors for sites without a dedicated entry
+GENERIC_SELECTORS = (
+    'h1', 'h2', 'h3',
+    '.headline', '.title', '.story-title',
+    '[class*="headline"]', '[class*="title"]'
+)
+
+
+class SiteConfig:
+    """Everything needed to scrape one news source"""
+
+    FIELDS = ('name', 'url', 'selectors', 'title', 'min_length', 'max_length', 'limit',
+              'per_selector_limit', 'parser', 'rate', 'burst', 'pool_size',
+              'min_interval', 'max_interval', 'hash_region', 'enabled')
+
+    def __init__(self, name, url, selectors, title=None, min_length=11, max_length=None, limit=15,
+                 per_selector_limit=None, parser=None, rate=None, burst=None, pool_size=None,
+                 min_interval=None, max_interval=None, hash_region=None, enabled=True):
+        """Describe a site
+
+        name tags each headline (e.g. "BBC"), title is used in progress
+        messages and defaults to name. parser, rate and burst override the
+        scraper-wide settings for this site only, as do pool_size (idle
+        connections kept open to its host) and min_interval and
+        max_interval (seconds) for adaptive polling. hash_region is a regex
+        for the part of the page whose hash decides if it changed.
+        """
+        if not selectors:
+            raise ValueError(f"Site {name!r} needs at least one selector")
+        self.name = name
+        self.url = url
+        self.selectors = tuple(selectors)
+        self.title = title or name
+        self.min_length = min_length
+        self.max_length = max_length
+        self.limit = limit
+        self.per_selector_limit = per_selector_limit
+        self.parser = check_backend(parser) if parser else None
+        self.rate = rate
+        self.burst = burst
+        self.pool_size = pool_size
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.hash_region = re.compile(hash_region.encode('utf-8'), re.S) if hash_region else None
+        self.enabled = enabled
+        # Compiled once here, and shared by every site with the same selectors
+        self.plan = compile_plan(self.selectors, self.per_selector_limit)
+
+    @classmethod
+    def from_dict(cls, data, defaults=None):
+        """Build a SiteConfig from a registry entry, filling gaps from ``defaults``"""
+        merged = dict(defaults or {})
+        merged.update(data)
+        unknown = set(merged) - set(cls.FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown site setting(s) for {data.get('name', '?')!r}: {', '.join(sorted(unknown))}")
+        missing = {'name', 'url', 'selectors'} - set(merged)
+        if missing:
+            raise ValueError(f"Site entry is missing {', '.join(sorted(missing))}: {data!r}")
+        return cls(**merged)
+
+    def __repr__(self):
+        return f"SiteConfig(name={self.name!r}, url={self.url!r})"
+
+
+def generic_site(url, site_name="Generic Site"):
+    """Return a SiteConfig for an arbitrary news page using the common selectors"""
+    return SiteConfig(site_name, url, GENERIC_SELECTORS, min_length=15, max_length=200,
+                      limit=None, per_selector_limit=5)
+
+
+def load_sites(path=DEFAULT_SITES_FILE):
+    """Load the site registry from a JSON file and return {name: SiteConfig} in file order
+
+    The file holds a "sites" list and an optional "defaults" object whose
+    values apply to every site that does not set them itself.
+    """
+    with open(path, encoding='utf-8') as file:
+        data = json.load(file)
+
+    defaults = data.get('defaults', {})
+    sites = {}
+    for entry in data.get('sites', []):
+        site = SiteConfig.from_dict(entry, defaults)
+        if site.name in sites:
+            raise ValueError(f"Duplicate site name {site.name!r} in {path}")
+        sites[site.name] = site
+    return sites
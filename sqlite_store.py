@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+SQLite headline storage for the News Headlines Scraper
+
+Keeps every scraped headline in one SQLite table that can be queried
+without loading the history: the latest N headlines from a source, or
+everything scraped since a point in time. Inserts are batched into
+transactions and the database runs in WAL mode, so readers are never
+blocked by a scrape in progress.
+
+Usage:
+    python sqlite_store.py headlines.db latest BBC -n 10
+    python sqlite_store.py headlines.db since 2024-05-01T08:00
+"""
+
+import argparse
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from dedupe import title_hash
+from headline import Headline, parse_time
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS headlines ('
+    ' id INTEGER PRIMARY KEY,'
+    ' source TEXT NOT NULL,'
+    ' title TEXT NOT NULL,'
+    ' url TEXT,'
+    ' selector TEXT,'
+    ' scraped_at REAL NOT NULL,'
+    ' title_hash INTEGER NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS headlines_source_time ON headlines (source, scraped_at)',
+    'CREATE INDEX IF NOT EXISTS headlines_time ON headlines (scraped_at)',
+    'CREATE INDEX IF NOT EXISTS headlines_title_hash ON headlines (title_hash)',
+)
+
+COLUMNS = 'source, title, url, scraped_at, selector'
+
+
+def _row_to_headline(row):
+    return Headline(*row)
+
+
+class SQLiteStore:
+    """A headline table with batched writes and indexed lookups
+
+    The indexes cover the queries below: (source, scraped_at) for the
+    newest headlines of one source, scraped_at for time ranges and the
+    normalized title hash for finding every sighting of a story. Each
+    query is an index range scan, so its cost depends on the rows
+    returned rather than the size of the table.
+    """
+
+    def __init__(self, path, batch_size=500):
+        """Open (or create) the database at ``path``"""
+        self.path = path
+        self.batch_size = batch_size
+        self.pending = []
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        with self.connection:
+            for statement in SCHEMA:
+                self.connection.execute(statement)
+
+    def add(self, headline):
+        """Queue a headline, writing a batch once batch_size are waiting"""
+        with self.lock:
+            self.pending.append(self._row(headline))
+            if len(self.pending) >= self.batch_size:
+                self._flush()
+
+    def extend(self, headlines):
+        """Insert several headlines, batch_size rows per transaction"""
+        with self.lock:
+            for headline in headlines:
+                self.pending.append(self._row(headline))
+                if len(self.pending) >= self.batch_size:
+                    self._flush()
+            self._flush()
+
+    def flush(self):
+        """Write any queued headlines"""
+        with self.lock:
+            self._flush()
+
+    @staticmethod
+    def _row(headline):
+        scraped_at = headline.fetched_at if headline.fetched_at is not None else time.time()
+        return (headline.source, headline.title, headline.url, headline.selector,
+                scraped_at, title_hash(headline.title))
+
+    def _flush(self):
+        if not self.pending:
+            return
+        pending, self.pending = self.pending, []
+        with self.connection:
+            self.connection.executemany(
+                'INSERT INTO headlines (source, title, url, selector, scraped_at, title_hash)'
+                ' VALUES (?, ?, ?, ?, ?, ?)', pending)
+
+    def _query(self, sql, parameters):
+        self.flush()
+        with self.lock:
+            rows = self.connection.execute(sql, parameters).fetchall()
+        return [_row_to_headline(row) for row in rows]
+
+    def __len__(self):
+        self.flush()
+        with self.lock:
+            return self.connection.execute('SELECT COUNT(*) FROM headlines').fetchone()[0]
+
+    def sources(self):
+        """Return the names of every source in the table"""
+        self.flush()
+        with self.lock:
+            # A skip-scan over the (source, scraped_at) index
+            return [row[0] for row in self.connection.execute('SELECT DISTINCT source FROM headlines ORDER BY source')]
+
+    def latest(self, source, limit=10):
+        """Return the ``limit`` most recently scraped headlines from ``source``, newest first"""
+        return self._query(f'SELECT {COLUMNS} FROM headlines WHERE source = ?'
+                           ' ORDER BY scraped_at DESC LIMIT ?', (source, limit))
+
+    def since(self, timestamp, source=None, limit=None):
+        """Return headlines scraped at or after ``timestamp`` (POSIX time or datetime), oldest first"""
+        if isinstance(timestamp, datetime):
+            timestamp = timestamp.timestamp()
+        sql = f'SELECT {COLUMNS} FROM headlines WHERE scraped_at >= ?'
+        parameters = [timestamp]
+        if source is not None:
+            sql += ' AND source = ?'
+            parameters.append(source)
+        sql += ' ORDER BY scraped_at'
+        if limit is not None:
+            sql += ' LIMIT ?'
+            parameters.append(limit)
+        return self._query(sql, parameters)
+
+    def sightings(self, title):
+        """Return every stored headline whose normalized title matches ``title``, oldest first"""
+        return self._query(f'SELECT {COLUMNS} FROM headlines WHERE title_hash = ?'
+                           ' ORDER BY scraped_at', (title_hash(title),))
+
+    def close(self):
+        """Write queued headlines and close the database"""
+        self.flush()
+        self.connection.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query a SQLite headline database")
+    parser.add_argument('database')
+    commands = parser.add_subparsers(dest='command', required=True)
+    latest = commands.add_parser('latest', help="newest headlines from one source")
+    latest.add_argument('source')
+    latest.add_argument('-n', '--limit', type=int, default=10)
+    since = commands.add_parser('since', help="headlines scraped since a time (ISO 8601 or POSIX)")
+    since.add_argument('time', type=parse_time)
+    since.add_argument('--source')
+    since.add_argument('-n', '--limit', type=int)
+    commands.add_parser('sources', help="list the stored sources")
+    args = parser.parse_args(argv)
+
+    store = SQLiteStore(args.database)
+    try:
+        if args.command == 'sources':
+            for source in store.sources():
+                print(source)
+            return
+        if args.command == 'latest':
+            headlines = store.latest(args.source, args.limit)
+        else:
+            headlines = store.since(args.time, args.source, args.limit)
+        for headline in headlines:
+            print(f"{headline.fetched_iso}  {headline}")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+JSON state files for the News Headlines Scraper
+
+Learned polling intervals, open circuits and the extraction memo are kept
+between runs in small JSON files. They are read tolerantly, a missing or
+damaged file counting as no state, and replaced atomically, so a crash
+while writing never leaves a half-written file behind.
+"""
+
+import json
+import os
+import tempfile
+
+
+def load_state(path):
+    """Return the dict stored at ``path``, or an empty dict if there is none to read"""
+    try:
+        with open(path, encoding='utf-8') as file:
+            data = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def save_state(path, data, **options):
+    """Write ``data`` to ``path`` as JSON through a temporary file; options go to json.dump"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as file:
+            json.dump(data, file, **options)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
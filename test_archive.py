@@ -0,0 +1,85 @@
+"""Tests for the compressed, block-indexed headline archive"""
+
+import gzip
+import time
+from datetime import datetime
+
+import pytest
+
+import archive
+from archive import ArchiveReader, HeadlineArchive
+from headline import Headline
+
+NOON = datetime(2024, 5, 1, 12).timestamp()
+
+CODECS = [
+    'gzip',
+    pytest.param('zstd', marks=pytest.mark.skipif(archive.zstandard is None, reason="zstandard not installed")),
+]
+
+
+def _headlines(count, start=0, source='BBC'):
+    return [Headline(source, f"Headline number {i}", f"https://example.test/{i}", NOON + 60 * i, 'h2')
+            for i in range(start, start + count)]
+
+
+@pytest.mark.parametrize('codec', CODECS)
+def test_blocks_round_trip(tmp_path, codec):
+    writer = HeadlineArchive(str(tmp_path), codec, block_records=3)
+    headlines = _headlines(7) + [Headline('CNN', "Ünïcode héadline", None, NOON + 3600, None)]
+    writer.extend(headlines)
+
+    reader = ArchiveReader(str(tmp_path))
+    assert list(reader.query()) == headlines
+    assert reader.stats()[0][:3] == ('2024-05-01', 3, 8)
+    blocks = list(reader.blocks(reader.days()[0][1]))
+    assert [block[4] for block in blocks] == [3, 3, 2]
+    assert blocks[0][:2] == (NOON, NOON + 120)
+
+
+def test_gzip_day_file_is_plain_concatenated_gzip(tmp_path):
+    writer = HeadlineArchive(str(tmp_path), 'gzip', block_records=2)
+    writer.extend(_headlines(3))
+    writer.extend(_headlines(2, start=3))
+    data_path = ArchiveReader(str(tmp_path)).days()[0][1]
+    with open(data_path, 'rb') as file:
+        lines = gzip.decompress(file.read()).splitlines()
+    assert len(lines) == 5
+
+
+def test_query_filters_by_time_and_source(tmp_path):
+    writer = HeadlineArchive(str(tmp_path), block_records=2)
+    writer.extend(_headlines(6) + _headlines(2, start=6, source='CNN'))
+    reader = ArchiveReader(str(tmp_path))
+    assert list(reader.query(since=NOON + 60, until=NOON + 240)) == _headlines(3, start=1)
+    assert list(reader.query(source='CNN')) == _headlines(2, start=6, source='CNN')
+    assert list(reader.query(since=NOON + 86400 * 3)) == []
+
+
+def test_unindexed_trailing_frame_is_dropped(tmp_path):
+    writer = HeadlineArchive(str(tmp_path))
+    writer.extend(_headlines(2))
+    data_path = ArchiveReader(str(tmp_path)).days()[0][1]
+    with open(data_path, 'ab') as file:
+        file.write(gzip.compress(b'{"torn": true}\n'))  # a frame whose index entry was never written
+
+    HeadlineArchive(str(tmp_path)).extend(_headlines(1, start=2))
+    assert list(ArchiveReader(str(tmp_path)).query()) == _headlines(3)
+
+
+def test_records_keep_their_instant_across_timezones(tmp_path, monkeypatch):
+    # 1:30 EST on 2023-11-05, the second time the clock showed 1:30 in New York
+    fetched_at = 1699165800.0
+    monkeypatch.setenv('TZ', 'America/New_York')
+    time.tzset()
+    try:
+        headline = Headline('BBC', "Clocks went back", None, fetched_at, 'h2')
+        HeadlineArchive(str(tmp_path)).extend([headline])
+        monkeypatch.setenv('TZ', 'Asia/Tokyo')
+        time.tzset()
+        reader = ArchiveReader(str(tmp_path))
+        assert [h.fetched_at for h in reader.query()] == [fetched_at]
+        assert list(reader.query(since=fetched_at, until=fetched_at + 1)) == [headline]
+    finally:
+        monkeypatch.undo()
+        time.tzset()
@@ -0,0 +1,73 @@
+"""Tests for the DNS cache and the shared TLS session contexts"""
+
+import shutil
+import socket
+
+import pytest
+from requests.utils import DEFAULT_CA_BUNDLE_PATH
+
+import connections
+from connections import DNSCache, TLSSessionCache
+
+ADDRESS = [(socket.AF_INET, socket.SOCK_STREAM, 6, '', ('192.0.2.1', 443))]
+
+
+@pytest.fixture
+def resolver(monkeypatch):
+    """Count getaddrinfo calls and drive the cache's clock by hand"""
+    state = {'now': 1000.0, 'lookups': []}
+
+    def getaddrinfo(host, port, family=0, type=0):
+        state['lookups'].append(host)
+        return ADDRESS
+
+    monkeypatch.setattr(connections.socket, 'getaddrinfo', getaddrinfo)
+    monkeypatch.setattr(connections.time, 'monotonic', lambda: state['now'])
+    return state
+
+
+def test_answers_are_cached_until_the_ttl_expires(resolver):
+    cache = DNSCache(ttl=60)
+    assert cache.resolve('news.test', 443) == (ADDRESS, False)
+    resolver['now'] += 59
+    assert cache.resolve('news.test', 443) == (ADDRESS, True)
+    resolver['now'] += 2
+    assert cache.resolve('news.test', 443) == (ADDRESS, False)
+    assert resolver['lookups'] == ['news.test', 'news.test']
+
+
+def test_entries_are_per_host_and_port(resolver):
+    cache = DNSCache(ttl=60)
+    cache.resolve('news.test', 443)
+    cache.resolve('news.test', 80)
+    cache.resolve('other.test', 443)
+    assert len(resolver['lookups']) == 3
+    assert cache.resolve('news.test', 80)[1]
+
+
+def test_forget_drops_every_entry_for_a_host(resolver):
+    cache = DNSCache(ttl=60)
+    cache.resolve('news.test', 443)
+    cache.resolve('news.test', 80)
+    cache.resolve('other.test', 443)
+    cache.forget('news.test')
+    assert not cache.resolve('news.test', 443)[1]
+    assert not cache.resolve('news.test', 80)[1]
+    assert cache.resolve('other.test', 443)[1]
+
+
+def test_one_tls_context_per_ca_bundle(tmp_path):
+    sessions = TLSSessionCache()
+    default = sessions.context_for(True)
+    assert sessions.context_for(True) is default
+    assert sessions.context_for(DEFAULT_CA_BUNDLE_PATH) is default
+
+    bundle = str(tmp_path / 'corporate-ca.pem')
+    shutil.copyfile(DEFAULT_CA_BUNDLE_PATH, bundle)
+    custom = sessions.context_for(bundle)
+    assert custom is not default and sessions.context_for(bundle) is custom
+    directory = sessions.context_for(str(tmp_path))
+    assert directory not in (default, custom)
+    assert len(sessions.contexts) == 3
+    assert sessions.owns(default) and sessions.owns(directory)
+    assert not sessions.owns(connections.ssl.create_default_context())
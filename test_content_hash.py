@@ -0,0 +1,50 @@
+"""Tests for reusing the extraction of an unchanged page"""
+
+import io
+
+import requests
+
+from bench_suite import load_fixtures
+from benchmark import site_config
+from news_scraper import NewsHeadlineScraper
+
+BODY = load_fixtures()['BBC', 'small']
+
+
+def _scraper(monkeypatch, memo_state_file):
+    site = site_config('BBC')
+    scraper = NewsHeadlineScraper(sites=[site], memo_state_file=memo_state_file)
+
+    def fetch(url):
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response.headers['Content-Type'] = 'text/html; charset=utf-8'
+        response._content = BODY
+        response.raw = io.BytesIO(b'')
+        return response
+
+    monkeypatch.setattr(scraper, '_fetch', fetch)
+    return scraper, site
+
+
+def _records(headlines):
+    return [(h.source, h.title, h.url, h.selector) for h in headlines]
+
+
+def test_unchanged_body_skips_extraction_in_a_later_run(monkeypatch, tmp_path):
+    state_file = str(tmp_path / 'memo.json')
+    scraper, site = _scraper(monkeypatch, state_file)
+    first = scraper.scrape_site(site)
+    assert first
+    scraper.extraction_memo.save()
+
+    # A new process, as with one cron run after another
+    scraper, site = _scraper(monkeypatch, state_file)
+
+    def parse(*args):
+        raise AssertionError("the unchanged body was parsed again")
+
+    monkeypatch.setattr(scraper, '_run_plan', parse)
+    assert _records(scraper.scrape_site(site)) == _records(first)
+    assert scraper.extraction_memo.hits == 1
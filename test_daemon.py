@@ -0,0 +1,70 @@
+"""Tests for the daemon's pre-encoded headline snapshots and its query API"""
+
+import http.client
+import json
+
+import pytest
+
+from daemon import HeadlineSnapshot, ScraperDaemon
+from headline import Headline, parse_time
+from news_scraper import NewsHeadlineScraper
+
+T0 = 1_700_000_000.0
+
+HEADLINES = [
+    Headline('BBC', "Oldest from the BBC", None, T0, 'h2'),
+    Headline('CNN', "Oldest from CNN", None, T0 + 10, 'h3'),
+    Headline('BBC', "Middle from the BBC", None, T0 + 20, 'h2'),
+    Headline('CNN', "Newest from CNN", None, T0 + 30, 'h3'),
+    Headline('BBC', "Newest from the BBC", None, T0 + 40, 'h2'),
+]
+
+
+def _titles(body):
+    data = json.loads(body)
+    assert data['count'] == len(data['headlines'])
+    return [headline['title'] for headline in data['headlines']]
+
+
+def test_render_filters_by_source_since_and_limit():
+    snapshot = HeadlineSnapshot(HEADLINES, T0 + 50)
+    assert _titles(snapshot.render()) == [h.title for h in HEADLINES]
+    assert _titles(snapshot.render(source='CNN')) == ["Oldest from CNN", "Newest from CNN"]
+    assert _titles(snapshot.render(source='AP')) == []
+    assert _titles(snapshot.render(since=T0 + 20)) == [h.title for h in HEADLINES[2:]]
+    assert _titles(snapshot.render(source='BBC', since=T0 + 5)) == ["Middle from the BBC", "Newest from the BBC"]
+    assert _titles(snapshot.render(limit=2)) == ["Newest from CNN", "Newest from the BBC"]
+    assert _titles(snapshot.render(source='BBC', since=T0, limit=1)) == ["Newest from the BBC"]
+    assert _titles(snapshot.render(limit=0)) == []
+    assert _titles(snapshot.render(limit=10)) == [h.title for h in HEADLINES]
+
+
+def test_render_rejects_a_negative_limit():
+    with pytest.raises(ValueError):
+        HeadlineSnapshot(HEADLINES, T0).render(limit=-1)
+
+
+def test_parse_time_accepts_timestamps_and_iso_strings():
+    assert parse_time('1700000000.5') == 1700000000.5
+    assert parse_time('2023-11-14T22:13:20+00:00') == T0
+    with pytest.raises(ValueError):
+        parse_time('yesterday')
+
+
+@pytest.mark.parametrize('query', ['limit=-1', 'limit=many', 'since=yesterday'])
+def test_api_answers_bad_queries_with_400(query):
+    daemon = ScraperDaemon(NewsHeadlineScraper(sites=[]), port=0, persist=False)
+    daemon.snapshot = HeadlineSnapshot(HEADLINES, T0)
+    daemon.start()
+    try:
+        connection = http.client.HTTPConnection(daemon.host, daemon.port, timeout=5)
+        connection.request('GET', f'/headlines?{query}')
+        response = connection.getresponse()
+        assert response.status == 400
+        assert 'error' in json.loads(response.read())
+        connection.request('GET', '/headlines?limit=0&source=BBC')
+        response = connection.getresponse()
+        assert response.status == 200 and _titles(response.read()) == []
+        connection.close()
+    finally:
+        daemon.stop()
@@ -0,0 +1,84 @@
+"""Tests for near-duplicate detection, the persistent seen index and its Bloom filter"""
+
+import time
+
+import pytest
+
+from dedupe import BloomFilter, NearDuplicateIndex, SeenIndex, choose_bands, title_hash
+from headline import Headline
+
+NOW = time.time()  # opening an index expires rows against the real clock
+
+
+def _headlines(*titles):
+    return [Headline('BBC', title) for title in titles]
+
+
+def test_bloom_false_positive_falls_through_to_the_database(tmp_path):
+    index = SeenIndex(str(tmp_path / 'seen.db'))
+    index.filter_new(_headlines("An old story"), now=NOW)
+    # A saturated filter answers "maybe" for every key, as on a false positive
+    index.bloom.bits = bytearray(b'\xff' * len(index.bloom.bits))
+    assert "A brand new story" not in index
+    assert index.filter_new(_headlines("A brand new story", "An old story"), now=NOW + 60) == \
+        _headlines("A brand new story")
+    assert "A brand new story" in index
+    assert len(index) == 2
+    index.close()
+
+
+def test_seen_titles_are_suppressed_across_reopen_until_they_expire(tmp_path):
+    path = str(tmp_path / 'seen.db')
+    index = SeenIndex(path, ttl=3600)
+    assert index.filter_new(_headlines("Story A", "Story A", "Story B"), now=NOW) == _headlines("Story A", "Story B")
+    index.close()
+
+    index = SeenIndex(path, ttl=3600)
+    assert index.filter_new(_headlines("story a!", "Story C"), now=NOW + 1800) == _headlines("Story C")
+    # Story B was last seen at NOW and has expired; Story A was refreshed at NOW + 1800
+    assert index.filter_new(_headlines("Story A", "Story B"), now=NOW + 4000) == _headlines("Story B")
+    index.close()
+
+
+def test_bloom_filter_error_rate_is_near_its_target():
+    bloom = BloomFilter(10000, error_rate=0.01)
+    for i in range(10000):
+        bloom.add(title_hash(f"seen headline {i}"))
+    assert all(title_hash(f"seen headline {i}") in bloom for i in range(10000))
+    false_positives = sum(title_hash(f"unseen headline {i}") in bloom for i in range(20000))
+    assert false_positives / 20000 < 0.02
+
+
+def test_near_identical_titles_collapse():
+    index = NearDuplicateIndex(threshold=0.65)
+    assert index.add_if_new(0, "Stocks fall sharply as inflation fears grow") is None
+    assert index.add_if_new(1, "Stocks fall sharply as inflation fears grow!") == 0
+    assert index.add_if_new(2, "STOCKS FALL SHARPLY as inflation fear grows") == 0
+    assert len(index) == 1
+
+
+def test_distinct_titles_survive():
+    index = NearDuplicateIndex(threshold=0.65)
+    titles = ["Stocks fall sharply as inflation fears grow",
+              "Local team wins championship after thrilling final",
+              "Storm warning issued for the east coast",
+              "Stocks rise as inflation eases"]
+    assert [index.add_if_new(i, title) for i, title in enumerate(titles)] == [None] * 4
+    assert len(index) == 4
+    assert index.query("Scientists discover a new species of frog") is None
+
+
+@pytest.mark.parametrize('threshold', [0.5, 0.65, 0.8, 0.9])
+def test_choose_bands_puts_the_lsh_threshold_near_the_target(threshold):
+    bands, rows = choose_bands(128, threshold)
+    assert bands * rows <= 128
+    # The candidate probability curve is steepest around (1/bands) ** (1/rows)
+    assert abs((1 / bands) ** (1 / rows) - threshold) < 0.1
+
+
+def test_choose_bands_uses_longer_bands_for_stricter_thresholds():
+    layouts = [choose_bands(128, threshold) for threshold in (0.5, 0.65, 0.8, 0.9)]
+    rows = [layout[1] for layout in layouts]
+    assert rows == sorted(rows) and rows[0] < rows[-1]
+    with pytest.raises(ValueError):
+        NearDuplicateIndex(threshold=0)
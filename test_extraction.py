@@ -0,0 +1,66 @@
+"""Tests that every parser backend extracts the same headlines from the bundled fixtures"""
+
+import pytest
+
+from bench_suite import load_fixtures
+from benchmark import site_config
+from extraction import PARSER_BACKENDS, _rule_key, compile_plan, iter_chunks, iter_headlines
+
+FIXTURES = load_fixtures()
+
+
+def _extract(body, config, parser, limit=None):
+    return list(iter_headlines(body, config.plan, parser=parser, min_length=config.min_length,
+                               max_length=config.max_length, limit=limit))
+
+
+@pytest.mark.parametrize('site, size', sorted(FIXTURES))
+def test_backends_agree_on_fixtures(site, size):
+    body, config = FIXTURES[site, size], site_config(site)
+    expected = _extract(body, config, 'html.parser', config.limit)
+    assert expected, "the fixture should yield headlines"
+    for parser in PARSER_BACKENDS[1:]:
+        assert _extract(body, config, parser, config.limit) == expected, parser
+
+
+@pytest.mark.parametrize('parser', PARSER_BACKENDS)
+@pytest.mark.parametrize('site', sorted({site for site, _ in FIXTURES}))
+def test_limit_stops_early_with_the_same_prefix(site, parser):
+    body, config = FIXTURES[site, 'medium'], site_config(site)
+    everything = _extract(body, config, parser)
+    for limit in (1, 3, 7):
+        assert _extract(body, config, parser, limit) == everything[:limit]
+
+
+@pytest.mark.parametrize('parser', PARSER_BACKENDS)
+def test_incremental_parse_matches_whole_body(parser):
+    for (site, size), body in FIXTURES.items():
+        if size == 'large':
+            continue
+        config = site_config(site)
+        chunks = iter_chunks(body, 4096)
+        streamed = list(iter_headlines(chunks, config.plan, parser=parser, min_length=config.min_length,
+                                       max_length=config.max_length, limit=config.limit))
+        assert streamed == _extract(body, config, parser, config.limit), (site, size)
+
+
+@pytest.mark.parametrize('declared', ['utf-8', None])
+@pytest.mark.parametrize('parser', PARSER_BACKENDS)
+def test_charset_without_meta_declaration(parser, declared):
+    # The charset is only in the Content-Type header, or not declared at all
+    body = '<html><body><h2>Café société</h2></body></html>'.encode('utf-8')
+    plan = compile_plan(('h2',), None)
+    for source in (body, iter_chunks(body, 16)):
+        records = list(iter_headlines(source, plan, parser=parser, encoding=declared))
+        assert [title for _, title, _ in records] == ['Café société']
+
+
+@pytest.mark.parametrize('parser', ['html.parser', 'lxml'])
+def test_pseudo_class_selectors_are_not_misbucketed(parser):
+    body = (b'<html><body><div class="card"><a class="title" href="/a">Card with a link</a></div>'
+            b'<h3>Release v1.2 is out</h3><h3>Another story</h3></body></html>')
+    selectors = ('div:has(> a.title)', 'h3:-soup-contains("v1.2")')
+    assert _rule_key(selectors[0]) == _rule_key(selectors[1]) == ('any', None)
+    records = list(iter_headlines(body, compile_plan(selectors), parser=parser))
+    assert [(selector, title) for selector, title, _ in records] == [
+        ('div:has(> a.title)', "Card with a link"), ('h3:-soup-contains("v1.2")', "Release v1.2 is out")]
@@ -0,0 +1,98 @@
+"""Tests for conditional GET revalidation through the on-disk HTTP cache"""
+
+import io
+
+import requests
+from requests.adapters import BaseAdapter
+
+from http_cache import CachingAdapter, HTTPCache
+
+URL = 'https://news.test/'
+LAST_MODIFIED = 'Wed, 01 May 2024 08:00:00 GMT'
+
+
+class _Origin(BaseAdapter):
+    """A server that answers 304 when a request's validators match its current page"""
+
+    def __init__(self, body, etag='"v1"', last_modified=LAST_MODIFIED):
+        super().__init__()
+        self.body, self.etag, self.last_modified = body, etag, last_modified
+        self.requests = []
+
+    def send(self, request, **kwargs):
+        self.requests.append(dict(request.headers))
+        response = requests.Response()
+        response.url = request.url
+        response.request = request
+        validators = {}
+        if self.etag:
+            validators['ETag'] = self.etag
+        if self.last_modified:
+            validators['Last-Modified'] = self.last_modified
+        fresh = ((self.etag and request.headers.get('If-None-Match') == self.etag)
+                 or (not self.etag and request.headers.get('If-Modified-Since') == self.last_modified))
+        if fresh:
+            response.status_code, response.raw = 304, io.BytesIO(b'')
+        else:
+            response.status_code, response.raw = 200, io.BytesIO(self.body)
+        response.headers.update(validators)
+        return response
+
+    def close(self):
+        pass
+
+
+def _session(cache, origin):
+    session = requests.Session()
+    adapter = CachingAdapter(cache, origin)
+    session.mount('https://', adapter)
+    return session, adapter
+
+
+def test_304_is_answered_with_the_cached_body(tmp_path):
+    origin = _Origin(b'<h2>Cached headline</h2>')
+    session, adapter = _session(HTTPCache(str(tmp_path)), origin)
+    first = session.get(URL)
+    assert first.status_code == 200 and not getattr(first, 'from_cache', False)
+
+    second = session.get(URL)
+    assert second.status_code == 200 and second.from_cache
+    assert second.content == b'<h2>Cached headline</h2>'
+    assert second.headers['ETag'] == '"v1"'
+    assert (adapter.hits, adapter.misses) == (1, 1)
+
+
+def test_validators_are_sent_and_updated(tmp_path):
+    origin = _Origin(b'first version')
+    cache = HTTPCache(str(tmp_path))
+    session, _ = _session(cache, origin)
+    session.get(URL)
+    assert 'If-None-Match' not in origin.requests[0] and 'If-Modified-Since' not in origin.requests[0]
+
+    session.get(URL)
+    assert origin.requests[1]['If-None-Match'] == '"v1"'
+    assert origin.requests[1]['If-Modified-Since'] == LAST_MODIFIED
+
+    origin.body, origin.etag = b'second version', '"v2"'
+    assert session.get(URL).content == b'second version'
+    # Reopening the cache reads the new validators back from disk
+    entry = HTTPCache(str(tmp_path)).get(URL)
+    assert (entry.etag, entry.last_modified) == ('"v2"', LAST_MODIFIED)
+
+
+def test_last_modified_alone_revalidates(tmp_path):
+    origin = _Origin(b'dated page', etag=None)
+    session, adapter = _session(HTTPCache(str(tmp_path)), origin)
+    session.get(URL)
+    assert session.get(URL).content == b'dated page'
+    assert 'If-None-Match' not in origin.requests[1]
+    assert adapter.hits == 1
+
+
+def test_responses_without_validators_are_not_stored(tmp_path):
+    origin = _Origin(b'volatile page', etag=None, last_modified=None)
+    cache = HTTPCache(str(tmp_path))
+    session, adapter = _session(cache, origin)
+    session.get(URL)
+    session.get(URL)
+    assert cache.get(URL) is None and adapter.hits == 0
@@ -0,0 +1,88 @@
+"""Tests for crash recovery in the append-only NDJSON store"""
+
+import json
+import os
+import time
+
+from headline import Headline
+from ndjson_store import NDJSONStore
+
+
+def _headlines(count, start=0):
+    return [Headline('BBC', f"Headline number {i}", f"https://example.test/{i}", 1_700_000_000 + i, 'h2')
+            for i in range(start, start + count)]
+
+
+def test_torn_tail_is_cut_back_to_the_last_complete_line(tmp_path):
+    store = NDJSONStore(str(tmp_path), segment_records=100)
+    store.extend(_headlines(5))
+    store.close()
+    data_path = store._path(0, '.ndjson.open')
+    size = os.path.getsize(data_path)
+    with open(data_path, 'ab') as file:
+        file.write(b'{"source":"BBC","title":"half a rec')  # a write cut short by a crash
+
+    store = NDJSONStore(str(tmp_path), segment_records=100)
+    assert len(store) == 5
+    assert os.path.getsize(data_path) == size
+    store.extend(_headlines(2, start=5))
+    assert list(store) == _headlines(7)
+    assert store.get(6) == _headlines(7)[6]
+    store.close()
+
+
+def test_active_index_is_rebuilt_from_the_data(tmp_path):
+    store = NDJSONStore(str(tmp_path), segment_records=100)
+    store.extend(_headlines(6))
+    store.close()
+    with open(store._path(0, '.idx.open'), 'r+b') as index:
+        index.truncate(12)  # lost offsets and half of one
+
+    store = NDJSONStore(str(tmp_path), segment_records=100)
+    assert [store.get(i) for i in range(6)] == _headlines(6)
+    assert os.path.getsize(store._path(0, '.idx.open')) == 6 * 8
+    store.close()
+
+
+def test_missing_sealed_index_is_rebuilt(tmp_path):
+    store = NDJSONStore(str(tmp_path), segment_records=4)
+    store.extend(_headlines(6))  # seals segment 0
+    store.close()
+    # Crash after sealing the data but before sealing its index
+    os.replace(store._path(0, '.idx'), store._path(0, '.idx.open'))
+
+    store = NDJSONStore(str(tmp_path), segment_records=4)
+    assert os.path.exists(store._path(0, '.idx'))
+    assert not os.path.exists(store._path(0, '.idx.open'))
+    assert len(store) == 6
+    assert [store[i] for i in range(6)] == _headlines(6)
+    assert list(store.iter_records(3)) == _headlines(6)[3:]
+    store.close()
+
+
+def test_records_keep_their_instant_across_timezones(tmp_path, monkeypatch):
+    # 1:30 EST on 2023-11-05, the second time the clock showed 1:30 in New York
+    headline = Headline('BBC', "Clocks went back", None, 1699165800.0, 'h2')
+    monkeypatch.setenv('TZ', 'America/New_York')
+    time.tzset()
+    try:
+        store = NDJSONStore(str(tmp_path))
+        store.append(headline)
+        store.close()
+        monkeypatch.setenv('TZ', 'Asia/Tokyo')
+        time.tzset()
+        assert list(NDJSONStore(str(tmp_path))) == [headline]
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+
+
+def test_export_past_the_end_is_empty(tmp_path):
+    store = NDJSONStore(str(tmp_path))
+    store.extend(_headlines(3))
+    output = str(tmp_path / 'export.json')
+    assert store.export_json(output, start=5) == 0
+    with open(output, encoding='utf-8') as file:
+        exported = json.load(file)
+    assert exported['total_headlines'] == 0 and exported['headlines'] == []
+    store.close()
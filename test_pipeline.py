@@ -0,0 +1,63 @@
+"""Tests that pipelined fetching and parsing gives the same headlines as a sequential run"""
+
+import io
+
+import pytest
+import requests
+
+from bench_suite import load_fixtures
+from benchmark import site_config
+from news_scraper import NewsHeadlineScraper
+
+FIXTURES = load_fixtures()
+
+
+def _scraper(monkeypatch, sites, size, parse_workers=0):
+    pages = {site.url: FIXTURES[site.name, size] for site in sites}
+    scraper = NewsHeadlineScraper(sites=sites, parse_workers=parse_workers, reuse_unchanged=False)
+
+    def fetch(url):
+        if pages[url] is None:
+            raise requests.ConnectionError(f"{url} is down")
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response.headers['Content-Type'] = 'text/html; charset=utf-8'
+        response._content = pages[url]
+        response.raw = io.BytesIO(b'')
+        return response
+
+    monkeypatch.setattr(scraper, '_fetch', fetch)
+    return scraper, pages
+
+
+def _records(results):
+    return [[(h.source, h.title, h.url, h.selector) for h in headlines] for headlines in results]
+
+
+@pytest.mark.parametrize('size', ['small', 'medium'])
+def test_pipeline_matches_sequential_run(monkeypatch, size):
+    sites = [site_config(name) for name in sorted({name for name, _ in FIXTURES})]
+    sequential, _ = _scraper(monkeypatch, sites, size)
+    pipelined, _ = _scraper(monkeypatch, sites, size, parse_workers=2)
+    try:
+        expected = _records(sequential._run_sequential(sites))
+        assert all(expected)
+        assert _records(pipelined.pipeline.run(sites)) == expected
+        # A second run reuses the worker pool
+        assert _records(pipelined.pipeline.run(sites)) == expected
+    finally:
+        if pipelined.pipeline.pool is not None:
+            pipelined.pipeline.pool.shutdown()
+
+
+def test_a_failed_fetch_leaves_an_empty_slot(monkeypatch):
+    sites = [site_config(name) for name in sorted({name for name, _ in FIXTURES})]
+    pipelined, pages = _scraper(monkeypatch, sites, 'small', parse_workers=1)
+    pages[sites[0].url] = None
+    try:
+        results = pipelined.pipeline.run(sites)
+    finally:
+        if pipelined.pipeline.pool is not None:
+            pipelined.pipeline.pool.shutdown()
+    assert results[0] == [] and all(results[1:])
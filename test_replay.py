@@ -0,0 +1,49 @@
+"""Tests for recording responses behind the HTTP cache"""
+
+import io
+
+import requests
+from requests.adapters import BaseAdapter
+
+from http_cache import CachingAdapter, HTTPCache
+from news_scraper import NewsHeadlineScraper
+from replay import RecordingAdapter, read_archive
+
+BODY = b'<html><body><h2>A headline worth keeping</h2></body></html>'
+
+
+class _RevalidatingServer(BaseAdapter):
+    """Answers the first request with the page and every conditional one with 304"""
+
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.url = request.url
+        response.request = request
+        if 'If-None-Match' in request.headers:
+            response.status_code, response.raw = 304, io.BytesIO(b'')
+        else:
+            response.status_code, response.raw = 200, io.BytesIO(BODY)
+            response.headers['ETag'] = '"v1"'
+        return response
+
+    def close(self):
+        pass
+
+
+def test_a_cache_hit_is_recorded_with_its_body(tmp_path):
+    path = str(tmp_path / 'responses.rec.gz')
+    adapter = RecordingAdapter(path, CachingAdapter(HTTPCache(str(tmp_path / 'cache')), _RevalidatingServer()))
+    session = requests.Session()
+    session.mount('https://', adapter)
+    for _ in range(2):
+        assert session.get('https://news.test/').content == BODY
+
+    records = list(read_archive(path))
+    assert [(record.status, record.body) for record in records] == [(200, BODY), (200, BODY)]
+
+
+def test_scraper_records_above_the_cache(tmp_path):
+    scraper = NewsHeadlineScraper(sites=[], cache_dir=str(tmp_path / 'cache'),
+                                  record_file=str(tmp_path / 'responses.rec.gz'))
+    adapter = scraper.session.get_adapter('https://news.test/')
+    assert isinstance(adapter, RecordingAdapter) and isinstance(adapter.adapter, CachingAdapter)
@@ -0,0 +1,255 @@
+"""Tests for the retry policy and the per-host circuit breaker"""
+
+import io
+import time
+from email.utils import format_datetime
+from datetime import datetime, timezone
+
+import pytest
+import requests
+
+from headline import Headline
+from news_scraper import NewsHeadlineScraper
+import scheduling
+from scheduling import AdaptivePoller, CircuitBreaker, CircuitOpenError, HostRateLimiter, RetryPolicy, TokenBucket
+
+
+class _Clock:
+    """A monotonic clock that only moves when the code under test sleeps"""
+
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(scheduling.time, 'monotonic', clock.monotonic)
+    monkeypatch.setattr(scheduling.time, 'sleep', clock.sleep)
+    return clock
+
+
+def test_bucket_allows_a_burst_then_paces_at_the_rate(clock):
+    bucket = TokenBucket(rate=2, burst=3)
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert [bucket.acquire() for _ in range(4)] == [0.5, 0.5, 0.5, 0.5]
+    assert clock.now == 102.0
+
+
+def test_bucket_refills_up_to_its_burst_only(clock):
+    bucket = TokenBucket(rate=1, burst=2)
+    bucket.acquire()
+    bucket.acquire()
+    clock.now += 60  # a long pause earns no more than the burst
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 1.0]
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+def test_concurrent_callers_reserve_consecutive_slots(clock):
+    bucket = TokenBucket(rate=4, burst=1)
+    # Reservations made at the same instant queue up behind each other
+    assert [bucket._reserve() for _ in range(4)] == [0.0, 0.25, 0.5, 0.75]
+
+
+def test_limiter_keeps_a_bucket_per_host(clock):
+    limiter = HostRateLimiter(default_rate=1, default_burst=1, limits={'slow.test': (0.5, 1)})
+    assert limiter.acquire('https://www.bbc.test/news') == 0.0
+    assert limiter.acquire('https://cnn.test/') == 0.0  # another host is not held up
+    assert limiter.acquire('https://WWW.BBC.test/world') == 1.0
+    limiter.acquire('https://slow.test/')
+    assert limiter.acquire('https://slow.test/') == 2.0
+
+
+def test_retry_after_seconds_and_http_date():
+    assert RetryPolicy.retry_after('7') == 7.0
+    assert RetryPolicy.retry_after('-3') == 0.0
+    now = 1_700_000_000
+    date = format_datetime(datetime.fromtimestamp(now + 30, timezone.utc), usegmt=True)
+    assert RetryPolicy.retry_after(date, now=now) == pytest.approx(30)
+    assert RetryPolicy.retry_after(None) is None
+    assert RetryPolicy.retry_after('soon') is None
+
+
+def test_delay_honours_short_retry_after_and_gives_up_on_long_ones():
+    policy = RetryPolicy(retries=2, backoff=1.0, max_backoff=10.0)
+    assert policy.delay(0, retry_after=4.0) == 4.0
+    assert policy.delay(0, retry_after=60.0) is None
+    assert policy.delay(2, retry_after=1.0) is None  # retries used up
+
+
+def test_delay_jitter_stays_within_the_capped_exponential():
+    policy = RetryPolicy(retries=10, backoff=1.0, max_backoff=5.0)
+    for retry in range(6):
+        for _ in range(50):
+            assert 0 <= policy.delay(retry) <= min(5.0, 2 ** retry)
+
+
+def test_breaker_opens_at_threshold_and_success_resets():
+    breaker = CircuitBreaker(threshold=3, cooldown=60)
+    assert not breaker.record_failure('a', now=0)
+    assert not breaker.record_failure('a', now=1)
+    breaker.record_success('a')
+    assert not breaker.record_failure('a', now=2)  # the count started again
+    assert not breaker.record_failure('a', now=3)
+    assert breaker.record_failure('a', now=4)
+    with pytest.raises(CircuitOpenError):
+        breaker.check('a', now=63)
+    breaker.check('b', now=63)  # other hosts are unaffected
+
+
+def test_half_open_lets_one_trial_through():
+    breaker = CircuitBreaker(threshold=1, cooldown=60)
+    breaker.record_failure('a', now=0)
+    breaker.check('a', now=61)  # the trial
+    with pytest.raises(CircuitOpenError, match='trial'):
+        breaker.check('a', now=62)
+    breaker.record_success('a')
+    breaker.check('a', now=63)
+    assert 'a' not in breaker.states
+
+
+def test_failed_trial_reopens_for_twice_as_long_up_to_max_cooldown():
+    breaker = CircuitBreaker(threshold=1, cooldown=60, max_cooldown=200)
+    breaker.record_failure('a', now=0)
+    breaker.check('a', now=60)
+    assert breaker.record_failure('a', now=60)
+    assert breaker.states['a'].open_until == 180
+    breaker.check('a', now=180)
+    breaker.record_failure('a', now=180)
+    assert breaker.states['a'].open_until == 380  # 240 capped to 200
+
+
+def test_state_file_keeps_failures_and_open_circuits(tmp_path):
+    path = str(tmp_path / 'breaker.json')
+    breaker = CircuitBreaker(threshold=2, cooldown=60, state_file=path)
+    breaker.record_failure('a', now=0)
+    breaker = CircuitBreaker(threshold=2, cooldown=60, state_file=path)
+    assert breaker.record_failure('a', now=1)  # the first failure was remembered
+    breaker = CircuitBreaker(threshold=2, cooldown=60, state_file=path)
+    with pytest.raises(CircuitOpenError):
+        breaker.check('a', now=30)
+
+
+def _front_page(*titles):
+    return [Headline('BBC', title) for title in titles]
+
+
+def test_poller_backs_off_while_nothing_changes():
+    poller = AdaptivePoller(min_interval=60, max_interval=3600)
+    page = _front_page("Same story", "Other story")
+    assert poller.record('BBC', page, now=0) == 60  # nothing to compare with yet
+    assert poller.record('BBC', page, now=60) == 120
+    assert poller.record('BBC', list(reversed(page)), now=180) == 240  # same set, other order
+    assert poller.next_poll('BBC') == 180 + 240
+    assert not poller.due('BBC', now=400) and poller.due('BBC', now=420)
+
+
+def test_poller_speeds_up_when_headlines_change():
+    poller = AdaptivePoller(min_interval=60, max_interval=3600)
+    poller.record('BBC', _front_page("First"), now=0)
+    for i in range(1, 4):
+        poller.record('BBC', _front_page("First"), now=i)
+    assert poller.state_for('BBC').interval == 480
+    assert poller.record('BBC', _front_page("Breaking"), now=10) == 240
+    state = poller.state_for('BBC')
+    assert (state.changes, state.last_change) == (1, 10)
+
+
+def test_poller_keeps_intervals_within_bounds():
+    poller = AdaptivePoller(min_interval=60, max_interval=300, bounds={'CNN': (10, 20)})
+    for i in range(10):
+        poller.record('BBC', _front_page("Quiet"), now=i)
+        poller.record('CNN', _front_page(f"Busy {i % 2}"), now=i)
+    assert poller.state_for('BBC').interval == 300
+    assert poller.state_for('CNN').interval == 10
+    for i in range(10, 20):
+        poller.record('CNN', _front_page("Quiet now"), now=i)
+    assert poller.state_for('CNN').interval == 20
+    with pytest.raises(ValueError):
+        poller.configure('AP', 100, 50)
+
+
+def test_poller_ignores_failed_polls():
+    poller = AdaptivePoller(min_interval=60, max_interval=3600)
+    poller.record('BBC', _front_page("Story"), now=0)
+    poller.record('BBC', _front_page("Story"), now=60)
+    assert poller.record('BBC', [], now=200) == 120
+    assert poller.state_for('BBC').polls == 2
+
+
+def test_poller_state_is_saved_once_and_reloaded(tmp_path):
+    path = tmp_path / 'polls.json'
+    poller = AdaptivePoller(min_interval=60, max_interval=3600, state_file=str(path))
+    poller.record('BBC', _front_page("Story"), now=0)
+    poller.record('BBC', _front_page("Story"), now=60)
+    assert not path.exists()  # nothing is written until the run saves
+    poller.save()
+
+    reloaded = AdaptivePoller(min_interval=60, max_interval=3600, state_file=str(path))
+    assert reloaded.state_for('BBC').to_dict() == poller.state_for('BBC').to_dict()
+    assert reloaded.next_poll('BBC') == 180
+    assert reloaded.record('BBC', _front_page("Story"), now=180) == 240
+
+    path.write_text('{"BBC": {"interval": "garbled"', encoding='utf-8')
+    assert AdaptivePoller(state_file=str(path)).next_poll('BBC') == 0.0
+
+
+def _scraper(monkeypatch, outcomes, retries=0, threshold=1, cooldown=0.05):
+    """A scraper whose requests return or raise the given outcomes in turn"""
+    scraper = NewsHeadlineScraper(sites=[], retries=retries, backoff=0)
+    scraper.circuit_breaker = CircuitBreaker(threshold, cooldown)
+    outcomes = iter(outcomes)
+
+    def get(url, timeout):
+        outcome = next(outcomes)
+        if isinstance(outcome, Exception):
+            raise outcome
+        response = requests.Response()
+        response.status_code = outcome
+        response.url = url
+        response.raw = io.BytesIO(b'')
+        return response
+
+    monkeypatch.setattr(scraper, '_get', get)
+    return scraper
+
+
+def test_non_retryable_error_ends_a_half_open_trial(monkeypatch):
+    url = 'http://example.test/'
+    scraper = _scraper(monkeypatch, [requests.ConnectionError('down'), requests.TooManyRedirects('loop'), 200])
+    with pytest.raises(requests.ConnectionError):
+        scraper._fetch(url)
+    time.sleep(0.06)
+    with pytest.raises(requests.TooManyRedirects):
+        scraper._fetch(url)  # the trial
+    with pytest.raises(CircuitOpenError, match='not retrying'):
+        scraper._fetch(url)  # open again, not stuck waiting for the trial
+    time.sleep(0.11)
+    assert scraper._fetch(url).status_code == 200
+    assert not scraper.circuit_breaker.states
+
+
+def test_a_flaky_fetch_that_recovers_does_not_count_against_the_host(monkeypatch):
+    scraper = _scraper(monkeypatch, [503, 503, 200], retries=2, threshold=1)
+    assert scraper._fetch('http://example.test/').status_code == 200
+    assert not scraper.circuit_breaker.states
+
+
+def test_failures_are_counted_per_fetch_not_per_attempt(monkeypatch):
+    scraper = _scraper(monkeypatch, [503] * 6 + [404], retries=2, threshold=3)
+    for _ in range(2):
+        with pytest.raises(requests.HTTPError):
+            scraper._fetch('http://example.test/')
+    assert scraper.circuit_breaker.states['example.test'].failures == 2
+    with pytest.raises(requests.HTTPError):
+        scraper._fetch('http://example.test/')  # a 404 means the host is up
+    assert not scraper.circuit_breaker.states
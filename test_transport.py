@@ -0,0 +1,32 @@
+"""Tests for the HTTP/2 transport adapter"""
+
+import ssl
+
+import pytest
+
+import transport
+
+pytestmark = pytest.mark.skipif(transport.httpx is None, reason="httpx not installed")
+
+
+@pytest.fixture
+def adapter():
+    adapter = transport.HTTP2Adapter()
+    yield adapter
+    adapter.close()
+
+
+def test_clients_are_keyed_on_tls_settings_and_proxy(adapter):
+    default = adapter._client(True, None, None)
+    assert adapter._client(True, None, None) is default
+    assert adapter._client(False, None, None) is not default
+    assert adapter._client(True, None, 'http://proxy.test:3128') is not default
+    assert len(adapter.clients) == 3
+
+
+def test_ssl_context_follows_verify():
+    assert transport._ssl_context(True, None).verify_mode == ssl.CERT_REQUIRED
+    unverified = transport._ssl_context(False, None)
+    assert unverified.verify_mode == ssl.CERT_NONE and not unverified.check_hostname
+    with pytest.raises(OSError):
+        transport._ssl_context('/nonexistent/ca-bundle.pem', None)
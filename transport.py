@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+HTTP/2 transport for the News Headlines Scraper
+
+HTTP2Adapter is a requests transport adapter backed by an httpx client,
+so it mounts on the scraper's requests.Session like the default adapter
+and everything stacked on top of it (the cache, recording, metrics) keeps
+working. Requests to the same host share one HTTP/2 connection, with
+concurrent fetches multiplexed over it as separate streams instead of
+each taking its own TCP and TLS handshake, and bodies compressed with
+brotli or zstd are decoded as well as gzip and deflate.
+
+HTTP/2 is negotiated with ALPN over TLS and falls back to HTTP/1.1 for
+servers without it. Plain http:// URLs stay on HTTP/1.1 unless
+prior_knowledge is set, for servers known to speak cleartext HTTP/2.
+
+The adapter drives an httpx.AsyncClient on an event loop thread of its
+own. httpcore's synchronous HTTP/2 connection picks a stream id and sends
+its HEADERS frame without holding a lock, so threads sharing a connection
+can send them out of order, which ends the connection with a protocol
+error. On the loop every connection is used from one thread, while the
+fetch threads still wait on their own responses concurrently.
+
+Needs the optional packages: pip install "httpx[http2]" brotli zstandard
+"""
+
+import asyncio
+import os
+import ssl
+import threading
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import DEFAULT_CA_BUNDLE_PATH, get_encoding_from_headers, select_proxy
+from urllib3.util.request import ACCEPT_ENCODING
+
+from http_cache import HOP_HEADERS
+
+try:
+    import httpx
+except ImportError:  # httpx (with h2) is optional; without it the default transport is used
+    httpx = None
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Connection-specific headers are not allowed in HTTP/2 requests
+REQUEST_HOP_HEADERS = {'connection', 'keep-alive', 'proxy-connection', 'transfer-encoding', 'upgrade'}
+
+
+def check_http2():
+    """Raise ImportError with an install hint unless httpx and h2 are available"""
+    if httpx is None:
+        raise ImportError('The HTTP/2 transport needs httpx: pip install "httpx[http2]"')
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        raise ImportError('The HTTP/2 transport needs the h2 package: pip install "httpx[http2]"') from None
+
+
+def accept_encoding(http2=False):
+    """Return the Accept-Encoding value for the content codings a transport can decode
+
+    The default transport decodes whatever urllib3 supports (brotli when
+    brotli is installed, zstd with backports.zstd or Python 3.14); httpx
+    decodes brotli and zstd with the brotli and zstandard packages.
+    """
+    if not http2:
+        return ACCEPT_ENCODING.replace(',', ', ')
+    encodings = ['gzip', 'deflate']
+    if brotli is not None:
+        encodings.append('br')
+    if zstandard is not None:
+        encodings.append('zstd')
+    return ', '.join(encodings)
+
+
+def _timeout(timeout):
+    """Convert a requests timeout (seconds or a (connect, read) pair) to an httpx.Timeout"""
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+        return httpx.Timeout(read, connect=connect)
+    return httpx.Timeout(timeout)
+
+
+def _ssl_context(verify, cert):
+    """Build the SSL context for requests' verify and cert arguments
+
+    verify is True (requests' default CA bundle), False or the path of a
+    CA bundle file or directory; cert is a client certificate file or a
+    (certificate, key) pair.
+    """
+    if verify is False:
+        context = ssl.create_default_context()
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+    elif isinstance(verify, str):
+        if os.path.isdir(verify):
+            context = ssl.create_default_context(capath=verify)
+        else:
+            context = ssl.create_default_context(cafile=verify)
+    else:
+        context = ssl.create_default_context(cafile=DEFAULT_CA_BUNDLE_PATH)
+    if cert:
+        if isinstance(cert, str):
+            context.load_cert_chain(cert)
+        else:
+            context.load_cert_chain(*cert)
+    return context
+
+
+class _DecodedBody:
+    """The raw body of a response from HTTP2Adapter, as requests reads it
+
+    requests calls stream() to iterate a body; each chunk is read on the
+    adapter's event loop. httpx has already undone the content coding,
+    and its errors are raised as requests exceptions.
+    """
+
+    def __init__(self, adapter, response, request):
+        self.adapter = adapter
+        self.response = response
+        self.request = request
+
+    def stream(self, chunk_size, decode_content=True):
+        chunks = self.response.aiter_bytes(chunk_size)
+        try:
+            while True:
+                try:
+                    yield self.adapter._call(chunks.__anext__())
+                except StopAsyncIteration:
+                    return
+        except httpx.HTTPError as e:
+            # requests reports read timeouts mid-body as connection errors too
+            raise requests.ConnectionError(e, request=self.request) from e
+        finally:
+            self.close()
+
+    def close(self):
+        if not self.response.is_closed:
+            self.adapter._call(self.response.aclose())
+
+
+class HTTP2Adapter(BaseAdapter):
+    """A requests transport adapter sending requests over HTTP/2 with httpx"""
+
+    def __init__(self, max_connections=100, prior_knowledge=False):
+        """Start the event loop the httpx clients run on
+
+        max_connections caps the open connections over all hosts; with
+        HTTP/2 a host needs only one. prior_knowledge=True speaks HTTP/2
+        to plain http:// servers without negotiating it first.
+        """
+        check_http2()
+        super().__init__()
+        self.max_connections = max_connections
+        self.prior_knowledge = prior_knowledge
+        self.clients = {}
+        self.clients_lock = threading.Lock()
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name='http2-transport', daemon=True)
+        self.thread.start()
+
+    def _client(self, verify, cert, proxy):
+        """Return the client for one combination of TLS settings and proxy, creating it on first use
+
+        The Session resolves verify, cert and proxies for every request,
+        from its own settings and, with trust_env, from REQUESTS_CA_BUNDLE
+        and the *_proxy variables, so the clients never read the
+        environment themselves. Each combination gets its own client and
+        connections; normally there is just one.
+        """
+        if isinstance(cert, list):
+            cert = tuple(cert)
+        key = (verify, cert, proxy)
+        with self.clients_lock:
+            client = self.clients.get(key)
+            if client is None:
+                client = self.clients[key] = httpx.AsyncClient(
+                    http1=not self.prior_knowledge, http2=True, verify=_ssl_context(verify, cert),
+                    proxy=proxy, trust_env=False, follow_redirects=False,
+                    limits=httpx.Limits(max_connections=self.max_connections))
+            return client
+
+    def _call(self, coroutine):
+        """Run a coroutine on the adapter's event loop and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        """Send a PreparedRequest and return a requests.Response once the headers arrive
+
+        Session.send reads the body afterwards unless stream is set.
+        Redirects are left to the Session, as with the default adapter.
+        """
+        client = self._client(verify, cert, select_proxy(request.url, proxies))
+        headers = [(name, value) for name, value in request.headers.items()
+                   if name.lower() not in REQUEST_HOP_HEADERS]
+        outgoing = client.build_request(request.method, request.url, headers=headers,
+                                        content=request.body, timeout=_timeout(timeout))
+        try:
+            response = self._call(client.send(outgoing, stream=True))
+        except httpx.TimeoutException as e:
+            raise requests.Timeout(e, request=request) from e
+        except httpx.HTTPError as e:
+            raise requests.ConnectionError(e, request=request) from e
+        return self._build_response(request, response)
+
+    def _build_response(self, request, response):
+        result = requests.Response()
+        result.status_code = response.status_code
+        result.reason = response.reason_phrase
+        # The body is handed on decoded, so its coding and length no longer apply
+        result.headers = CaseInsensitiveDict()
+        for name, value in response.headers.multi_items():
+            if name.lower() in HOP_HEADERS:
+                continue
+            if name in result.headers:
+                value = f"{result.headers[name]}, {value}"
+            result.headers[name] = value
+        result.encoding = get_encoding_from_headers(result.headers)
+        result.raw = _DecodedBody(self, response, request)
+        result.url = request.url
+        result.request = request
+        result.connection = self
+        result.http_version = response.http_version
+        return result
+
+    def close(self):
+        if self.loop.is_closed():
+            return
+        with self.clients_lock:
+            clients, self.clients = list(self.clients.values()), {}
+        for client in clients:
+            self._call(client.aclose())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()